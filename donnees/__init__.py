@@ -0,0 +1,5 @@
+# COUCHE DONNÉES - CALCULS INDÉPENDANTS DE STREAMLIT
+#
+# Ce paquet ne doit jamais importer streamlit : le script de l'application
+# s'appelle streamlit.py et masquerait le vrai module lors d'un import
+# depuis ce dossier (outils en ligne de commande, benchmarks...).
@@ -0,0 +1,78 @@
+# INDEX BITMAP DES COLONNES CATÉGORIELLES
+#
+# Pour chaque colonne de faible cardinalité (DATE, catégorie, sexe, zone,
+# direction...), un ensemble de bits par valeur distincte : le bit i vaut 1
+# si la ligne i porte cette valeur. Une conjonction de filtres se résout en
+# OU des valeurs retenues d'une colonne, puis ET entre colonnes, sur des mots
+# de 64 bits ; le nombre de lignes retenues est un simple comptage de bits.
+# Les ensembles sont construits valeur par valeur, sans matrice dense
+# lignes × valeurs.
+# L'index est construit une fois par table (voir donnees/requetes.py) : les
+# filtres suivants ne reparcourent plus les colonnes.
+
+import numpy as np
+import pandas as pd
+
+# Au-delà de ce nombre de valeurs distinctes, la colonne n'est pas indexée (VILLE...)
+CARDINALITE_MAX = 256
+
+
+def _octets(nb_lignes):
+    """Taille d'un ensemble de bits, arrondie à un nombre entier de mots de 64 bits"""
+    return -(-nb_lignes // 64) * 8
+
+
+def construire_index(df, colonnes=None, cardinalite_max=CARDINALITE_MAX):
+    """Index {colonne: (valeurs, bits)} : bits[k] est l'ensemble des lignes portant valeurs[k].
+
+    Par défaut, toutes les colonnes catégorielles ou entières de cardinalité au plus cardinalite_max.
+    """
+    colonnes = list(df.columns) if colonnes is None else list(colonnes)
+    nb_lignes = len(df)
+    index = {}
+    for colonne in colonnes:
+        serie = df[colonne]
+        if isinstance(serie.dtype, pd.CategoricalDtype):
+            valeurs, codes = serie.cat.categories, serie.cat.codes.to_numpy()
+        elif pd.api.types.is_integer_dtype(serie.dtype):
+            codes, valeurs = pd.factorize(serie.to_numpy(), sort=True)
+        else:
+            continue
+        if len(valeurs) > cardinalite_max:
+            continue
+
+        # Un seul masque booléen de nb_lignes en mémoire à la fois ; codes -1 (manquants) dans aucun ensemble
+        bits = np.zeros((len(valeurs), _octets(nb_lignes)), dtype=np.uint8)
+        for k in range(len(valeurs)):
+            bits[k, :-(-nb_lignes // 8)] = np.packbits(codes == k, bitorder='little')
+        index[colonne] = (pd.Index(valeurs), bits.view(np.uint64))
+    return {'nb_lignes': nb_lignes, 'colonnes': index}
+
+
+def bits_filtres(index, filtres):
+    """Ensemble de bits des lignes vérifiant les filtres portant sur des colonnes indexées.
+
+    Retourne (bits, filtres restants) : les filtres des colonnes non indexées sont à appliquer à part.
+    """
+    bits = np.full(_octets(index['nb_lignes']) // 8, np.iinfo(np.uint64).max, dtype=np.uint64)
+    restants = {}
+    for colonne, valeur in filtres.items():
+        if colonne not in index['colonnes']:
+            restants[colonne] = valeur
+            continue
+        valeurs, ensembles = index['colonnes'][colonne]
+        positions = valeurs.get_indexer(list(valeur) if isinstance(valeur, (list, tuple, set)) else [valeur])
+        positions = positions[positions >= 0]
+        # OU des valeurs retenues (aucune : ensemble vide), puis ET avec les autres colonnes
+        bits &= np.bitwise_or.reduce(ensembles[positions], axis=0) if len(positions) else 0
+    return bits, restants
+
+
+def compter(bits):
+    """Nombre de lignes d'un ensemble de bits"""
+    return int(np.bitwise_count(bits).sum())
+
+
+def masque(bits, nb_lignes):
+    """Ensemble de bits en masque booléen de nb_lignes lignes"""
+    return np.unpackbits(bits.view(np.uint8), count=nb_lignes, bitorder='little').view(bool)
@@ -0,0 +1,117 @@
+# CACHE DISQUE DES TABLES DÉRIVÉES (ARROW IPC, MÉMOIRE MAPPÉE)
+#
+# Les tables dérivées sont écrites en Arrow IPC non compressé dans un dossier
+# nommé d'après l'empreinte (SHA-256) du contenu des données sources. Un
+# nouveau processus relit ces fichiers par memory-map sans rien recalculer ;
+# toute modification des sources change l'empreinte, donc le dossier lu.
+# Les DataFrames lus sont des vues en lecture seule sur les pages mappées,
+# partagées par tous les processus qui lisent le même fichier.
+
+import hashlib
+import os
+import shutil
+
+import pyarrow as pa
+import pyarrow.ipc as ipc
+
+DOSSIER_CACHE = '.cache_tables'
+
+# À incrémenter quand le format ou le calcul d'une table change
+VERSION_CACHE = 3
+
+# Empreintes déjà calculées dans ce processus : (chemin, taille, date de modification) -> sha256
+_empreintes_connues = {}
+
+
+def _fichiers(chemin):
+    """Fichiers d'un chemin (fichier seul ou contenu d'un dossier, ordre stable)"""
+    if os.path.isfile(chemin):
+        return [chemin]
+    fichiers = []
+    for racine, dossiers, noms in os.walk(chemin):
+        dossiers.sort()
+        fichiers.extend(os.path.join(racine, nom) for nom in sorted(noms) if not nom.endswith('.tmp'))
+    return fichiers
+
+
+def _empreinte_fichier(chemin):
+    """SHA-256 du contenu d'un fichier, mémorisé tant que sa taille et sa date ne changent pas"""
+    infos = os.stat(chemin)
+    cle = (os.path.abspath(chemin), infos.st_size, infos.st_mtime_ns)
+    if cle not in _empreintes_connues:
+        sha = hashlib.sha256()
+        with open(chemin, 'rb') as fichier:
+            for bloc in iter(lambda: fichier.read(1024 * 1024), b''):
+                sha.update(bloc)
+        _empreintes_connues[cle] = sha.hexdigest()
+    return _empreintes_connues[cle]
+
+
+def empreinte_sources(sources):
+    """Empreinte combinée du contenu de plusieurs fichiers ou dossiers"""
+    sha = hashlib.sha256(f'v{VERSION_CACHE}'.encode())
+    for source in sources:
+        if not os.path.exists(source):
+            continue
+        for chemin in _fichiers(source):
+            sha.update(os.path.relpath(chemin, source).encode())
+            sha.update(_empreinte_fichier(chemin).encode())
+    return sha.hexdigest()[:16]
+
+
+def chemin_table(nom, empreinte, dossier=DOSSIER_CACHE):
+    """Chemin du fichier Arrow d'une table pour une empreinte donnée"""
+    return os.path.join(dossier, empreinte, f'{nom}.arrow')
+
+
+def lire_arrow(nom, empreinte, dossier=DOSSIER_CACHE):
+    """Table Arrow en cache, mappée en mémoire (pages partagées entre processus), ou None si absente"""
+    chemin = chemin_table(nom, empreinte, dossier)
+    if not os.path.exists(chemin):
+        return None
+    with pa.memory_map(chemin, 'r') as source:
+        return ipc.open_file(source).read_all()
+
+
+def vue_pandas(table):
+    """DataFrame sans copie sur une table Arrow mappée : colonnes en lecture seule (un bloc par colonne)"""
+    return table.to_pandas(split_blocks=True)
+
+
+def lire_table(nom, empreinte, dossier=DOSSIER_CACHE):
+    """Table en cache (DataFrame en lecture seule sur le fichier mappé) ou None si absente"""
+    table = lire_arrow(nom, empreinte, dossier)
+    return None if table is None else vue_pandas(table)
+
+
+def ecrire_table(nom, df, empreinte, dossier=DOSSIER_CACHE):
+    """Écrit une table en Arrow IPC non compressé (lisible sans copie par memory-map)"""
+    chemin = chemin_table(nom, empreinte, dossier)
+    os.makedirs(os.path.dirname(chemin), exist_ok=True)
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    temporaire = chemin + '.tmp'
+    with pa.OSFile(temporaire, 'wb') as sortie:
+        with ipc.new_file(sortie, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(temporaire, chemin)
+    return chemin
+
+
+def en_cache(nom, construire, empreinte, dossier=DOSSIER_CACHE):
+    """Lit la table depuis le disque, ou la construit et l'écrit si elle est absente"""
+    df = lire_table(nom, empreinte, dossier)
+    if df is None:
+        df = construire()
+        ecrire_table(nom, df, empreinte, dossier)
+    return df
+
+
+def purger(empreinte_courante, dossier=DOSSIER_CACHE):
+    """Supprime les dossiers de cache des anciennes empreintes"""
+    if not os.path.isdir(dossier):
+        return []
+    supprimes = [nom for nom in os.listdir(dossier) if nom != empreinte_courante]
+    for nom in supprimes:
+        shutil.rmtree(os.path.join(dossier, nom), ignore_errors=True)
+    return supprimes
@@ -0,0 +1,72 @@
+# CARTE - AGRÉGATION GÉOGRAPHIQUE PAR NIVEAU DE DÉTAIL
+#
+# Les localisations sont regroupées dans les cellules d'une grille alignée
+# sur le geohash (précision 3 à 5). Chaque niveau de détail n'envoie au
+# navigateur que les cellules de sa précision (au plus LIMITE_CELLULES),
+# complétées par les N localisations exactes les plus importantes : la
+# taille de la carte ne dépend plus du nombre d'adresses. Streamlit ne
+# renvoie pas au serveur le zoom de la carte Plotly : le niveau est choisi
+# dans la sidebar et fixe le zoom initial.
+
+import numpy as np
+import pandas as pd
+
+# Libellé -> (précision geohash, zoom de la carte)
+NIVEAUX_DETAIL = {
+    'France (≈ 150 km)': (3, 5),
+    'Île-de-France (≈ 40 km)': (4, 7),
+    'Agglomération (≈ 5 km)': (5, 8)
+}
+NIVEAU_PAR_DEFAUT = 'Agglomération (≈ 5 km)'
+
+# Nombre maximal de cellules envoyées pour un niveau
+LIMITE_CELLULES = 2000
+
+
+def agreger_localisations(df, dimensions=()):
+    """Somme AGENT par localisation exacte (VILLE, LATITUDE, LONGITUDE), détaillée par dimensions"""
+    return df.groupby([*dimensions, 'VILLE', 'LATITUDE', 'LONGITUDE'], observed=True, dropna=False).agg({
+        'AGENT': 'sum'
+    }).reset_index().dropna(subset=['VILLE', 'LATITUDE', 'LONGITUDE'])
+
+
+def indices_geohash(latitude, longitude, precision):
+    """Identifiant entier de la cellule geohash (ligne, colonne) de chaque point"""
+    nb_bits = 5 * precision
+    bits_lat = nb_bits // 2
+    bits_lon = nb_bits - bits_lat
+
+    lignes = np.floor((np.asarray(latitude, dtype=float) + 90) / 180 * 2 ** bits_lat)
+    colonnes = np.floor((np.asarray(longitude, dtype=float) + 180) / 360 * 2 ** bits_lon)
+    lignes = np.clip(lignes, 0, 2 ** bits_lat - 1).astype(np.int64)
+    colonnes = np.clip(colonnes, 0, 2 ** bits_lon - 1).astype(np.int64)
+    return (lignes << bits_lon) | colonnes
+
+
+def agreger_par_cellule(localisations, precision, limite=LIMITE_CELLULES):
+    """Cellules d'une précision : total d'agents, barycentre pondéré, localisation principale"""
+    data = pd.DataFrame({
+        'CELLULE': indices_geohash(localisations['LATITUDE'], localisations['LONGITUDE'], precision),
+        'VILLE': localisations['VILLE'].astype(str).to_numpy(),
+        'AGENT': localisations['AGENT'].to_numpy(),
+        'LAT_PONDEREE': localisations['LATITUDE'].to_numpy() * localisations['AGENT'].to_numpy(),
+        'LON_PONDEREE': localisations['LONGITUDE'].to_numpy() * localisations['AGENT'].to_numpy()
+    })
+
+    groupes = data.groupby('CELLULE', sort=False)
+    cellules = groupes[['AGENT', 'LAT_PONDEREE', 'LON_PONDEREE']].sum()
+    cellules['NB_LOCALISATIONS'] = groupes.size()
+    # Localisation la plus peuplée de chaque cellule (libellé de survol)
+    principales = data.sort_values('AGENT', ascending=False).drop_duplicates('CELLULE')
+    cellules['VILLE_PRINCIPALE'] = principales.set_index('CELLULE')['VILLE']
+
+    cellules['LATITUDE'] = cellules['LAT_PONDEREE'] / cellules['AGENT']
+    cellules['LONGITUDE'] = cellules['LON_PONDEREE'] / cellules['AGENT']
+    cellules = cellules.drop(columns=['LAT_PONDEREE', 'LON_PONDEREE'])
+
+    return cellules.nlargest(limite, 'AGENT').reset_index()
+
+
+def top_localisations(localisations, n=20):
+    """Les n localisations exactes les plus peuplées (surcouche de la carte)"""
+    return localisations.nlargest(n, 'AGENT')
@@ -0,0 +1,72 @@
+# CHARGEMENT DU JEU DE DONNÉES - COLONNES UTILES ET TYPES COMPACTS
+#
+# Seules les colonnes utilisées par l'application sont lues. Les colonnes
+# texte répétitives sont lues en dictionnaire (catégories pandas) et les
+# colonnes numériques sont réduites au plus petit type suffisant.
+#
+# Usage : python -m donnees.chargement   (compare la mémoire avant / après)
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+FICHIER_DONNEES = 'domiciliation_agents_nettoyee_et_enrichie.parquet'
+
+# Colonnes texte lues comme catégories (dictionnaire Arrow -> pd.Categorical)
+COLONNES_CATEGORIELLES = [
+    'VILLE',
+    'DIRECTION',
+    'DIRECTION_THEMATIQUE',
+    'CATEGORIE',
+    'SEXE',
+    'ZONE_SIMPLIFIEE'
+]
+
+# Colonnes numériques et leur type compact
+TYPES_NUMERIQUES = {
+    'DATE': 'int16',
+    'AGENT': 'int32',
+    'DISTANCE_PARIS_KM': 'float32',
+    'LATITUDE': 'float64',
+    'LONGITUDE': 'float64'
+}
+
+COLONNES_UTILISEES = ['DATE'] + COLONNES_CATEGORIELLES + [
+    'LATITUDE', 'LONGITUDE', 'DISTANCE_PARIS_KM', 'AGENT'
+]
+
+
+def optimiser_types(df):
+    """Convertit les colonnes connues en catégories et en types numériques compacts"""
+    conversions = {col: 'category' for col in COLONNES_CATEGORIELLES if col in df.columns}
+    conversions.update({col: type_ for col, type_ in TYPES_NUMERIQUES.items() if col in df.columns})
+    df = df.astype(conversions)
+
+    # Catégories triées : les groupby donnent le même ordre qu'avec des chaînes
+    for col in COLONNES_CATEGORIELLES:
+        if col in df.columns and not df[col].cat.categories.is_monotonic_increasing:
+            df[col] = df[col].cat.reorder_categories(df[col].cat.categories.sort_values())
+    return df
+
+
+def lire_parquet(chemin=FICHIER_DONNEES, colonnes=COLONNES_UTILISEES, filtres=None):
+    """Lit les colonnes demandées d'un fichier parquet, texte en dictionnaire"""
+    table = pq.read_table(
+        chemin,
+        columns=colonnes,
+        filters=filtres,
+        read_dictionary=[col for col in COLONNES_CATEGORIELLES if colonnes is None or col in colonnes]
+    )
+    return optimiser_types(table.to_pandas())
+
+
+def memoire_mo(df):
+    """Empreinte mémoire réelle d'un DataFrame en Mo (chaînes comprises)"""
+    return df.memory_usage(deep=True).sum() / 1024 ** 2
+
+
+if __name__ == '__main__':
+    avant = pd.read_parquet(FICHIER_DONNEES)
+    apres = lire_parquet()
+    print(f"Lecture complète  : {len(avant.columns):>2} colonnes, {memoire_mo(avant):8.1f} Mo")
+    print(f"Lecture optimisée : {len(apres.columns):>2} colonnes, {memoire_mo(apres):8.1f} Mo")
+    print(f"Réduction         : {(1 - memoire_mo(apres) / memoire_mo(avant)) * 100:.1f}%")
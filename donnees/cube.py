@@ -0,0 +1,134 @@
+# CUBE D'AGRÉGATION - SOMMES D'AGENTS PRÉCALCULÉES
+#
+# Le cube somme AGENT sur toutes les combinaisons de dimensions présentes
+# dans les données. Les pages répondent ensuite par roll-up (regroupement
+# sur un sous-ensemble de dimensions) au lieu de reparcourir le DataFrame.
+# Les mesures additives (lignes, sommes des distances) donnent aussi les
+# distances moyennes exactes de n'importe quelle sélection de cellules.
+# VILLE n'en fait pas partie : croisée avec les autres dimensions, elle
+# donnerait presque autant de cellules que de lignes. Les communes sont
+# comptées et classées depuis des tables à part (villes, localisations).
+
+import numpy as np
+import pandas as pd
+
+from donnees.bitmaps import bits_filtres, masque
+
+# Tranches de distance à Paris (km) : la dimension TRANCHE_DISTANCE vaut i
+# si BORNES_TRANCHES[i] <= distance < BORNES_TRANCHES[i + 1]
+BORNES_TRANCHES = [0, 5, 10, 20, 50, 100, 200, np.inf]
+TRANCHES_DISTANCE = [
+    f'{bas:g}-{haut:g} km' if np.isfinite(haut) else f'{bas:g} km et plus'
+    for bas, haut in zip(BORNES_TRANCHES[:-1], BORNES_TRANCHES[1:])
+]
+
+# Dimensions du cube, de la plus grossière à la plus fine
+DIMENSIONS_CUBE = [
+    'DATE',
+    'DIRECTION_THEMATIQUE',
+    'DIRECTION',
+    'CATEGORIE',
+    'SEXE',
+    'ZONE_SIMPLIFIEE',
+    'TRANCHE_DISTANCE'
+]
+
+# Mesures additives : agents, lignes, somme des distances pondérée par AGENT et non pondérée
+MESURES_CUBE = ['AGENT', 'LIGNES', 'DISTANCE_AGENTS', 'DISTANCE_LIGNES']
+
+# Modalités retenues dans les analyses (les autres valeurs sont ignorées)
+MODALITES = {
+    'CATEGORIE': ['A', 'B', 'C'],
+    'SEXE': ['FEMININ', 'MASCULIN']
+}
+
+
+def tranches_distance(distances):
+    """Numéro de tranche (BORNES_TRANCHES) de chaque distance, vectorisé"""
+    return np.digitize(np.asarray(distances, dtype=float), BORNES_TRANCHES[1:-1]).astype(np.int8)
+
+
+def preparer_lignes(df, dimensions=DIMENSIONS_CUBE):
+    """Colonnes du cube tirées de lignes brutes : dimensions (tranche de distance comprise) et mesures"""
+    distances = df['DISTANCE_PARIS_KM'].to_numpy(dtype=float)
+    colonnes = {dimension: df[dimension] for dimension in dimensions if dimension in df.columns}
+    colonnes.update({
+        'TRANCHE_DISTANCE': pd.Series(tranches_distance(distances), index=df.index),
+        'AGENT': df['AGENT'],
+        'LIGNES': pd.Series(np.ones(len(df), dtype=np.int64), index=df.index),
+        'DISTANCE_AGENTS': pd.Series(distances * df['AGENT'].to_numpy(), index=df.index),
+        'DISTANCE_LIGNES': pd.Series(distances, index=df.index)
+    })
+    # Sans copie des colonnes reprises (le jeu peut être une vue en lecture seule)
+    return pd.DataFrame(colonnes, copy=False)
+
+
+def construire_cube(df, dimensions=DIMENSIONS_CUBE):
+    """Agrège les mesures sur toutes les dimensions en un seul parcours (lignes brutes ou cube)"""
+    if 'LIGNES' not in df.columns:
+        df = preparer_lignes(df, dimensions)
+    cube = df.groupby(list(dimensions), observed=True, dropna=False)[MESURES_CUBE].sum()
+    return cube.reset_index()
+
+
+def masque_filtres(data, filtres):
+    """Masque booléen des lignes vérifiant tous les filtres {colonne: valeur ou liste}.
+
+    Les colonnes catégorielles sont comparées sur leurs codes, par une table de
+    correspondance code -> retenu ; le masque est combiné en place.
+    """
+    masque = np.ones(len(data), dtype=bool)
+    for colonne, valeur in filtres.items():
+        valeurs = list(valeur) if isinstance(valeur, (list, tuple, set)) else [valeur]
+        serie = data[colonne]
+        if isinstance(serie.dtype, pd.CategoricalDtype):
+            positions = serie.cat.categories.get_indexer(valeurs)
+            # Dernière case : code -1 (valeur manquante), jamais retenu
+            retenus = np.zeros(len(serie.cat.categories) + 1, dtype=bool)
+            retenus[positions[positions >= 0]] = True
+            masque &= retenus[serie.cat.codes.to_numpy()]
+        else:
+            masque &= np.isin(serie.to_numpy(), valeurs)
+    return masque
+
+
+def filtrer_cube(cube, filtres=None, index=None):
+    """Restreint le cube aux cellules vérifiant les filtres {colonne: valeur ou liste}.
+
+    Avec un index bitmap du cube (donnees/bitmaps.py), les filtres portant sur
+    au moins deux colonnes indexées se résolvent par opérations sur les bits.
+    Sinon, le cube étant trié par DATE, une année seule est prise comme
+    tranche (vue, sans copie) avant d'appliquer le masque des autres filtres.
+    """
+    if not filtres:
+        return cube
+
+    if index is not None and len(filtres.keys() & index['colonnes'].keys()) >= 2:
+        bits, autres = bits_filtres(index, filtres)
+        selection = masque(bits, len(cube))
+        if autres:
+            selection &= masque_filtres(cube, autres)
+        return cube[selection]
+
+    autres = dict(filtres)
+    annee = autres.get('DATE')
+    if annee is not None and not isinstance(annee, (list, tuple, set)):
+        dates = cube['DATE'].to_numpy()
+        if len(dates) and (dates[:-1] <= dates[1:]).all():
+            del autres['DATE']
+            cube = cube.iloc[np.searchsorted(dates, annee, 'left'):np.searchsorted(dates, annee, 'right')]
+    return cube[masque_filtres(cube, autres)] if autres else cube
+
+
+def agreger(cube, dimensions, filtres=None, index=None):
+    """Roll-up : somme d'AGENT par dimensions (Series), ou total si aucune dimension"""
+    data = filtrer_cube(cube, filtres, index)
+    if not dimensions:
+        return data['AGENT'].sum()
+    return data.groupby(list(dimensions), observed=True)['AGENT'].sum()
+
+
+def compter_distincts(cube, colonne, filtres=None, index=None):
+    """Nombre de valeurs distinctes d'une dimension parmi les cellules non vides"""
+    data = filtrer_cube(cube, filtres, index)
+    return data.loc[data['AGENT'] > 0, colonne].nunique()
@@ -0,0 +1,425 @@
+# TABLES DÉRIVÉES - REGISTRE ET ACCÈS VIA LE CACHE DISQUE
+#
+# Chaque table dérivée (agrégats par page, pivots, résumés de quantiles) a un
+# nom et une fonction de construction. obtenir_table() la lit depuis le cache
+# disque de l'empreinte courante des sources, ou la construit puis l'écrit.
+# Les constructeurs reçoivent obtenir_table pour s'appuyer sur d'autres
+# tables (la treemap et les séries temporelles se déduisent du cube, etc.).
+# En mode flux (donnees/flux.py), les tables qui lisent les lignes brutes sont
+# construites par lots à partir des agrégats fusionnables de tables_en_flux().
+# Avec le moteur Arrow (donnees/moteurs.py), leurs résultats partiels sont
+# calculés par des GROUP BY multi-threadés sur les colonnes utiles (tables_arrow()).
+# Le jeu de données lui-même est écrit une fois dans le cache et mappé en
+# mémoire : les processus du serveur en partagent les pages (donnees_partagees).
+# L'empreinte des sources est reprise pendant TTL_EMPREINTE secondes
+# (AGENTS_TTL_EMPREINTE) sans relire l'état de leurs fichiers, et le registre
+# des tables n'est construit qu'une fois par empreinte.
+
+import functools
+import os
+import shutil
+import time
+
+import numpy as np
+import pandas as pd
+
+from donnees.cache_disque import (
+    DOSSIER_CACHE, chemin_table, ecrire_table, empreinte_sources, en_cache, lire_arrow, lire_table, vue_pandas
+)
+from donnees.carte import NIVEAUX_DETAIL, agreger_localisations, agreger_par_cellule
+from donnees.chargement import FICHIER_DONNEES
+from donnees.cube import DIMENSIONS_CUBE, MESURES_CUBE, MODALITES, construire_cube, tranches_distance
+from donnees.flux import MODE_FLUX, agreger_en_flux, categoriser, concatener, finaliser, sommer, sommer_index
+from donnees import moteurs
+from donnees.instrumentation import compter_appel, compter_echec
+from donnees.partitions import DOSSIER_PARTITIONS, annees_disponibles, lire_annee, lire_annees, lire_donnees
+from donnees.ponderation import (
+    distribution_ponderee, histogramme_pondere, moyenne_ponderee, sommes_ponderees, statistiques_boite_ponderees
+)
+from donnees.quantiles import (
+    DIMENSIONS_SKETCH, DIMENSIONS_SKETCH_LONG, construire_sketches, construire_sketches_longs, fusionner,
+    sketches_vers_table
+)
+from donnees.series import construire_series
+from donnees.treemap import construire_hierarchie
+
+# Sources dont le contenu détermine l'empreinte du cache
+SOURCES = [FICHIER_DONNEES, DOSSIER_PARTITIONS]
+
+# Durée (s) pendant laquelle l'empreinte des sources est reprise sans relire l'état de leurs fichiers
+TTL_EMPREINTE = float(os.environ.get('AGENTS_TTL_EMPREINTE', 2))
+
+# Périodes de l'analyse post-COVID
+PRE_COVID = 'Pré-COVID (≤2019)'
+POST_COVID = 'Post-COVID (≥2020)'
+DERNIERE_ANNEE_PRE_COVID = 2019
+
+# Suffixe des tables de distance selon la pondération
+PONDERATIONS = {'agents': 'AGENT', 'lignes': None}
+
+# Intervalles de distance de la table agents_plus_50km
+BORNES_50KM = [0, 50, np.inf]
+
+# Dimensions filtrables des localisations détaillées (une table par année)
+DIMENSIONS_LOCALISATIONS = DIMENSIONS_CUBE[1:]
+
+
+def _periodes(df):
+    """Libellé de période de chaque ligne (vectorisé)"""
+    return pd.Series(
+        np.where(df['DATE'] <= DERNIERE_ANNEE_PRE_COVID, PRE_COVID, POST_COVID), index=df.index, name='Période'
+    )
+
+
+def _periode(annee):
+    """Libellé de période d'une année"""
+    return PRE_COVID if annee <= DERNIERE_ANNEE_PRE_COVID else POST_COVID
+
+
+def _tables_distance(suffixe, poids):
+    """Constructeurs des tables de distance pour une pondération"""
+    return {
+        f'sketches_distance_{suffixe}': lambda obtenir: sketches_vers_table(
+            *construire_sketches(obtenir('donnees'), poids=poids)
+        ),
+        f'sketches_filtrables_{suffixe}': lambda obtenir: construire_sketches_longs(obtenir('donnees'), poids=poids),
+        f'covid_distance_annuelle_{suffixe}': lambda obtenir: moyenne_ponderee(
+            obtenir('donnees'), ['DATE'], poids=poids
+        ).reset_index(),
+        f'covid_periodes_{suffixe}': lambda obtenir: statistiques_boite_ponderees(
+            obtenir('donnees'), [_periodes(obtenir('donnees'))], poids=poids
+        )
+    }
+
+
+def villes_annuelles(df):
+    """Agents par année et commune (DATE, VILLE, AGENT), pour compter les communes sans les croiser au cube"""
+    return df.groupby(['DATE', 'VILLE'], observed=True, sort=True, dropna=False)['AGENT'].sum().reset_index()
+
+
+def _plus_50km(histogramme):
+    """Agents au-delà de 50 km par année, depuis l'histogramme BORNES_50KM"""
+    return histogramme.iloc[:, -1].rename('AGENT').reset_index()
+
+
+def localisations_detaillees(df):
+    """Localisations exactes détaillées par DIMENSIONS_LOCALISATIONS (lignes brutes ou table détaillée)"""
+    if 'TRANCHE_DISTANCE' not in df.columns:
+        colonnes = [*DIMENSIONS_LOCALISATIONS[:-1], 'VILLE', 'LATITUDE', 'LONGITUDE', 'AGENT']
+        df = pd.DataFrame({
+            **{colonne: df[colonne] for colonne in colonnes},
+            'TRANCHE_DISTANCE': pd.Series(tranches_distance(df['DISTANCE_PARIS_KM'].to_numpy()), index=df.index)
+        }, copy=False)
+    return agreger_localisations(df, DIMENSIONS_LOCALISATIONS)
+
+
+def tables_carte(annee):
+    """Constructeurs des tables de la carte pour une année (ne lisent que sa partition)"""
+    tables = {
+        f'localisations_detail_{annee}': lambda obtenir: localisations_detaillees(lire_annee(annee)),
+        f'localisations_{annee}': lambda obtenir: agreger_localisations(obtenir(f'localisations_detail_{annee}')),
+        # Statistiques descriptives des lignes de l'année (index du describe en colonne STATISTIQUE)
+        f'description_{annee}': lambda obtenir: lire_annee(annee).describe().rename_axis('STATISTIQUE').reset_index()
+    }
+    for precision, _ in NIVEAUX_DETAIL.values():
+        tables[f'cellules_{annee}_p{precision}'] = lambda obtenir, precision=precision: agreger_par_cellule(
+            obtenir(f'localisations_{annee}'), precision
+        )
+    return tables
+
+
+def tables_derivees():
+    """Registre {nom: constructeur(obtenir)} de toutes les tables dérivées"""
+    tables = {
+        'cube': lambda obtenir: construire_cube(obtenir('donnees')),
+        'villes': lambda obtenir: villes_annuelles(obtenir('donnees')),
+        'treemap_thematiques': lambda obtenir: construire_hierarchie(obtenir('cube'))[0],
+        'treemap_directions': lambda obtenir: construire_hierarchie(obtenir('cube'))[1],
+        'series_temporelles': lambda obtenir: construire_series(obtenir('cube'), MODALITES),
+        'agents_plus_50km': lambda obtenir: _plus_50km(histogramme_pondere(obtenir('donnees'), BORNES_50KM, ['DATE']))
+    }
+    for suffixe, poids in PONDERATIONS.items():
+        tables.update(_tables_distance(suffixe, poids))
+    for annee in annees_disponibles():
+        tables.update(tables_carte(annee))
+    return tables
+
+
+# [instant du calcul, empreinte] de la dernière empreinte des sources
+_empreinte = [float('-inf'), None]
+
+
+def empreinte_courante(rafraichir=False):
+    """Empreinte des sources, recalculée au plus une fois par TTL_EMPREINTE secondes (ou sur demande)"""
+    maintenant = time.monotonic()
+    if rafraichir or maintenant - _empreinte[0] > TTL_EMPREINTE:
+        _empreinte[:] = [maintenant, empreinte_sources(SOURCES)]
+    return _empreinte[1]
+
+
+@functools.lru_cache(maxsize=1)
+def _registre(empreinte):
+    """Registre tables_derivees(), construit une fois par empreinte (les années disponibles en dépendent)"""
+    return tables_derivees()
+
+
+@functools.lru_cache(maxsize=1)
+def _table_donnees(empreinte, dossier):
+    """Jeu de données complet mappé en mémoire depuis le cache disque (écrit au premier appel, trié
+    par année) et position {année: (début, fin)} des lignes de chaque année"""
+    if not os.path.exists(chemin_table('donnees', empreinte, dossier)):
+        df = lire_donnees()
+        if not df['DATE'].is_monotonic_increasing:
+            df = df.sort_values('DATE', kind='stable', ignore_index=True)
+        ecrire_table('donnees', df, empreinte, dossier)
+        del df
+    table = lire_arrow('donnees', empreinte, dossier)
+    dates = table.column('DATE').to_numpy()
+    annees = np.unique(dates)
+    bornes = zip(np.searchsorted(dates, annees, 'left'), np.searchsorted(dates, annees, 'right'))
+    return table, {int(annee): (int(debut), int(fin)) for annee, (debut, fin) in zip(annees, bornes)}
+
+
+def donnees_partagees(annee=None, dossier=DOSSIER_CACHE):
+    """Jeu de données (ou lignes d'une année) en vue sans copie et en lecture seule sur le fichier
+    mappé : les processus du serveur partagent les mêmes pages mémoire"""
+    table, bornes = _table_donnees(empreinte_courante(), dossier)
+    if annee is not None:
+        debut, fin = bornes.get(int(annee), (0, 0))
+        table = table.slice(debut, fin - debut)
+    return vue_pandas(table)
+
+
+def obtenir_table(nom, dossier=DOSSIER_CACHE):
+    """Table dérivée depuis le cache disque, construite et écrite si absente"""
+    empreinte = empreinte_courante()
+    if nom == 'donnees':
+        return donnees_partagees(dossier=dossier)
+    compter_appel('cache_disque')
+    if not os.path.exists(chemin_table(nom, empreinte, dossier)):
+        compter_echec('cache_disque')
+        if MODE_FLUX:
+            construire_en_flux(nom, dossier)
+        elif moteurs.MOTEUR == 'arrow':
+            construire_avec_arrow(nom, dossier)
+    constructeur = _registre(empreinte)[nom]
+    return en_cache(nom, lambda: constructeur(obtenir_table), empreinte, dossier)
+
+
+# =============================================================================
+# MODE FLUX : MÊMES TABLES, CALCULÉES PAR LOTS
+# =============================================================================
+def _agregats_distance(poids):
+    """Agrégats fusionnables des tables de distance pour une pondération"""
+    return {
+        'sketches_distance': (
+            lambda lot: construire_sketches(lot, poids=poids),
+            lambda a, b: fusionner(
+                concatener([a[0], b[0]]), np.vstack([a[1], b[1]]), DIMENSIONS_SKETCH
+            ),
+            lambda sketches: sketches_vers_table(categoriser(sketches[0]), sketches[1])
+        ),
+        'sketches_filtrables': (
+            lambda lot: construire_sketches_longs(lot, poids=poids),
+            lambda a, b: sommer(a, b, [*DIMENSIONS_SKETCH_LONG, 'SEAU'], 'COMPTE'),
+            categoriser
+        ),
+        'covid_distance_annuelle': (
+            lambda lot: sommes_ponderees(lot, ['DATE'], poids=poids),
+            sommer_index,
+            lambda sommes: (sommes['PRODUIT'] / sommes['POIDS']).rename('DISTANCE_PARIS_KM').reset_index()
+        ),
+        # Quantiles exacts : somme des poids par (période, distance), fusionnable
+        'covid_periodes': (
+            lambda lot: distribution_ponderee(lot, [_periodes(lot)], poids=poids),
+            lambda a, b: sommer(a, b, ['Période', 'DISTANCE_PARIS_KM'], 'POIDS'),
+            lambda distribution: statistiques_boite_ponderees(distribution, ['Période'], poids='POIDS')
+        )
+    }
+
+
+def tables_en_flux():
+    """Agrégats des tables lues sur les lignes brutes, par parcours : {années lues (None : toutes) :
+    {nom: (partiel(lot), fusion(a, b), finale(résultat))}}.
+
+    Les autres tables se déduisent de celles-ci comme en mémoire.
+    """
+    toutes = {
+        'cube': (construire_cube, lambda a, b: sommer(a, b, DIMENSIONS_CUBE, MESURES_CUBE), categoriser),
+        'villes': (villes_annuelles, lambda a, b: sommer(a, b, ['DATE', 'VILLE'], 'AGENT'), categoriser),
+        'agents_plus_50km': (
+            lambda lot: histogramme_pondere(lot, BORNES_50KM, ['DATE']), sommer_index, _plus_50km
+        )
+    }
+    for suffixe, poids in PONDERATIONS.items():
+        toutes.update({f'{nom}_{suffixe}': agregat for nom, agregat in _agregats_distance(poids).items()})
+
+    parcours = {None: toutes}
+    for annee in annees_disponibles():
+        parcours[(annee,)] = {f'localisations_detail_{annee}': (
+            localisations_detaillees,
+            lambda a, b: localisations_detaillees(concatener([a, b])),
+            categoriser
+        )}
+    return parcours
+
+
+def construire_en_flux(nom, dossier=DOSSIER_CACHE):
+    """Construit par lots la table nom si elle est absente du cache.
+
+    Les autres tables absentes du même parcours sont calculées en même temps :
+    un seul passage sur les lignes remplit tout le groupe.
+    """
+    empreinte = empreinte_courante()
+    for annees, agregats in tables_en_flux().items():
+        if nom not in agregats or os.path.exists(chemin_table(nom, empreinte, dossier)):
+            continue
+        manquantes = {
+            autre: agregat for autre, agregat in agregats.items()
+            if not os.path.exists(chemin_table(autre, empreinte, dossier))
+        }
+        for autre, table in agreger_en_flux(manquantes, annees).items():
+            ecrire_table(autre, table, empreinte, dossier)
+
+
+# =============================================================================
+# MOTEUR ARROW : MÊMES AGRÉGATS, CALCULÉS PAR GROUP BY SUR LES COLONNES UTILES
+# =============================================================================
+def tables_arrow():
+    """Requêtes Arrow des agrégats de tables_en_flux(), par parcours : {années lues (None : toutes) :
+    {nom: (colonnes lues, partiel(table Arrow))}}. La mise en forme finale est celle du mode flux.
+    """
+    toutes = {
+        'cube': (
+            ['DATE', 'DIRECTION_THEMATIQUE', 'DIRECTION', 'CATEGORIE', 'SEXE', 'ZONE_SIMPLIFIEE',
+             'DISTANCE_PARIS_KM', 'AGENT'],
+            moteurs.cube
+        ),
+        'villes': (['DATE', 'VILLE', 'AGENT'], lambda table: moteurs.sommer_par(table, ['DATE', 'VILLE'], ['AGENT'])),
+        'agents_plus_50km': (
+            ['DATE', 'DISTANCE_PARIS_KM', 'AGENT'], lambda table: moteurs.histogramme(table, BORNES_50KM, ['DATE'])
+        )
+    }
+    for suffixe, poids in PONDERATIONS.items():
+        colonnes = ['DATE', 'DISTANCE_PARIS_KM'] + ([poids] if poids else [])
+        toutes.update({
+            f'sketches_distance_{suffixe}': (
+                colonnes + ['CATEGORIE', 'SEXE'],
+                lambda table, poids=poids: moteurs.sketches(table, DIMENSIONS_SKETCH, poids)
+            ),
+            f'sketches_filtrables_{suffixe}': (
+                colonnes + ['DIRECTION_THEMATIQUE', 'DIRECTION', 'CATEGORIE', 'SEXE', 'ZONE_SIMPLIFIEE'],
+                lambda table, poids=poids: moteurs.sketches_longs(table, DIMENSIONS_SKETCH_LONG, poids)
+            ),
+            f'covid_distance_annuelle_{suffixe}': (
+                colonnes, lambda table, poids=poids: moteurs.sommes_ponderees(table, ['DATE'], poids)
+            ),
+            f'covid_periodes_{suffixe}': (
+                colonnes, lambda table, poids=poids: moteurs.distribution_periodes(
+                    table, DERNIERE_ANNEE_PRE_COVID, (PRE_COVID, POST_COVID), poids
+                )
+            )
+        })
+
+    parcours = {None: toutes}
+    for annee in annees_disponibles():
+        parcours[(annee,)] = {f'localisations_detail_{annee}': (
+            [*DIMENSIONS_LOCALISATIONS[:-1], 'VILLE', 'LATITUDE', 'LONGITUDE', 'DISTANCE_PARIS_KM', 'AGENT'],
+            lambda table: moteurs.localisations(table, DIMENSIONS_LOCALISATIONS)
+        )}
+    return parcours
+
+
+def construire_avec_arrow(nom, dossier=DOSSIER_CACHE):
+    """Construit par le moteur Arrow la table nom si elle est absente du cache.
+
+    Les colonnes utiles de toutes les tables absentes du même parcours sont
+    lues ensemble, une seule fois.
+    """
+    empreinte = empreinte_courante()
+    flux = tables_en_flux()
+    for annees, requetes in tables_arrow().items():
+        if nom not in requetes or os.path.exists(chemin_table(nom, empreinte, dossier)):
+            continue
+        manquantes = {
+            autre: requete for autre, requete in requetes.items()
+            if not os.path.exists(chemin_table(autre, empreinte, dossier))
+        }
+        table = moteurs.lire_colonnes({colonne for colonnes, _ in manquantes.values() for colonne in colonnes}, annees)
+        for autre, (_, partiel) in manquantes.items():
+            resultat = finaliser({autre: flux[annees][autre]}, {autre: partiel(table)})
+            ecrire_table(autre, resultat[autre], empreinte, dossier)
+
+
+# =============================================================================
+# MISE À JOUR INCRÉMENTALE APRÈS L'AJOUT D'ANNÉES
+# =============================================================================
+def tables_par_groupe():
+    """Tables dont chaque ligne ne dépend que d'un groupe d'années.
+
+    nom -> (colonne portant le groupe dans la table, groupe d'une année)
+    """
+    par_annee = ('DATE', int)
+    tables = {'cube': par_annee, 'villes': par_annee, 'agents_plus_50km': par_annee}
+    for suffixe in PONDERATIONS:
+        tables[f'sketches_distance_{suffixe}'] = par_annee
+        tables[f'sketches_filtrables_{suffixe}'] = par_annee
+        tables[f'covid_distance_annuelle_{suffixe}'] = par_annee
+        tables[f'covid_periodes_{suffixe}'] = ('Période', _periode)
+    return tables
+
+
+def _copier_table(nom, ancienne_empreinte, empreinte, dossier):
+    """Reprend tel quel le fichier d'une table de l'ancien cache (lien physique si possible)"""
+    source, cible = chemin_table(nom, ancienne_empreinte, dossier), chemin_table(nom, empreinte, dossier)
+    os.makedirs(os.path.dirname(cible), exist_ok=True)
+    if os.path.exists(cible):
+        os.remove(cible)
+    try:
+        os.link(source, cible)
+    except OSError:
+        shutil.copyfile(source, cible)
+
+
+def mettre_a_jour_tables(annees, ancienne_empreinte, dossier=DOSSIER_CACHE):
+    """Met à jour le cache après l'ajout (ou le remplacement) des partitions de annees.
+
+    Les tables des autres années sont reprises telles quelles ; dans les tables
+    de tables_par_groupe(), seules les lignes des groupes touchés sont
+    recalculées, à partir des seules partitions de ces groupes ; les tables
+    déduites du cube sont reconstruites depuis le cube mis à jour. Sans ancien
+    cache, la table est construite entièrement.
+    Retourne {nom: (mode, durée en secondes)}.
+    """
+    # Partitions tout juste réécrites : l'empreinte mémorisée n'est plus valable
+    empreinte = empreinte_courante(rafraichir=True)
+    annees = {int(annee) for annee in annees}
+    disponibles = annees_disponibles()
+    inchangees = {nom for annee in disponibles if annee not in annees for nom in tables_carte(annee)}
+    par_groupe = tables_par_groupe()
+
+    bilan = {}
+    for nom, constructeur in tables_derivees().items():
+        debut = time.perf_counter()
+        existe = os.path.exists(chemin_table(nom, ancienne_empreinte, dossier))
+        if ancienne_empreinte == empreinte:
+            # Partitions réécrites à l'identique : le cache est toujours valable
+            obtenir_table(nom, dossier)
+            mode = 'inchangée'
+        elif existe and nom in inchangees:
+            _copier_table(nom, ancienne_empreinte, empreinte, dossier)
+            mode = 'reprise'
+        elif existe and nom in par_groupe:
+            colonne, groupe = par_groupe[nom]
+            touches = {groupe(annee) for annee in annees}
+            donnees = lire_annees([annee for annee in disponibles if groupe(annee) in touches])
+            nouvelle = constructeur(lambda source: donnees if source == 'donnees' else obtenir_table(source, dossier))
+            ancienne = lire_table(nom, ancienne_empreinte, dossier)
+            table = concatener([ancienne[~ancienne[colonne].isin(touches)], nouvelle])
+            ecrire_table(nom, table.sort_values(colonne, kind='stable', ignore_index=True), empreinte, dossier)
+            mode = 'mise à jour'
+        else:
+            obtenir_table(nom, dossier)
+            mode = 'reconstruite'
+        bilan[nom] = (mode, time.perf_counter() - debut)
+    return bilan
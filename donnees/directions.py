@@ -0,0 +1,69 @@
+# RÉFÉRENTIEL DES DIRECTIONS DE LA VILLE DE PARIS
+
+# Mapping des directions vers leurs catégories thématiques avec noms complets
+DIRECTION_MAPPING = {
+    'Education & Jeunesse': {
+        'DAE': 'Direction des Affaires Scolaires',
+        'DASCO': 'Direction des Affaires Scolaires',
+        'DJS': 'Direction de la Jeunesse et des Sports',
+        'DPJEV': 'Direction des Politiques Jeunesse, Éducation et Vie associative',
+        'AUT.ADM.PARIS.EPPM': 'Établissements Publics Parisiens'
+    },
+    'Urbanisme & Environnement': {
+        'DVD': 'Direction de la Voirie et des Déplacements',
+        'DEVE': 'Direction des Espaces Verts et de l\'Environnement',
+        'DU': 'Direction de l\'Urbanisme',
+        'DILT': 'Direction de l\'Immobilier, de la Logistique et des Transports',
+        'DLH': 'Direction du Logement et de l\'Habitat',
+        'DPE': 'Direction de la Propreté et de l\'Eau',
+        'DPA': 'Direction de la Propreté et des Achats',
+        'DPP': 'Direction du Patrimoine et de l\'Architecture',
+        'DTEC': 'Direction Technique'
+    },
+    'Social & Santé': {
+        'DASES': 'Direction de l\'Action Sociale, de l\'Enfance et de la Santé',
+        'DAS': 'Direction de l\'Action Sociale',
+        'DSOL': 'Direction de la Solidarité',
+        'AUT.ADM.PARIS.CASVP': 'Centre d\'Action Sociale de la Ville de Paris',
+        'CASVP': 'Centre d\'Action Sociale de la Ville de Paris'
+    },
+    'Culture & Citoyenneté': {
+        'DAC': 'Direction des Affaires Culturelles',
+        'DCPA': 'Direction de la Citoyenneté, de la Participation et de l\'Action citoyenne',
+        'DDCT': 'Direction de la Démocratie, des Citoyen·ne·s et des Territoires',
+        'DDEEES': 'Direction du Développement Économique, de l\'Emploi et de l\'Enseignement Supérieur'
+    },
+    'Administration & RH': {
+        'DRH': 'Direction des Ressources Humaines',
+        'GESTION RH': 'Gestion des Ressources Humaines',
+        'SG': 'Secrétariat Général',
+        'DSTI': 'Direction des Systèmes et Technologies de l\'Information',
+        'DSIN': 'Direction des Systèmes d\'Information et du Numérique',
+        'DSP': 'Direction de la Sécurité de Proximité',
+        'DPSP': 'Direction de la Prévention, de la Sécurité et de la Protection',
+        'DPMP': 'Direction de la Prévention, de la Mission de Préfiguration'
+    },
+    'Finances & Juridique': {
+        'DFA': 'Direction des Finances et des Achats',
+        'DFPE': 'Direction des Finances, des Achats et de l\'Immobilier',
+        'DAJ': 'Direction des Affaires Juridiques',
+        'DICOM': 'Direction de l\'Information et de la Communication'
+    },
+    'Cabinet & Gouvernance': {
+        'CABINET DE LA MAIRIE': 'Cabinet de la Mairie',
+        'CABINET DU MAIRE': 'Cabinet du Maire'
+    },
+    'Administration Départementale': {
+        'ADMINISTRATION DEPARTEMENTALE': 'Administration Départementale',
+        'AUTRES ADMIN. PARIS.': 'Autres administrations parisiennes'
+    }
+}
+
+# Index inverse sigle -> nom complet (premier thème rencontré, comme la recherche linéaire d'origine)
+NOMS_DIRECTIONS = {}
+# Index inverse sigle -> catégorie thématique
+THEMATIQUE_PAR_DIRECTION = {}
+for _thematique, _directions in DIRECTION_MAPPING.items():
+    for _sigle, _nom in _directions.items():
+        NOMS_DIRECTIONS.setdefault(_sigle, _nom)
+        THEMATIQUE_PAR_DIRECTION.setdefault(_sigle, _thematique)
@@ -0,0 +1,50 @@
+# ENRICHISSEMENT DES LIGNES NETTOYÉES - COLONNES DÉRIVÉES
+#
+# Règles qui produisent, à partir des colonnes d'un export brut, les colonnes
+# ajoutées au jeu de données : thématique de la direction, niveau de la
+# catégorie, zone simplifiée et distance à Paris. Tout est vectorisé.
+
+import numpy as np
+
+from donnees.directions import THEMATIQUE_PAR_DIRECTION
+
+NON_RENSEIGNE = 'NON RENSEIGNÉ'
+
+# Directions absentes du référentiel
+THEMATIQUE_PAR_DEFAUT = 'Autres'
+
+# Catégorie -> (CATEGORIE_NUM, NIVEAU_QUALIFICATION) ; autre valeur : (0, NON RENSEIGNÉ)
+NIVEAUX_CATEGORIE = {
+    'A': (3, 'CADRE / SUPÉRIEUR'),
+    'B': (2, 'INTERMÉDIAIRE'),
+    'C': (1, 'EXÉCUTION')
+}
+
+# Hôtel de Ville de Paris et rayon terrestre moyen
+LATITUDE_PARIS = 48.8566
+LONGITUDE_PARIS = 2.3522
+RAYON_TERRE_KM = 6371.0
+
+
+def distance_paris_km(latitude, longitude):
+    """Distance à vol d'oiseau (haversine) jusqu'au centre de Paris, en km arrondis au centième"""
+    lat = np.radians(np.asarray(latitude, dtype=float))
+    lon = np.radians(np.asarray(longitude, dtype=float))
+    lat_paris, lon_paris = np.radians(LATITUDE_PARIS), np.radians(LONGITUDE_PARIS)
+    a = (np.sin((lat - lat_paris) / 2) ** 2
+         + np.cos(lat) * np.cos(lat_paris) * np.sin((lon - lon_paris) / 2) ** 2)
+    return np.round(2 * RAYON_TERRE_KM * np.arcsin(np.sqrt(a)), 2)
+
+
+def enrichir(df):
+    """Ajoute DIRECTION_THEMATIQUE, CATEGORIE_NUM, NIVEAU_QUALIFICATION, ZONE_SIMPLIFIEE et DISTANCE_PARIS_KM"""
+    categories = df['CATEGORIE'].astype(str)
+    return df.assign(
+        DIRECTION_THEMATIQUE=df['DIRECTION'].astype(str).map(THEMATIQUE_PAR_DIRECTION).fillna(THEMATIQUE_PAR_DEFAUT),
+        CATEGORIE_NUM=categories.map({cat: num for cat, (num, _) in NIVEAUX_CATEGORIE.items()}).fillna(0).astype('int64'),
+        NIVEAU_QUALIFICATION=categories.map(
+            {cat: niveau for cat, (_, niveau) in NIVEAUX_CATEGORIE.items()}
+        ).fillna(NON_RENSEIGNE),
+        ZONE_SIMPLIFIEE=np.where(df['ZONE'].astype(str) == 'PARIS', 'PARIS', 'HORS PARIS'),
+        DISTANCE_PARIS_KM=distance_paris_km(df['LATITUDE'], df['LONGITUDE'])
+    )
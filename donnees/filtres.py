@@ -0,0 +1,60 @@
+# FILTRES GLOBAUX - SÉLECTION COMMUNE À TOUTES LES PAGES
+#
+# Les critères de la sidebar (plage d'années, modalités des dimensions,
+# tranches de distance) sont ramenés à un tuple trié de (colonne, valeurs) :
+# hachable, il sert de clé de mémoïsation aux requêtes (donnees/requetes.py)
+# et deux sélections équivalentes partagent le même résultat. Le tuple vide
+# (aucun filtre) sert les tables exactes précalculées ; sinon chaque requête
+# se résout sur des structures précalculées (cube et index bitmap, sketches
+# en format long, localisations détaillées), jamais sur les lignes brutes.
+
+import numpy as np
+
+from donnees.cube import masque_filtres, tranches_distance
+
+# Dimensions proposées dans la sidebar, en plus des années et des tranches de distance
+DIMENSIONS_FILTRES = ['DIRECTION_THEMATIQUE', 'DIRECTION', 'CATEGORIE', 'SEXE', 'ZONE_SIMPLIFIEE']
+
+
+def construire_filtres(annees=None, tranches=None, **modalites):
+    """Filtres normalisés : tuple trié de (colonne, tuple de valeurs).
+
+    annees : années retenues (None : toutes) ; tranches : numéros de TRANCHES_DISTANCE
+    (None : toutes) ; modalites : {colonne: valeurs}, une liste vide ne filtre pas.
+    """
+    filtres = {}
+    if annees is not None:
+        filtres['DATE'] = tuple(sorted(int(annee) for annee in annees))
+    if tranches is not None:
+        filtres['TRANCHE_DISTANCE'] = tuple(sorted(int(tranche) for tranche in tranches))
+    for colonne, valeurs in modalites.items():
+        if valeurs:
+            filtres[colonne] = tuple(sorted(valeurs))
+    return tuple(sorted(filtres.items()))
+
+
+def restreindre(filtres, contraintes):
+    """Filtres {colonne: valeurs} des filtres globaux complétés par contraintes (intersection par colonne)"""
+    resultat = dict(filtres)
+    for colonne, valeurs in contraintes.items():
+        valeurs = tuple(valeurs) if isinstance(valeurs, (list, tuple, set)) else (valeurs,)
+        if colonne in resultat:
+            valeurs = tuple(valeur for valeur in resultat[colonne] if valeur in valeurs)
+        resultat[colonne] = valeurs
+    return resultat
+
+
+def annees_retenues(filtres, annees):
+    """Années de annees conservées par les filtres, dans l'ordre d'origine"""
+    retenues = dict(filtres).get('DATE')
+    return [annee for annee in annees if retenues is None or annee in retenues]
+
+
+def masque_lignes(df, filtres):
+    """Masque des lignes brutes vérifiant les filtres (la tranche est déduite de la distance)"""
+    autres = dict(filtres)
+    tranches = autres.pop('TRANCHE_DISTANCE', None)
+    masque = masque_filtres(df, autres)
+    if tranches is not None:
+        masque &= np.isin(tranches_distance(df['DISTANCE_PARIS_KM'].to_numpy()), tranches)
+    return masque
@@ -0,0 +1,176 @@
+# MODE FLUX - AGRÉGATS PAR LOTS POUR LES JEUX PLUS GRANDS QUE LA MÉMOIRE
+#
+# Au lieu de charger toutes les lignes dans un DataFrame, les partitions sont
+# parcourues par lots (record batches Arrow) de TAILLE_LOT lignes. Chaque
+# table dérivée est décrite par un agrégat fusionnable : un résultat partiel
+# calculé sur un lot, une fusion de deux partiels et une mise en forme finale
+# (voir tables_en_flux() dans donnees/derives.py). Le pic de mémoire dépend de
+# la taille des lots et des résultats, plus du nombre total de lignes.
+#
+# Activation : variable d'environnement AGENTS_MODE_FLUX=1 (taille des lots :
+# AGENTS_TAILLE_LOT), pour l'application comme pour le préchauffage.
+#
+# Usage : python -m donnees.flux [--taille-lot N]
+#         (construit les tables par lots et les compare au calcul en mémoire)
+
+import os
+import resource
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from donnees.chargement import COLONNES_CATEGORIELLES, COLONNES_UTILISEES, FICHIER_DONNEES, optimiser_types
+from donnees.partitions import CLE_PARTITION, DOSSIER_PARTITIONS, ouvrir_dataset
+
+MODE_FLUX = os.environ.get('AGENTS_MODE_FLUX', '') == '1'
+TAILLE_LOT = int(os.environ.get('AGENTS_TAILLE_LOT', 65_536))
+
+
+def lots(annees=None, dossier=DOSSIER_PARTITIONS, colonnes=COLONNES_UTILISEES,
+         taille_lot=TAILLE_LOT, source=FICHIER_DONNEES):
+    """Lignes des années demandées (toutes si None), lot par lot, en DataFrames aux types compacts"""
+    annees = None if annees is None else [int(annee) for annee in annees]
+    if os.path.isdir(dossier):
+        filtre = None if annees is None else ds.field(CLE_PARTITION).isin(annees)
+        batches = ouvrir_dataset(dossier).to_batches(columns=colonnes, filter=filtre, batch_size=taille_lot)
+    else:
+        # Fichier unique : filtre sur l'année appliqué à chaque lot
+        batches = pq.ParquetFile(source, read_dictionary=COLONNES_CATEGORIELLES).iter_batches(
+            batch_size=taille_lot, columns=colonnes
+        )
+    for batch in batches:
+        lot = optimiser_types(batch.to_pandas())
+        if annees is not None and not os.path.isdir(dossier):
+            lot = lot[lot[CLE_PARTITION].isin(annees)]
+        if len(lot):
+            yield lot
+
+
+def categoriser(df):
+    """Colonnes texte des résultats fusionnés remises en catégories triées (comme un calcul en mémoire)"""
+    # Valeurs triées comme du texte ; pd.Categorical recode aussi une colonne déjà catégorielle
+    # (astype() la laisserait telle quelle : deux catégories non ordonnées de mêmes valeurs sont égales)
+    conversions = {
+        colonne: pd.Categorical(
+            df[colonne], categories=pd.Index(np.asarray(df[colonne].dropna().unique())).sort_values()
+        )
+        for colonne in COLONNES_CATEGORIELLES if colonne in df.columns
+    }
+    return df.assign(**conversions)
+
+
+def concatener(morceaux):
+    """Empile des morceaux d'une table, catégories unifiées (et triées) pour rester catégorielles"""
+    morceaux = list(morceaux)
+    categorielles = [
+        colonne for colonne in morceaux[0].columns if isinstance(morceaux[0][colonne].dtype, pd.CategoricalDtype)
+    ]
+    table = pd.concat([morceau.drop(columns=categorielles) for morceau in morceaux], ignore_index=True)
+    for colonne in categorielles:
+        # Union par recodage des codes, sans repasser par les chaînes
+        table[colonne] = union_categoricals([morceau[colonne] for morceau in morceaux], sort_categories=True)
+    return table[morceaux[0].columns]
+
+
+def sommer(a, b, cles, valeurs):
+    """Fusion de deux partiels par somme des colonnes valeurs à clés égales"""
+    return concatener([a, b]).groupby(cles, observed=True, sort=True, dropna=False)[valeurs].sum().reset_index()
+
+
+def sommer_index(a, b):
+    """Fusion de deux partiels indexés par leurs groupes, par somme des colonnes"""
+    return pd.concat([a, b]).groupby(level=list(range(a.index.nlevels)), sort=True).sum()
+
+
+def agreger_partiels(agregats, annees=None, taille_lot=TAILLE_LOT, dossier=DOSSIER_PARTITIONS):
+    """Résultats partiels (avant mise en forme) de plusieurs agrégats, en un seul parcours des lots.
+
+    agregats : {nom: (partiel(lot), fusion(a, b), finale(resultat))} ; retourne {nom: partiel}.
+    """
+    resultats = {}
+    for lot in lots(annees, dossier, taille_lot=taille_lot):
+        for nom, (partiel, fusion, _) in agregats.items():
+            resultat = partiel(lot)
+            resultats[nom] = resultat if nom not in resultats else fusion(resultats[nom], resultat)
+        del lot
+    return resultats
+
+
+def fusionner_partiels(agregats, partiels):
+    """Fusionne les partiels {nom: partiel} de plusieurs parcours (d'autres années, d'autres processus).
+
+    Fusion deux à deux, dans l'ordre : chaque ligne n'est regroupée que log2(n) fois.
+    """
+    resultats = {}
+    for nom, (_, fusion, _) in agregats.items():
+        morceaux = [partiel[nom] for partiel in partiels if nom in partiel]
+        while len(morceaux) > 1:
+            morceaux = [
+                fusion(*morceaux[i:i + 2]) if i + 1 < len(morceaux) else morceaux[i]
+                for i in range(0, len(morceaux), 2)
+            ]
+        if morceaux:
+            resultats[nom] = morceaux[0]
+    return resultats
+
+
+def finaliser(agregats, resultats):
+    """Mise en forme finale des résultats fusionnés : {nom: table}"""
+    return {nom: agregats[nom][2](resultat) for nom, resultat in resultats.items()}
+
+
+def agreger_en_flux(agregats, annees=None, taille_lot=TAILLE_LOT, dossier=DOSSIER_PARTITIONS):
+    """Calcule plusieurs agrégats en un seul parcours des lots : {nom: table}"""
+    return finaliser(agregats, agreger_partiels(agregats, annees, taille_lot, dossier))
+
+
+def _tables_egales(a, b):
+    """Même contenu aux arrondis flottants près (les sommes par lots changent l'ordre des additions)"""
+    if isinstance(a, pd.DataFrame) and 'COMPTES' in a.columns:
+        from donnees.quantiles import table_vers_sketches
+        (cellules_a, comptes_a), (cellules_b, comptes_b) = table_vers_sketches(a), table_vers_sketches(b)
+        return _tables_egales(cellules_a, cellules_b) and (comptes_a == comptes_b).all()
+    try:
+        pd.testing.assert_frame_equal(
+            a.reset_index(drop=True), b.reset_index(drop=True), check_dtype=False, check_categorical=False
+        )
+    except AssertionError:
+        return False
+    return True
+
+
+if __name__ == '__main__':
+    from donnees.derives import tables_derivees, tables_en_flux
+    from donnees.partitions import lire_donnees
+
+    taille_lot = int(sys.argv[sys.argv.index('--taille-lot') + 1]) if '--taille-lot' in sys.argv else TAILLE_LOT
+    rss = lambda: resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+    # Par lots d'abord : le pic de mémoire relevé ensuite n'inclut pas le jeu complet
+    rss_depart = rss()
+    debut = time.perf_counter()
+    en_flux = {}
+    for annees, agregats in tables_en_flux().items():
+        en_flux.update(agreger_en_flux(agregats, annees, taille_lot))
+    duree_flux = time.perf_counter() - debut
+    rss_flux = rss()
+
+    debut = time.perf_counter()
+    donnees = lire_donnees()
+    constructeurs = tables_derivees()
+    en_memoire = {
+        nom: constructeurs[nom](lambda source: donnees if source == 'donnees' else None) for nom in en_flux
+    }
+    duree_memoire = time.perf_counter() - debut
+
+    print(f"Par lots de {taille_lot:,} lignes : {duree_flux:.2f} s, pic {rss_flux:.0f} Mo "
+          f"(+{rss_flux - rss_depart:.0f} Mo)")
+    print(f"En mémoire ({len(donnees):,} lignes) : {duree_memoire:.2f} s, pic {rss():.0f} Mo")
+    differentes = [nom for nom in en_flux if not _tables_egales(en_flux[nom], en_memoire[nom])]
+    print(f"{len(en_flux) - len(differentes)} / {len(en_flux)} tables identiques"
+          + (f" ; différentes : {', '.join(differentes)}" if differentes else ''))
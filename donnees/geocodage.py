@@ -0,0 +1,189 @@
+# GÉOCODAGE HORS LIGNE DES COMMUNES - RÉFÉRENTIEL LOCAL ET CACHE PERSISTANT
+#
+# Les coordonnées d'une ligne sont cherchées dans un référentiel local des
+# communes (CODE POSTAL ; VILLE ; LATITUDE ; LONGITUDE) par index haché sur une
+# clé normalisée « code postal|commune » ; à défaut sur le code postal seul
+# (les coordonnées publiées sont celles du code postal) ; à défaut sur la
+# commune seule quand son nom est sans ambiguïté. Seuls les couples distincts
+# sont normalisés et cherchés, jamais les lignes une à une.
+# Les résolutions sont conservées sur disque, par empreinte du référentiel :
+# une nouvelle exécution ne cherche que les couples jamais vus. Aucun accès
+# réseau.
+#
+# Le référentiel est construit une fois depuis la base officielle des codes
+# postaux de La Poste, dans sa version avec coordonnées publiée sur
+# data.gouv.fr (« Communes de France - Base des codes postaux »,
+# communes-departement-region.csv), à télécharger à part : il couvre toutes les
+# communes, y compris celles absentes des publications déjà ingérées. Il n'est
+# pas versionné ; sans lui, le géocodage échoue plutôt que de deviner.
+#
+# Usage : python -m donnees.geocodage [--construire-referentiel BASE_CODES_POSTAUX.csv]
+#         (recalcule coordonnées et distances du jeu existant et les compare)
+
+import functools
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from donnees.cache_disque import empreinte_sources
+from donnees.enrichissement import distance_paris_km
+
+FICHIER_REFERENTIEL = 'referentiel_communes.csv'
+DOSSIER_GEOCODAGE = '.cache_geocodage'
+
+# Colonnes lues dans la base officielle des codes postaux -> colonnes du référentiel
+COLONNES_SOURCE = {
+    'code_postal': 'CODE POSTAL',
+    'nom_commune_postal': 'VILLE',
+    'latitude': 'LATITUDE',
+    'longitude': 'LONGITUDE'
+}
+
+# Manière dont chaque couple a été résolu (None : introuvable)
+METHODES = ['code postal et commune', 'code postal', 'commune']
+
+
+def normaliser_communes(noms):
+    """Noms de communes comparables : majuscules sans accents, ponctuation et espaces multiples"""
+    return (
+        pd.Series(noms, dtype='string')
+        .str.normalize('NFKD').str.encode('ascii', 'ignore').str.decode('ascii')
+        .str.upper()
+        .str.replace(r'[^A-Z0-9]+', ' ', regex=True)
+        .str.strip()
+    )
+
+
+def normaliser_codes_postaux(codes):
+    """Codes postaux sur 5 caractères (zéro initial perdu dans les exports : 2600 -> 02600)"""
+    return pd.Series(codes, dtype='string').str.strip().str.zfill(5)
+
+
+def _cles(codes_postaux, communes):
+    return normaliser_codes_postaux(codes_postaux) + '|' + normaliser_communes(communes)
+
+
+def construire_referentiel(source, chemin=FICHIER_REFERENTIEL):
+    """Écrit le référentiel des communes depuis la base officielle des codes postaux (COLONNES_SOURCE).
+
+    Une ligne par couple code postal / commune ; les communes sans coordonnées sont écartées.
+    """
+    base = pd.read_csv(source, dtype=str, encoding='utf-8-sig')
+    manquantes = [colonne for colonne in COLONNES_SOURCE if colonne not in base.columns]
+    if manquantes:
+        raise ValueError(f"Colonnes absentes de la base des codes postaux : {', '.join(manquantes)}")
+    referentiel = base[list(COLONNES_SOURCE)].rename(columns=COLONNES_SOURCE)
+    referentiel['CODE POSTAL'] = normaliser_codes_postaux(referentiel['CODE POSTAL'])
+    for colonne in ['LATITUDE', 'LONGITUDE']:
+        referentiel[colonne] = pd.to_numeric(referentiel[colonne], errors='coerce')
+    referentiel = (
+        referentiel.dropna(subset=['LATITUDE', 'LONGITUDE'])
+        .drop_duplicates(['CODE POSTAL', 'VILLE'])
+        .sort_values(['CODE POSTAL', 'VILLE'])
+    )
+    referentiel.to_csv(chemin, sep=';', index=False)
+    return len(referentiel)
+
+
+@functools.lru_cache(maxsize=2)
+def _index_referentiel(chemin, empreinte):
+    """Index hachés du référentiel : (clé complète, code postal, commune sans ambiguïté) -> coordonnées"""
+    referentiel = pd.read_csv(chemin, sep=';', dtype={'CODE POSTAL': str, 'VILLE': str})
+    referentiel = referentiel.dropna(subset=['LATITUDE', 'LONGITUDE'])
+    codes = normaliser_codes_postaux(referentiel['CODE POSTAL']).to_numpy()
+    communes = normaliser_communes(referentiel['VILLE']).to_numpy()
+    coordonnees = referentiel[['LATITUDE', 'LONGITUDE']].to_numpy(dtype=float)
+
+    par_cle = pd.DataFrame(coordonnees, index=pd.Index(codes + '|' + communes)).groupby(level=0).first()
+    # Code postal seul : centre des communes qui le partagent
+    par_code = pd.DataFrame(coordonnees, index=pd.Index(codes)).groupby(level=0).mean()
+    par_commune = pd.DataFrame(coordonnees, index=pd.Index(communes)).groupby(level=0).agg(['first', 'nunique'])
+    sans_ambiguite = (par_commune.xs('nunique', axis=1, level=1) == 1).all(axis=1)
+    par_commune = par_commune.xs('first', axis=1, level=1)[sans_ambiguite]
+    return par_cle, par_code, par_commune
+
+
+def resoudre(cles, referentiel=FICHIER_REFERENTIEL):
+    """Coordonnées de clés « code postal|commune » distinctes : DataFrame LATITUDE, LONGITUDE, METHODE"""
+    if not os.path.exists(referentiel):
+        raise FileNotFoundError(
+            f"Référentiel des communes absent ({referentiel}) : le construire par python -m donnees.geocodage "
+            "--construire-referentiel BASE_CODES_POSTAUX.csv"
+        )
+    index = _index_referentiel(referentiel, empreinte_sources([referentiel]))
+    cles = pd.Index(cles)
+    codes = cles.str.slice(0, 5)
+    communes = cles.str.slice(6)
+
+    resultat = np.full((len(cles), 2), np.nan)
+    methode = np.full(len(cles), None, dtype=object)
+    for table, recherche, nom in zip(index, [cles, codes, communes], METHODES):
+        positions = table.index.get_indexer(recherche)
+        a_remplir = (positions >= 0) & pd.isna(methode)
+        resultat[a_remplir] = table.to_numpy()[positions[a_remplir]]
+        methode[a_remplir] = nom
+
+    return pd.DataFrame({
+        'LATITUDE': resultat[:, 0],
+        'LONGITUDE': resultat[:, 1],
+        'METHODE': methode
+    }, index=cles)
+
+
+def _chemin_cache(referentiel, dossier):
+    return os.path.join(dossier, f'{empreinte_sources([referentiel])}.parquet')
+
+
+def geocoder(codes_postaux, communes, referentiel=FICHIER_REFERENTIEL, dossier=DOSSIER_GEOCODAGE):
+    """Coordonnées de chaque ligne (DataFrame LATITUDE, LONGITUDE, METHODE aligné sur l'entrée)
+    et nombre de couples cherchés dans le référentiel.
+
+    Les couples déjà résolus sont relus depuis le cache disque ; les autres sont
+    cherchés dans le référentiel puis ajoutés au cache.
+    """
+    # Couples distincts : la normalisation et la recherche ne portent que sur eux
+    codes_lignes, couples = pd.MultiIndex.from_arrays([
+        pd.Series(codes_postaux).astype(str).to_numpy(), pd.Series(communes).astype(str).to_numpy()
+    ]).factorize()
+    cles = _cles(couples.get_level_values(0), couples.get_level_values(1))
+
+    chemin = _chemin_cache(referentiel, dossier)
+    cache = pd.read_parquet(chemin) if os.path.exists(chemin) else resoudre([], referentiel)
+    inconnues = pd.Index(cles.unique()).difference(cache.index)
+    if len(inconnues):
+        resolues = resoudre(inconnues, referentiel)
+        cache = resolues if cache.empty else pd.concat([cache, resolues])
+        os.makedirs(dossier, exist_ok=True)
+        cache.to_parquet(chemin + '.tmp')
+        os.replace(chemin + '.tmp', chemin)
+
+    par_couple = cache.iloc[cache.index.get_indexer(cles)]
+    return par_couple.iloc[codes_lignes].reset_index(drop=True), len(inconnues)
+
+
+if __name__ == '__main__':
+    from donnees.partitions import lire_donnees
+
+    if '--construire-referentiel' in sys.argv:
+        source = sys.argv[sys.argv.index('--construire-referentiel') + 1]
+        print(f"{construire_referentiel(source):,} communes écrites dans {FICHIER_REFERENTIEL}")
+
+    donnees = lire_donnees(colonnes=['CODE POSTAL', 'VILLE', 'LATITUDE', 'LONGITUDE', 'DISTANCE_PARIS_KM'])
+    debut = time.perf_counter()
+    coordonnees, nouvelles = geocoder(donnees['CODE POSTAL'], donnees['VILLE'])
+    distances = distance_paris_km(coordonnees['LATITUDE'], coordonnees['LONGITUDE'])
+    duree = time.perf_counter() - debut
+
+    print(f"{len(donnees):,} lignes géocodées en {duree * 1000:.0f} ms "
+          f"({nouvelles:,} couples code postal / commune cherchés, les autres lus dans {DOSSIER_GEOCODAGE}/)")
+    print(coordonnees['METHODE'].fillna('introuvable').value_counts().to_string())
+    ecarts = ~np.isclose(distances, donnees['DISTANCE_PARIS_KM'].to_numpy(), atol=0.005)
+    print(f"Distances identiques au jeu existant : {(1 - ecarts.mean()) * 100:.2f}%")
+    if ecarts.any():
+        print("Coordonnées du jeu existant les plus fréquentes parmi les écarts :")
+        print(donnees.loc[ecarts, ['CODE POSTAL', 'LATITUDE', 'LONGITUDE']]
+              .assign(**{'CODE POSTAL': lambda df: df['CODE POSTAL'].str.len().astype(str) + ' caractères'})
+              .value_counts().head(5).to_string())
@@ -0,0 +1,143 @@
+# INGESTION INCRÉMENTALE D'UNE NOUVELLE PUBLICATION ANNUELLE
+#
+# Un export brut (CSV Open Data Paris ou parquet) est nettoyé et enrichi avec
+# les mêmes règles que le jeu de données existant, puis écrit comme partition
+# DATE=AAAA/ sans toucher aux autres années. Le cache des tables dérivées est
+# ensuite mis à jour à partir de celui de l'empreinte précédente : seules les
+# lignes des années ajoutées (ou de leur période COVID) sont recalculées.
+#
+# Les partitions ne sont pas versionnées : les lignes ingérées remplacent
+# aussi celles de leurs années dans le fichier unique, d'où une copie neuve du
+# dépôt reconstruit les partitions. Ce fichier est à committer après
+# l'ingestion.
+#
+# Les lignes publiées sans coordonnées sont géocodées hors ligne d'après leur
+# code postal et leur commune (voir donnees/geocodage.py).
+#
+# Usage : python -m donnees.ingestion EXPORT_BRUT [--separateur ';']
+
+import sys
+import time
+
+import pandas as pd
+
+from donnees.cache_disque import DOSSIER_CACHE, empreinte_sources
+from donnees.chargement import FICHIER_DONNEES, optimiser_types
+from donnees.derives import SOURCES, mettre_a_jour_tables
+from donnees.enrichissement import NON_RENSEIGNE, enrichir
+from donnees.geocodage import geocoder
+from donnees.partitions import (
+    CLE_PARTITION, DOSSIER_PARTITIONS, ecrire_partition, preparer_partitions, versionner_annees
+)
+
+# Colonnes attendues dans l'export brut
+COLONNES_BRUTES = [
+    'DATE', 'COLLECTIVITE', 'DIRECTION', 'CATEGORIE', 'FILIERE', 'SEXE',
+    'ZONE', 'CODE POSTAL', 'VILLE', 'AGENT'
+]
+# Colonnes facultatives : complétées par géocodage quand elles manquent
+COLONNES_COORDONNEES = ['LATITUDE', 'LONGITUDE']
+COLONNES_TEXTE = ['COLLECTIVITE', 'DIRECTION', 'CATEGORIE', 'FILIERE', 'SEXE', 'ZONE', 'CODE POSTAL', 'VILLE']
+
+# Autres noms rencontrés dans les exports (après passage en majuscules)
+ALIAS_COLONNES = {
+    'ANNEE': 'DATE',
+    'ANNÉE': 'DATE',
+    'CODE_POSTAL': 'CODE POSTAL',
+    'AGENTS': 'AGENT',
+    'NOMBRE_AGENTS': 'AGENT',
+    'NOMBRE D\'AGENTS': 'AGENT'
+}
+# Coordonnées publiées en une seule colonne « latitude, longitude »
+COLONNES_GEO_POINT = ['GEO_POINT_2D', 'GEO POINT 2D', 'GEO_POINT']
+
+SEXES = {
+    'F': 'FEMININ', 'FEMME': 'FEMININ', 'FÉMININ': 'FEMININ', 'FEMININ': 'FEMININ',
+    'M': 'MASCULIN', 'HOMME': 'MASCULIN', 'MASCULIN': 'MASCULIN'
+}
+
+# Ordre des colonnes du jeu de données nettoyé et enrichi
+COLONNES_NETTOYEES = [
+    'DATE', 'COLLECTIVITE', 'DIRECTION', 'DIRECTION_THEMATIQUE', 'CATEGORIE', 'CATEGORIE_NUM',
+    'NIVEAU_QUALIFICATION', 'FILIERE', 'SEXE', 'ZONE', 'ZONE_SIMPLIFIEE', 'CODE POSTAL', 'VILLE',
+    'LATITUDE', 'LONGITUDE', 'DISTANCE_PARIS_KM', 'AGENT'
+]
+
+
+def lire_export(chemin, separateur=';'):
+    """Export brut en DataFrame (parquet, sinon CSV), noms de colonnes normalisés"""
+    if chemin.endswith('.parquet'):
+        brut = pd.read_parquet(chemin)
+    else:
+        brut = pd.read_csv(chemin, sep=separateur, dtype=str, encoding='utf-8-sig')
+    brut.columns = [ALIAS_COLONNES.get(nom.strip().upper(), nom.strip().upper()) for nom in brut.columns]
+
+    geo_point = next((nom for nom in COLONNES_GEO_POINT if nom in brut.columns), None)
+    if geo_point is not None and 'LATITUDE' not in brut.columns:
+        coordonnees = brut[geo_point].astype(str).str.split(',', n=1, expand=True)
+        brut['LATITUDE'], brut['LONGITUDE'] = coordonnees[0], coordonnees[1]
+    return brut
+
+
+def nettoyer(brut):
+    """Lignes nettoyées et enrichies (schéma du jeu existant) et nombre de lignes écartées.
+
+    Les coordonnées absentes sont géocodées d'après le code postal et la commune ;
+    sont écartées les lignes sans année, sans effectif positif ou sans coordonnées
+    après géocodage.
+    """
+    manquantes = [colonne for colonne in COLONNES_BRUTES if colonne not in brut.columns]
+    if manquantes:
+        raise ValueError(f"Colonnes absentes de l'export : {', '.join(manquantes)}")
+
+    df = brut[COLONNES_BRUTES].copy()
+    for colonne in COLONNES_COORDONNEES:
+        df[colonne] = brut[colonne] if colonne in brut.columns else None
+    for colonne in COLONNES_TEXTE:
+        texte = df[colonne].astype('string').str.strip().str.upper()
+        df[colonne] = texte.mask(texte.isna() | (texte == ''), NON_RENSEIGNE).astype(object)
+    df['SEXE'] = df['SEXE'].map(SEXES).fillna(NON_RENSEIGNE)
+    for colonne in ['DATE', 'AGENT', 'LATITUDE', 'LONGITUDE']:
+        df[colonne] = pd.to_numeric(df[colonne], errors='coerce')
+
+    sans_coordonnees = (df['LATITUDE'].isna() | df['LONGITUDE'].isna()).to_numpy()
+    if sans_coordonnees.any():
+        coordonnees, _ = geocoder(df.loc[sans_coordonnees, 'CODE POSTAL'], df.loc[sans_coordonnees, 'VILLE'])
+        df.loc[sans_coordonnees, 'LATITUDE'] = coordonnees['LATITUDE'].to_numpy()
+        df.loc[sans_coordonnees, 'LONGITUDE'] = coordonnees['LONGITUDE'].to_numpy()
+
+    valides = df['DATE'].notna() & (df['AGENT'] > 0) & df['LATITUDE'].notna() & df['LONGITUDE'].notna()
+    df = df[valides].astype({'DATE': 'int64', 'AGENT': 'int64'})
+    return enrichir(df)[COLONNES_NETTOYEES].reset_index(drop=True), int((~valides).sum())
+
+
+def ingerer(chemin, separateur=';', dossier=DOSSIER_PARTITIONS, dossier_cache=DOSSIER_CACHE,
+            source=FICHIER_DONNEES):
+    """Ajoute (ou remplace) les années d'un export brut dans les partitions et dans le fichier unique
+    versionné, puis met le cache à jour.
+
+    Retourne (années écrites, lignes écrites, lignes écartées, bilan des tables dérivées).
+    """
+    # Copie neuve du dépôt : les partitions des années existantes d'abord
+    preparer_partitions(source, dossier)
+    ancienne_empreinte = empreinte_sources(SOURCES)
+    df, ecartees = nettoyer(lire_export(chemin, separateur))
+    df = optimiser_types(df)
+
+    annees = sorted(int(annee) for annee in df[CLE_PARTITION].unique())
+    for annee in annees:
+        ecrire_partition(df[df[CLE_PARTITION] == annee], annee, dossier)
+    versionner_annees(df, annees, source)
+
+    bilan = mettre_a_jour_tables(annees, ancienne_empreinte, dossier_cache)
+    return annees, len(df), ecartees, bilan
+
+
+if __name__ == '__main__':
+    separateur = sys.argv[sys.argv.index('--separateur') + 1] if '--separateur' in sys.argv else ';'
+    debut = time.perf_counter()
+    annees, lignes, ecartees, bilan = ingerer(sys.argv[1], separateur)
+    for nom, (mode, duree) in bilan.items():
+        print(f"{nom:<40} {mode:<13} {duree * 1000:8.1f} ms")
+    print(f"Années {', '.join(map(str, annees))} : {lignes:,} lignes ajoutées, {ecartees:,} écartées, "
+          f"en {time.perf_counter() - debut:.2f} s")
@@ -0,0 +1,200 @@
+# INSTRUMENTATION DES PAGES : DURÉES PAR ÉTAPE, MÉMOIRE ET CACHES
+#
+# Chaque exécution de page est une mesure (demarrer_mesure / terminer_mesure)
+# découpée en étapes imbriquées (etape()) :
+#   - chargement    : lecture des tables du cache disque, jeu de données mappé ;
+#   - agregation    : requêtes de donnees/requetes.py (succès du mémo compris) ;
+#   - figure        : préparation et construction des figures Plotly ;
+#   - serialisation : JSON des figures et envoi au navigateur (st.plotly_chart).
+# Chaque étape relève sa durée totale et sa durée propre (hors sous-étapes) :
+# les durées propres se somment sans double compte. Sur demande, tracemalloc
+# relève aussi le pic d'allocations de chaque étape et, en fin de page, les
+# lignes de code qui retiennent le plus de mémoire. tracemalloc est global au
+# processus : avec plusieurs sessions simultanées, les pics se mélangent.
+#
+# Les caches qui ne tiennent pas de statistiques (st.cache_resource, cache
+# disque) sont comptés ici (compter_appel(), compter_echec()). Les mesures,
+# avec l'état des caches, sont ajoutées en JSON (une ligne par exécution) au
+# journal si le profilage est actif (AGENTS_PROFILAGE=1, ou panneau
+# d'administration ouvert).
+# Ce module ne doit pas importer streamlit (voir donnees/__init__.py).
+#
+# Usage : python -m donnees.instrumentation [JOURNAL]
+#         (durées propres moyennes par page et par étape du journal)
+
+import collections
+import contextlib
+import contextvars
+import datetime
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+
+PROFILAGE = os.environ.get('AGENTS_PROFILAGE', '') == '1'
+JOURNAL_PERFORMANCES = os.environ.get('AGENTS_JOURNAL', 'performances.jsonl')
+
+ETAPES = ['chargement', 'agregation', 'figure', 'serialisation']
+
+# Lignes de code retenant le plus de mémoire, relevées en fin de page
+NB_LIGNES_MEMOIRE = 5
+
+# Mesure de l'exécution en cours (une par session : chaque exécution a son thread)
+_mesure = contextvars.ContextVar('mesure', default=None)
+# nom -> {'appels': n, 'echecs': n} des caches sans statistiques propres
+_compteurs = collections.defaultdict(lambda: {'appels': 0, 'echecs': 0})
+_verrou = threading.Lock()
+# Mesures en cours qui suivent la mémoire (tracemalloc démarré pour elles)
+_suivis_memoire = [0]
+
+
+def compter_appel(nom):
+    """Compte un appel au cache nom"""
+    with _verrou:
+        _compteurs[nom]['appels'] += 1
+
+
+def compter_echec(nom):
+    """Compte un appel au cache nom qui a dû recalculer son résultat"""
+    with _verrou:
+        _compteurs[nom]['echecs'] += 1
+
+
+def statistiques_compteurs():
+    """{nom: {'succes', 'echecs'}} des caches comptés ici"""
+    with _verrou:
+        return {
+            nom: {'succes': compteur['appels'] - compteur['echecs'], 'echecs': compteur['echecs']}
+            for nom, compteur in _compteurs.items()
+        }
+
+
+def demarrer_mesure(page, memoire=False):
+    """Ouvre la mesure de l'exécution de page (memoire : suivi tracemalloc) et la retourne"""
+    if memoire:
+        with _verrou:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            _suivis_memoire[0] += 1
+    mesure = {
+        'page': page,
+        'date': datetime.datetime.now().isoformat(timespec='seconds'),
+        'memoire': memoire,
+        'etapes': [],
+        # Étapes ouvertes : [début, mémoire au début, pic des sous-étapes, durée des sous-étapes]
+        '_pile': [[time.perf_counter(), _memoire_courante(memoire), 0, 0.0]]
+    }
+    _mesure.set(mesure)
+    return mesure
+
+
+def _memoire_courante(memoire):
+    return tracemalloc.get_traced_memory()[0] if memoire else 0
+
+
+def _pic_depuis(cadre, memoire):
+    """Pic d'allocations depuis l'ouverture du cadre (le pic des sous-étapes compris), remis à zéro"""
+    if not memoire:
+        return 0
+    pic = max(cadre[2], tracemalloc.get_traced_memory()[1])
+    tracemalloc.reset_peak()
+    return pic
+
+
+@contextlib.contextmanager
+def etape(categorie, nom=''):
+    """Mesure le bloc comme une étape de categorie (ETAPES) ; sans effet hors d'une mesure"""
+    mesure = _mesure.get()
+    if mesure is None:
+        yield
+        return
+    memoire = mesure['memoire']
+    parent = mesure['_pile'][-1]
+    # Le pic atteint jusqu'ici revient à l'étape parente avant la remise à zéro
+    parent[2] = _pic_depuis(parent, memoire)
+    cadre = [time.perf_counter(), _memoire_courante(memoire), 0, 0.0]
+    mesure['_pile'].append(cadre)
+    try:
+        yield
+    finally:
+        duree = time.perf_counter() - cadre[0]
+        pic = _pic_depuis(cadre, memoire)
+        mesure['_pile'].pop()
+        parent[2] = max(parent[2], pic)
+        parent[3] += duree
+        mesure['etapes'].append({
+            'categorie': categorie,
+            'nom': nom,
+            'profondeur': len(mesure['_pile']) - 1,
+            'duree_ms': duree * 1000,
+            'propre_ms': (duree - cadre[3]) * 1000,
+            **({'pic_ko': (pic - cadre[1]) / 1024} if memoire else {})
+        })
+
+
+def terminer_mesure(mesure, caches=None, journal=None):
+    """Ferme la mesure : durée totale, durées propres par catégorie, caches ; l'ajoute au journal s'il est donné"""
+    cadre = mesure.pop('_pile')[0]
+    duree = time.perf_counter() - cadre[0]
+    mesure['duree_ms'] = duree * 1000
+    par_categorie = dict.fromkeys(ETAPES, 0.0)
+    for etape_mesuree in mesure['etapes']:
+        par_categorie[etape_mesuree['categorie']] += etape_mesuree['propre_ms']
+    # Reste : code de la page hors étapes (widgets, tableaux...)
+    par_categorie['autre'] = (duree - cadre[3]) * 1000
+    mesure['par_categorie'] = par_categorie
+
+    if mesure['memoire']:
+        mesure['pic_ko'] = (_pic_depuis(cadre, True) - cadre[1]) / 1024
+        statistiques = tracemalloc.take_snapshot().statistics('lineno')[:NB_LIGNES_MEMOIRE]
+        mesure['lignes_memoire'] = [
+            {'ligne': str(statistique.traceback), 'ko': statistique.size / 1024} for statistique in statistiques
+        ]
+        with _verrou:
+            _suivis_memoire[0] -= 1
+            if _suivis_memoire[0] == 0:
+                tracemalloc.stop()
+    if caches is not None:
+        mesure['caches'] = caches
+    _mesure.set(None)
+
+    if journal:
+        with _verrou, open(journal, 'a', encoding='utf-8') as fichier:
+            fichier.write(json.dumps(mesure, ensure_ascii=False, default=str) + '\n')
+    return mesure
+
+
+def lire_journal(journal=JOURNAL_PERFORMANCES):
+    """Mesures enregistrées dans le journal (une par ligne)"""
+    with open(journal, encoding='utf-8') as fichier:
+        return [json.loads(ligne) for ligne in fichier if ligne.strip()]
+
+
+def resumer_journal(mesures):
+    """{page: {'executions', 'duree_ms' et durée propre moyenne de chaque catégorie}}"""
+    pages = collections.defaultdict(list)
+    for mesure in mesures:
+        pages[mesure['page']].append(mesure)
+    resume = {}
+    for page, executions in pages.items():
+        resume[page] = {
+            'executions': len(executions),
+            'duree_ms': sum(mesure['duree_ms'] for mesure in executions) / len(executions),
+            **{
+                categorie: sum(mesure['par_categorie'][categorie] for mesure in executions) / len(executions)
+                for categorie in [*ETAPES, 'autre']
+            }
+        }
+    return resume
+
+
+if __name__ == '__main__':
+    journal = sys.argv[1] if len(sys.argv) > 1 else JOURNAL_PERFORMANCES
+    resume = resumer_journal(lire_journal(journal))
+    categories = [*ETAPES, 'autre']
+    print(f"{'Page':<35} {'exéc.':>6} {'total':>9} " + ' '.join(f'{categorie:>13}' for categorie in categories))
+    for page, ligne in resume.items():
+        print(f"{page:<35} {ligne['executions']:>6} {ligne['duree_ms']:7.0f}ms "
+              + ' '.join(f"{ligne[categorie]:11.1f}ms" for categorie in categories))
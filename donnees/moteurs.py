@@ -0,0 +1,222 @@
+# MOTEUR DE REQUÊTE ARROW (ACERO) POUR LES TABLES LUES SUR LES LIGNES BRUTES
+#
+# Les tables dérivées qui parcourent les lignes brutes (cube, sketches,
+# moyennes et distributions annuelles, localisations détaillées) se ramènent
+# toutes à des GROUP BY ... SUM. Avec le moteur 'arrow', ces regroupements
+# sont exécutés par le moteur d'Arrow, en mémoire et dans le processus :
+# seules les colonnes utiles des partitions sont lues (projection et filtre
+# sur les années poussés au fichier), les agrégations sont vectorisées et
+# multi-threadées, et aucun DataFrame des lignes brutes n'est matérialisé.
+# Chaque requête produit le résultat partiel de l'agrégat correspondant du
+# mode flux (tables_en_flux() dans donnees/derives.py), dont la mise en forme
+# finale est réutilisée : les tables sont celles du calcul pandas.
+#
+# Choix du moteur : variable d'environnement AGENTS_MOTEUR=pandas (défaut)
+# ou arrow ; le mode flux (AGENTS_MODE_FLUX=1) reste prioritaire.
+#
+# Usage : python -m donnees.moteurs
+#         (construit les tables avec les deux moteurs, les compare et les chronomètre)
+
+import os
+import time
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from donnees.chargement import COLONNES_CATEGORIELLES, COLONNES_UTILISEES, FICHIER_DONNEES, TYPES_NUMERIQUES
+from donnees.cube import DIMENSIONS_CUBE, MESURES_CUBE, tranches_distance
+from donnees.flux import categoriser
+from donnees.partitions import CLE_PARTITION, DOSSIER_PARTITIONS, ouvrir_dataset
+from donnees.quantiles import NB_SEAUX, indices_seaux
+
+MOTEURS = ['pandas', 'arrow']
+MOTEUR = os.environ.get('AGENTS_MOTEUR', 'pandas')
+
+
+def lire_colonnes(colonnes, annees=None, dossier=DOSSIER_PARTITIONS, source=FICHIER_DONNEES):
+    """Colonnes demandées des années demandées (toutes si None) en table Arrow, lue sur plusieurs threads"""
+    colonnes = [colonne for colonne in COLONNES_UTILISEES if colonne in colonnes]
+    annees = None if annees is None else [int(annee) for annee in annees]
+    if os.path.isdir(dossier):
+        filtre = None if annees is None else ds.field(CLE_PARTITION).isin(annees)
+        table = ouvrir_dataset(dossier).to_table(columns=colonnes, filter=filtre)
+    else:
+        table = pq.read_table(
+            source, columns=colonnes, filters=None if annees is None else [(CLE_PARTITION, 'in', annees)],
+            read_dictionary=[colonne for colonne in COLONNES_CATEGORIELLES if colonne in colonnes]
+        )
+    # Types numériques compacts de optimiser_types() : mêmes valeurs (float32) que le calcul pandas
+    schema = pa.schema([
+        champ.with_type(pa.from_numpy_dtype(np.dtype(TYPES_NUMERIQUES[champ.name])))
+        if champ.name in TYPES_NUMERIQUES else champ
+        for champ in table.schema
+    ])
+    return table.cast(schema)
+
+
+def _distances(table):
+    return table.column('DISTANCE_PARIS_KM').to_numpy().astype(float)
+
+
+def _poids(table, poids):
+    """Poids de chaque ligne : effectif AGENT, ou 1 pour compter les lignes"""
+    if poids is None:
+        return np.ones(table.num_rows)
+    return table.column(poids).to_numpy().astype(float)
+
+
+def _avec_colonnes(table, colonnes, **calculees):
+    """Projection de table sur colonnes, complétée des colonnes calculées (tableaux NumPy)"""
+    table = table.select(colonnes)
+    for nom, valeurs in calculees.items():
+        table = table.append_column(nom, pa.array(valeurs))
+    return table
+
+
+def _sans_distance_manquante(table):
+    distances = _distances(table)
+    return table if not np.isnan(distances).any() else table.filter(pa.array(~np.isnan(distances)))
+
+
+def sommer_par(table, cles, valeurs):
+    """GROUP BY cles, SUM(valeurs) par le moteur Arrow (multi-threadé), en DataFrame trié comme un groupby pandas"""
+    resultat = table.group_by(list(cles), use_threads=True).aggregate([(valeur, 'sum') for valeur in valeurs])
+    df = resultat.to_pandas().rename(columns={f'{valeur}_sum': valeur for valeur in valeurs})[[*cles, *valeurs]]
+    # Ordre de sortie des groupes non déterministe : tri sur les clés (catégories triées)
+    return categoriser(df).sort_values(list(cles), ignore_index=True)
+
+
+# =============================================================================
+# RÉSULTATS PARTIELS DES AGRÉGATS DE tables_en_flux()
+# =============================================================================
+def cube(table, dimensions=DIMENSIONS_CUBE):
+    """Comme construire_cube() sur les lignes brutes"""
+    distances = _distances(table)
+    lignes = _avec_colonnes(
+        table, [dimension for dimension in dimensions if dimension != 'TRANCHE_DISTANCE'] + ['AGENT'],
+        TRANCHE_DISTANCE=tranches_distance(distances),
+        LIGNES=np.ones(table.num_rows, dtype=np.int64),
+        DISTANCE_AGENTS=distances * table.column('AGENT').to_numpy(),
+        DISTANCE_LIGNES=distances
+    )
+    return sommer_par(lignes, dimensions, MESURES_CUBE)
+
+
+def sketches_longs(table, dimensions, poids=None):
+    """Comme construire_sketches_longs()"""
+    table = _sans_distance_manquante(table)
+    lignes = _avec_colonnes(
+        table, [dimension for dimension in dimensions if dimension != 'TRANCHE_DISTANCE'],
+        TRANCHE_DISTANCE=tranches_distance(_distances(table)),
+        SEAU=indices_seaux(_distances(table)).astype(np.int16),
+        COMPTE=_poids(table, poids)
+    )
+    return sommer_par(lignes, [*dimensions, 'SEAU'], ['COMPTE'])
+
+
+def sketches(table, dimensions, poids=None):
+    """Comme construire_sketches() : (cellules, comptes) à partir des seaux non vides de chaque cellule"""
+    table = _sans_distance_manquante(table)
+    lignes = _avec_colonnes(
+        table, list(dimensions),
+        SEAU=indices_seaux(_distances(table)).astype(np.int16),
+        COMPTE=_poids(table, poids)
+    )
+    long = sommer_par(lignes, [*dimensions, 'SEAU'], ['COMPTE'])
+    groupes = long.groupby(list(dimensions), observed=True, sort=True)
+    comptes = np.zeros((groupes.ngroups, NB_SEAUX))
+    comptes[groupes.ngroup().to_numpy(), long['SEAU'].to_numpy()] = long['COMPTE'].to_numpy()
+    return groupes.size().index.to_frame(index=False), comptes
+
+
+def sommes_ponderees(table, par, poids='AGENT'):
+    """Comme ponderation.sommes_ponderees() (sommes PRODUIT et POIDS indexées par les groupes)"""
+    table = _sans_distance_manquante(table)
+    ponderation = _poids(table, poids)
+    lignes = _avec_colonnes(table, list(par), PRODUIT=_distances(table) * ponderation, POIDS=ponderation)
+    return sommer_par(lignes, par, ['PRODUIT', 'POIDS']).set_index(list(par))
+
+
+def histogramme(table, bornes, par, poids='AGENT'):
+    """Comme ponderation.histogramme_pondere() : une colonne de somme des poids par intervalle"""
+    table = _sans_distance_manquante(table)
+    bornes = np.asarray(bornes, dtype=float)
+    distances = _distances(table)
+    intervalles = np.digitize(distances, bornes[1:-1])
+    # Valeurs hors de [bornes[0], bornes[-1]) : comptées dans aucun intervalle
+    dans = (distances >= bornes[0]) & (distances < bornes[-1])
+    ponderation = _poids(table, poids)
+    colonnes = {
+        f'[{bornes[i]:g}, {bornes[i + 1]:g})': np.where((intervalles == i) & dans, ponderation, 0.0)
+        for i in range(len(bornes) - 1)
+    }
+    return sommer_par(_avec_colonnes(table, list(par), **colonnes), par, list(colonnes)).set_index(list(par))
+
+
+def distribution_periodes(table, derniere_annee, libelles, poids='AGENT'):
+    """Comme ponderation.distribution_ponderee() par période : (Période, DISTANCE_PARIS_KM, POIDS).
+
+    Période vaut libelles[0] jusqu'à derniere_annee comprise, libelles[1] ensuite.
+    """
+    table = _sans_distance_manquante(table)
+    codes = (table.column(CLE_PARTITION).to_numpy() > derniere_annee).astype(np.int8)
+    lignes = _avec_colonnes(
+        table, ['DISTANCE_PARIS_KM'],
+        Période=pa.DictionaryArray.from_arrays(codes, list(libelles)),
+        POIDS=_poids(table, poids)
+    )
+    distribution = sommer_par(lignes, ['Période', 'DISTANCE_PARIS_KM'], ['POIDS']).astype({'Période': str})
+    return distribution.sort_values(['Période', 'DISTANCE_PARIS_KM'], ignore_index=True)
+
+
+def localisations(table, dimensions):
+    """Comme carte.agreger_localisations(lignes, dimensions) avec la tranche de distance calculée"""
+    lignes = _avec_colonnes(
+        table, [dimension for dimension in dimensions if dimension != 'TRANCHE_DISTANCE']
+        + ['VILLE', 'LATITUDE', 'LONGITUDE', 'AGENT'],
+        TRANCHE_DISTANCE=tranches_distance(_distances(table))
+    )
+    resultat = sommer_par(lignes, [*dimensions, 'VILLE', 'LATITUDE', 'LONGITUDE'], ['AGENT'])
+    return resultat.dropna(subset=['VILLE', 'LATITUDE', 'LONGITUDE']).reset_index(drop=True)
+
+
+if __name__ == '__main__':
+    from donnees.derives import tables_arrow, tables_derivees, tables_en_flux
+    from donnees.flux import _tables_egales, finaliser
+    from donnees.partitions import lire_donnees
+
+    flux = tables_en_flux()
+    debut = time.perf_counter()
+    donnees = lire_donnees()
+    lecture_pandas = time.perf_counter() - debut
+    constructeurs = tables_derivees()
+    print(f"Lecture pandas de {len(donnees):,} lignes : {lecture_pandas * 1000:.0f} ms")
+    print(f"{'table':<34} {'pandas':>9} {'arrow':>9}  résultat")
+
+    total_pandas = total_arrow = 0.0
+    differentes = []
+    for annees, requetes in tables_arrow().items():
+        debut = time.perf_counter()
+        table = lire_colonnes({colonne for colonnes, _ in requetes.values() for colonne in colonnes}, annees)
+        lecture_arrow = time.perf_counter() - debut
+        total_arrow += lecture_arrow
+        for nom, (_, partiel) in requetes.items():
+            debut = time.perf_counter()
+            en_pandas = constructeurs[nom](lambda source: donnees)
+            duree_pandas = time.perf_counter() - debut
+            debut = time.perf_counter()
+            en_arrow = finaliser({nom: flux[annees][nom]}, {nom: partiel(table)})[nom]
+            duree_arrow = time.perf_counter() - debut
+            total_pandas += duree_pandas
+            total_arrow += duree_arrow
+            egales = _tables_egales(en_pandas, en_arrow)
+            if not egales:
+                differentes.append(nom)
+            print(f"{nom:<34} {duree_pandas * 1000:7.1f} ms {duree_arrow * 1000:7.1f} ms  "
+                  f"{'identique' if egales else 'DIFFÉRENTE'}")
+
+    print(f"Total (lectures comprises) : pandas {(total_pandas + lecture_pandas) * 1000:.0f} ms, "
+          f"arrow {total_arrow * 1000:.0f} ms")
+    print(f"{len(differentes)} table(s) différente(s)" + (f" : {', '.join(differentes)}" if differentes else ''))
@@ -0,0 +1,160 @@
+# JEU DE DONNÉES PARTITIONNÉ PAR ANNÉE (HIVE : DATE=AAAA/)
+#
+# Chaque année est stockée dans son propre dossier DATE=AAAA/. Le filtre sur
+# l'année est poussé au niveau du dataset pyarrow : seule la partition
+# demandée est lue. Une nouvelle publication annuelle s'ajoute en écrivant
+# une partition, sans réécrire les autres (voir donnees/ingestion.py) : les
+# partitions font foi, le fichier unique n'en est que la source initiale.
+# Le dossier n'est pas versionné : il est créé depuis le fichier unique au
+# premier lancement (preparer_partitions()) ; en son absence, les lectures
+# se font sur le fichier unique. Les années ingérées sont donc aussi
+# reportées dans le fichier unique (versionner_annees()), seul à faire foi
+# pour une copie neuve du dépôt.
+#
+# Usage : python -m donnees.partitions   (reconstruit le dossier depuis le parquet unique)
+
+import os
+import shutil
+import tempfile
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from donnees.chargement import (
+    FICHIER_DONNEES, COLONNES_CATEGORIELLES, COLONNES_UTILISEES, lire_parquet, optimiser_types
+)
+
+DOSSIER_PARTITIONS = 'domiciliation_agents_par_annee'
+CLE_PARTITION = 'DATE'
+
+# Schéma de la clé de partition (même type compact que la colonne chargée)
+SCHEMA_PARTITION = pa.schema([(CLE_PARTITION, pa.int16())])
+
+
+def chemin_partition(annee, dossier=DOSSIER_PARTITIONS):
+    """Chemin du fichier parquet d'une année"""
+    return os.path.join(dossier, f'{CLE_PARTITION}={int(annee)}', 'part-0.parquet')
+
+
+def ecrire_partition(df_annee, annee, dossier=DOSSIER_PARTITIONS):
+    """Écrit (ou remplace) la partition d'une année ; la clé DATE est portée par le dossier"""
+    chemin = chemin_partition(annee, dossier)
+    os.makedirs(os.path.dirname(chemin), exist_ok=True)
+
+    table = pa.Table.from_pandas(
+        df_annee.drop(columns=[CLE_PARTITION], errors='ignore'), preserve_index=False
+    )
+    # Écriture atomique : un lecteur ne voit jamais une partition à moitié écrite
+    temporaire = chemin + '.tmp'
+    pq.write_table(table, temporaire)
+    os.replace(temporaire, chemin)
+    return chemin
+
+
+def partitionner(source=FICHIER_DONNEES, dossier=DOSSIER_PARTITIONS):
+    """Découpe le parquet unique en une partition par année"""
+    df = lire_parquet(source, colonnes=None)
+    annees = sorted(df[CLE_PARTITION].unique())
+    for annee in annees:
+        ecrire_partition(df[df[CLE_PARTITION] == annee], annee, dossier)
+    return [int(annee) for annee in annees]
+
+
+def versionner_annees(df, annees, source=FICHIER_DONNEES):
+    """Remplace dans le fichier unique les lignes des années annees par celles de df.
+
+    Le fichier garde son schéma (types non compacts) et reste trié par année ;
+    il est réécrit entièrement, de façon atomique.
+    """
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    if os.path.exists(source):
+        existant = pq.read_table(source)
+        cle = existant.column(CLE_PARTITION)
+        conservees = existant.filter(pc.invert(pc.is_in(cle, value_set=pa.array(annees, cle.type))))
+        table = pa.concat_tables([conservees, table.select(existant.column_names).cast(existant.schema)])
+    temporaire = source + '.tmp'
+    pq.write_table(table.sort_by(CLE_PARTITION), temporaire)
+    os.replace(temporaire, source)
+
+
+def preparer_partitions(source=FICHIER_DONNEES, dossier=DOSSIER_PARTITIONS):
+    """Crée le dossier partitionné depuis le fichier unique s'il est absent ; retourne True s'il a été créé.
+
+    Les partitions sont écrites dans un dossier temporaire renommé à la fin :
+    un lecteur ne voit jamais un dossier incomplet.
+    """
+    if os.path.isdir(dossier) or not os.path.exists(source):
+        return False
+    temporaire = tempfile.mkdtemp(prefix='.partitions_', dir=os.path.dirname(os.path.abspath(dossier)))
+    partitionner(source, temporaire)
+    try:
+        os.rename(temporaire, dossier)
+    except OSError:
+        # Créé entre-temps par un autre processus
+        shutil.rmtree(temporaire)
+        return False
+    return True
+
+
+def annees_disponibles(dossier=DOSSIER_PARTITIONS, source=FICHIER_DONNEES):
+    """Années présentes, lues dans les noms de dossiers (sans ouvrir les fichiers)"""
+    if os.path.isdir(dossier):
+        prefixe = f'{CLE_PARTITION}='
+        return sorted(
+            int(nom[len(prefixe):]) for nom in os.listdir(dossier)
+            if nom.startswith(prefixe) and os.path.exists(chemin_partition(nom[len(prefixe):], dossier))
+        )
+    # Pas de dossier partitionné : on ne lit que la colonne DATE du fichier unique
+    dates = pq.read_table(source, columns=[CLE_PARTITION]).column(CLE_PARTITION)
+    return sorted(int(annee) for annee in dates.unique().to_pylist())
+
+
+def ouvrir_dataset(dossier=DOSSIER_PARTITIONS):
+    """Dataset pyarrow hive, colonnes texte lues en dictionnaire"""
+    format_parquet = ds.ParquetFileFormat(
+        read_options=ds.ParquetReadOptions(dictionary_columns=COLONNES_CATEGORIELLES)
+    )
+    return ds.dataset(
+        dossier,
+        format=format_parquet,
+        partitioning=ds.partitioning(SCHEMA_PARTITION, flavor='hive')
+    )
+
+
+def lire_annees(annees, dossier=DOSSIER_PARTITIONS, colonnes=COLONNES_UTILISEES, source=FICHIER_DONNEES):
+    """Lit les lignes de plusieurs années (seules leurs partitions sont ouvertes)"""
+    annees = [int(annee) for annee in annees]
+    if not os.path.isdir(dossier):
+        return lire_parquet(source, colonnes, filtres=[(CLE_PARTITION, 'in', annees)])
+
+    table = ouvrir_dataset(dossier).to_table(
+        columns=colonnes,
+        filter=ds.field(CLE_PARTITION).isin(annees)
+    )
+    return optimiser_types(table.to_pandas())
+
+
+def lire_annee(annee, dossier=DOSSIER_PARTITIONS, colonnes=COLONNES_UTILISEES, source=FICHIER_DONNEES):
+    """Lit les lignes d'une seule année (filtre poussé jusqu'au choix des fichiers)"""
+    return lire_annees([annee], dossier, colonnes, source)
+
+
+def lire_donnees(dossier=DOSSIER_PARTITIONS, colonnes=COLONNES_UTILISEES, source=FICHIER_DONNEES):
+    """Lit toutes les années : les partitions (années ajoutées comprises), à défaut le fichier unique"""
+    if not os.path.isdir(dossier):
+        return lire_parquet(source, colonnes)
+    return optimiser_types(ouvrir_dataset(dossier).to_table(columns=colonnes).to_pandas())
+
+
+def compter_lignes(dossier=DOSSIER_PARTITIONS, source=FICHIER_DONNEES):
+    """Nombre de lignes, lu dans les métadonnées parquet (sans lire les données)"""
+    if not os.path.isdir(dossier):
+        return pq.ParquetFile(source).metadata.num_rows
+    return ouvrir_dataset(dossier).count_rows()
+
+
+if __name__ == '__main__':
+    annees = partitionner()
+    print(f"{len(annees)} partitions écrites dans {DOSSIER_PARTITIONS}/ : {annees[0]}-{annees[-1]}")
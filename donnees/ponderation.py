@@ -0,0 +1,160 @@
+# STATISTIQUES PONDÉRÉES PAR L'EFFECTIF (AGENT)
+#
+# Chaque ligne du jeu de données regroupe AGENT agents ayant la même
+# distance. Les statistiques par agent s'obtiennent en pondérant chaque
+# ligne par AGENT, sans dupliquer les lignes : un tri par (groupe, valeur)
+# puis une somme cumulée des poids suffisent pour la moyenne, les quantiles
+# et les moustaches de chaque groupe.
+
+import numpy as np
+import pandas as pd
+
+
+def _cles(data, par):
+    """Clés de regroupement : noms de colonnes ou Series alignées sur le DataFrame"""
+    return [data[cle] if isinstance(cle, str) else cle for cle in par]
+
+
+def _preparer(df, par, valeur, poids):
+    """Codes de groupe, valeurs et poids triés par (groupe, valeur), plus les clés des groupes"""
+    data = df[df[valeur].notna()]
+    if par:
+        groupes = data.groupby(_cles(data, par), observed=True, sort=True)
+        codes = groupes.ngroup().to_numpy()
+        cles = groupes.size().index.to_frame(index=False)
+    else:
+        codes = np.zeros(len(data), dtype=np.int64)
+        cles = pd.DataFrame(index=[0])
+
+    valeurs = data[valeur].to_numpy(dtype=float)
+    ponderation = np.ones(len(data)) if poids is None else data[poids].to_numpy(dtype=float)
+
+    ordre = np.lexsort((valeurs, codes))
+    return codes[ordre], valeurs[ordre], ponderation[ordre], cles
+
+
+def _bornes_groupes(codes, nb_groupes):
+    """Position de début et de fin de chaque groupe dans les tableaux triés"""
+    debuts = np.searchsorted(codes, np.arange(nb_groupes), side='left')
+    fins = np.searchsorted(codes, np.arange(nb_groupes), side='right')
+    return debuts, fins
+
+
+def sommes_ponderees(df, par=(), valeur='DISTANCE_PARIS_KM', poids='AGENT'):
+    """Sommes PRODUIT (valeur × poids) et POIDS par groupe : résultat partiel fusionnable par addition"""
+    data = df[df[valeur].notna()]
+    ponderation = np.ones(len(data)) if poids is None else data[poids].to_numpy(dtype=float)
+    sommes = pd.DataFrame({
+        'PRODUIT': data[valeur].to_numpy(dtype=float) * ponderation,
+        'POIDS': ponderation
+    }, index=data.index)
+    if not par:
+        return sommes.sum().to_frame().T
+    return sommes.groupby(_cles(data, par), observed=True, sort=True)[['PRODUIT', 'POIDS']].sum()
+
+
+def moyenne_ponderee(df, par=(), valeur='DISTANCE_PARIS_KM', poids='AGENT'):
+    """Moyenne pondérée de valeur par groupe (Series indexée par les groupes) ; poids=None : moyenne simple"""
+    sommes = sommes_ponderees(df, par, valeur, poids)
+    if not par:
+        return sommes['PRODUIT'].iloc[0] / sommes['POIDS'].iloc[0]
+    return (sommes['PRODUIT'] / sommes['POIDS']).rename(valeur)
+
+
+def distribution_ponderee(df, par=(), valeur='DISTANCE_PARIS_KM', poids='AGENT'):
+    """Somme des poids par groupe et valeur distincte (colonnes de par, valeur, POIDS).
+
+    Les statistiques pondérées de ce résumé (poids='POIDS') sont celles des
+    lignes d'origine ; deux résumés se fusionnent en sommant POIDS par clé.
+    """
+    data = df[df[valeur].notna()]
+    ponderation = np.ones(len(data)) if poids is None else data[poids].to_numpy(dtype=float)
+    cles = _cles(data, par) + [data[valeur]]
+    return pd.Series(ponderation, index=data.index, name='POIDS').groupby(
+        cles, observed=True, sort=True
+    ).sum().reset_index()
+
+
+def quantiles_ponderes(df, par=(), probabilites=(0.25, 0.5, 0.75), valeur='DISTANCE_PARIS_KM', poids='AGENT'):
+    """Quantiles pondérés (inverse de la fonction de répartition) : une colonne par probabilité"""
+    codes, valeurs, ponderation, cles = _preparer(df, par, valeur, poids)
+    resultat = _quantiles_tries(codes, valeurs, ponderation, len(cles), probabilites)
+    return pd.concat([cles, pd.DataFrame(resultat, columns=list(probabilites))], axis=1)
+
+
+def _quantiles_tries(codes, valeurs, ponderation, nb_groupes, probabilites):
+    """Quantiles de chaque groupe sur des tableaux déjà triés par (groupe, valeur)"""
+    cumul = np.cumsum(ponderation)
+    debuts, fins = _bornes_groupes(codes, nb_groupes)
+    avant = np.where(debuts > 0, cumul[np.maximum(debuts - 1, 0)], 0.0)
+    totaux = cumul[np.maximum(fins - 1, 0)] - avant
+
+    # Le cumul global est croissant : un seul searchsorted sert tous les groupes
+    cibles = avant[:, None] + np.asarray(probabilites, dtype=float)[None, :] * totaux[:, None]
+    positions = np.searchsorted(cumul, cibles, side='left')
+    positions = np.clip(positions, debuts[:, None], np.maximum(fins - 1, debuts)[:, None])
+    resultat = valeurs[np.minimum(positions, len(valeurs) - 1)] if len(valeurs) else np.full(cibles.shape, np.nan)
+    return np.where((totaux > 0)[:, None], resultat, np.nan)
+
+
+def statistiques_boite_ponderees(df, par=(), valeur='DISTANCE_PARIS_KM', poids='AGENT'):
+    """q1 / médiane / q3, moustaches à 1,5 × IQR et moyenne pondérées, par groupe"""
+    codes, valeurs, ponderation, cles = _preparer(df, par, valeur, poids)
+    nb_groupes = len(cles)
+    q1, mediane, q3 = _quantiles_tries(codes, valeurs, ponderation, nb_groupes, (0.25, 0.5, 0.75)).T
+    iqr = q3 - q1
+
+    # Clé croissante (groupe + valeur normalisée dans [0, 1[) pour chercher les moustaches de
+    # tous les groupes dans le même tableau trié
+    if len(valeurs):
+        vmin, etendue = valeurs.min(), np.ptp(valeurs) + 1.0
+    else:
+        vmin, etendue = 0.0, 1.0
+    cle = codes + (valeurs - vmin) / etendue
+    groupes = np.arange(nb_groupes)
+    debuts, fins = _bornes_groupes(codes, nb_groupes)
+    bas = np.searchsorted(cle, groupes + (np.clip(q1 - 1.5 * iqr, vmin, None) - vmin) / etendue, side='left')
+    haut = np.searchsorted(cle, groupes + (np.clip(q3 + 1.5 * iqr, vmin, None) - vmin) / etendue, side='right') - 1
+    bas = np.clip(bas, debuts, np.maximum(fins - 1, debuts))
+    haut = np.clip(haut, debuts, np.maximum(fins - 1, debuts))
+
+    sommes = np.bincount(codes, weights=ponderation * valeurs, minlength=nb_groupes)
+    totaux = np.bincount(codes, weights=ponderation, minlength=nb_groupes)
+    moyennes = np.divide(sommes, totaux, out=np.full(nb_groupes, np.nan), where=totaux > 0)
+
+    return pd.concat([cles, pd.DataFrame({
+        'n': totaux,
+        'mean': moyennes,
+        'q1': q1,
+        'median': mediane,
+        'q3': q3,
+        'lowerfence': valeurs[bas] if len(valeurs) else np.nan,
+        'upperfence': valeurs[haut] if len(valeurs) else np.nan
+    })], axis=1)
+
+
+def histogramme_pondere(df, bornes, par=(), valeur='DISTANCE_PARIS_KM', poids='AGENT'):
+    """Somme des poids par intervalle [bornes[i], bornes[i+1]) et par groupe (une colonne par intervalle)"""
+    data = df[df[valeur].notna()]
+    bornes = np.asarray(bornes, dtype=float)
+    valeurs = data[valeur].to_numpy(dtype=float)
+    intervalles = np.digitize(valeurs, bornes[1:-1])
+    # np.digitize range les valeurs hors de [bornes[0], bornes[-1]) dans les intervalles extrêmes :
+    # elles gardent leur groupe mais ne pèsent rien
+    dans = (valeurs >= bornes[0]) & (valeurs < bornes[-1])
+    nb_intervalles = len(bornes) - 1
+
+    if par:
+        groupes = data.groupby(_cles(data, par), observed=True, sort=True)
+        codes = groupes.ngroup().to_numpy()
+        index = groupes.size().index
+    else:
+        codes = np.zeros(len(data), dtype=np.int64)
+        index = pd.RangeIndex(1)
+
+    ponderation = np.where(dans, 1.0 if poids is None else data[poids].to_numpy(dtype=float), 0.0)
+    comptes = np.bincount(
+        codes * nb_intervalles + intervalles, weights=ponderation, minlength=len(index) * nb_intervalles
+    ).reshape(len(index), nb_intervalles)
+    colonnes = [f'[{bornes[i]:g}, {bornes[i + 1]:g})' for i in range(nb_intervalles)]
+    return pd.DataFrame(comptes, index=index, columns=colonnes)
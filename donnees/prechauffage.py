@@ -0,0 +1,104 @@
+# PRÉCHAUFFAGE DU CACHE DISQUE
+#
+# Construit toutes les tables dérivées pour l'empreinte courante des données,
+# afin qu'un processus Streamlit fraîchement démarré serve chaque page depuis
+# les fichiers mappés en mémoire, sans recalcul.
+#
+# Avec --processus, le calcul est réparti par partition annuelle sur un pool
+# de processus : chaque travail écrit les tables de la carte de son année et
+# retourne ses résultats partiels pour les tables multi-années (cube, villes,
+# seuil des 50 km, distances), que le processus principal fusionne (agrégats de
+# donnees/derives.tables_en_flux). Les tables déduites (treemap, séries
+# temporelles) sont ensuite construites depuis ces résultats.
+#
+# Usage : python -m donnees.prechauffage [--garder-anciens] [--processus N]
+
+import concurrent.futures
+import os
+import sys
+import time
+
+from donnees.cache_disque import DOSSIER_CACHE, chemin_table, ecrire_table, empreinte_sources, purger
+from donnees.derives import SOURCES, obtenir_table, tables_carte, tables_derivees, tables_en_flux
+from donnees.flux import agreger_partiels, finaliser, fusionner_partiels
+from donnees.partitions import annees_disponibles, preparer_partitions
+
+
+def prechauffer(dossier=DOSSIER_CACHE, purger_anciens=True):
+    """Construit (ou relit) chaque table dérivée ; retourne {nom: durée en secondes}"""
+    preparer_partitions()
+    durees = {}
+    for nom in tables_derivees():
+        debut = time.perf_counter()
+        obtenir_table(nom, dossier)
+        durees[nom] = time.perf_counter() - debut
+
+    if purger_anciens:
+        purger(empreinte_sources(SOURCES), dossier)
+    return durees
+
+
+def _precalculer_annee(annee, partiels, dossier):
+    """Travail d'un processus : écrit les tables de la carte de annee et retourne
+    (partiels des tables multi-années pour cette année ou None, durée en secondes)"""
+    debut = time.perf_counter()
+    empreinte = empreinte_sources(SOURCES)
+    tables = {}
+    for nom, constructeur in tables_carte(annee).items():
+        if not os.path.exists(chemin_table(nom, empreinte, dossier)):
+            tables[nom] = constructeur(
+                lambda source: tables[source] if source in tables else obtenir_table(source, dossier)
+            )
+            ecrire_table(nom, tables[nom], empreinte, dossier)
+    resultat = agreger_partiels(tables_en_flux()[None], [annee]) if partiels else None
+    return resultat, time.perf_counter() - debut
+
+
+def prechauffer_en_parallele(processus=None, dossier=DOSSIER_CACHE, purger_anciens=True):
+    """Comme prechauffer(), le travail par année étant réparti sur processus (défaut : un par cœur).
+
+    Retourne {travail ou table: durée en secondes} : un travail par année, la
+    fusion de chaque table multi-années, puis les tables restantes.
+    """
+    preparer_partitions()
+    empreinte = empreinte_sources(SOURCES)
+    multi_annees = tables_en_flux()[None]
+    manquantes = [nom for nom in multi_annees if not os.path.exists(chemin_table(nom, empreinte, dossier))]
+
+    durees = {}
+    partiels = {}
+    with concurrent.futures.ProcessPoolExecutor(max_workers=processus) as pool:
+        travaux = {
+            pool.submit(_precalculer_annee, annee, bool(manquantes), dossier): annee
+            for annee in annees_disponibles()
+        }
+        for travail in concurrent.futures.as_completed(travaux):
+            annee = travaux[travail]
+            partiels[annee], durees[f'année {annee} (processus)'] = travail.result()
+
+    # Fusion dans l'ordre des années : résultat indépendant de l'ordre de fin des travaux
+    for nom in manquantes:
+        debut = time.perf_counter()
+        agregat = {nom: multi_annees[nom]}
+        resultat = fusionner_partiels(agregat, [
+            {nom: partiels[annee][nom]} for annee in sorted(partiels) if nom in partiels[annee]
+        ])
+        ecrire_table(nom, finaliser(agregat, resultat)[nom], empreinte, dossier)
+        durees[f'fusion {nom}'] = time.perf_counter() - debut
+
+    durees.update(prechauffer(dossier, purger_anciens))
+    return durees
+
+
+if __name__ == '__main__':
+    debut = time.perf_counter()
+    purger_anciens = '--garder-anciens' not in sys.argv
+    if '--processus' in sys.argv:
+        processus = int(sys.argv[sys.argv.index('--processus') + 1])
+        durees = prechauffer_en_parallele(processus, purger_anciens=purger_anciens)
+    else:
+        durees = prechauffer(purger_anciens=purger_anciens)
+    for nom, duree in durees.items():
+        print(f"{nom:<40} {duree * 1000:8.1f} ms")
+    print(f"{len(tables_derivees())} tables prêtes dans {DOSSIER_CACHE}/{empreinte_sources(SOURCES)}/ "
+          f"en {time.perf_counter() - debut:.2f} s")
@@ -0,0 +1,157 @@
+# QUANTILES APPROCHÉS DES DISTANCES - SKETCHES FUSIONNABLES
+#
+# Chaque cellule (CATEGORIE, SEXE, DATE) porte un histogramme à seaux
+# logarithmiques (principe du DDSketch) : une valeur x tombe dans le seau
+# ceil(log_gamma(x / VALEUR_MIN)). Tout quantile lu sur le sketch est à moins
+# de PRECISION_RELATIVE de la vraie valeur, et fusionner deux cellules revient
+# à additionner leurs comptes : n'importe quelle combinaison de filtres est
+# obtenue en sommant les lignes concernées, sans revenir aux données brutes.
+# Pour les filtres globaux, les sketches sont aussi tenus en format long sur
+# toutes les dimensions filtrables (une ligne par cellule et seau non vide) :
+# les cellules fines sont nombreuses et ne remplissent que peu de seaux.
+
+import numpy as np
+import pandas as pd
+
+from donnees.cube import DIMENSIONS_CUBE, filtrer_cube, masque_filtres, preparer_lignes
+
+# Erreur relative garantie sur les quantiles (0,5 %)
+PRECISION_RELATIVE = 0.005
+GAMMA = (1 + PRECISION_RELATIVE) / (1 - PRECISION_RELATIVE)
+
+# Plage couverte (km) : en dessous de VALEUR_MIN, seau 0 ; au-delà de VALEUR_MAX, dernier seau
+VALEUR_MIN = 0.01
+VALEUR_MAX = 20000.0
+NB_SEAUX = int(np.ceil(np.log(VALEUR_MAX / VALEUR_MIN) / np.log(GAMMA))) + 1
+
+DIMENSIONS_SKETCH = ['CATEGORIE', 'SEXE', 'DATE']
+
+# Sketches en format long : toutes les dimensions du cube (tranche de distance comprise)
+DIMENSIONS_SKETCH_LONG = DIMENSIONS_CUBE
+
+
+def indices_seaux(valeurs):
+    """Seau de chaque valeur (vectorisé)"""
+    valeurs = np.maximum(np.asarray(valeurs, dtype=float), VALEUR_MIN)
+    indices = np.ceil(np.log(valeurs / VALEUR_MIN) / np.log(GAMMA))
+    return np.clip(indices, 0, NB_SEAUX - 1).astype(np.int64)
+
+
+# Valeur représentative de chaque seau (milieu relatif des bornes)
+VALEURS_SEAUX = VALEUR_MIN * 2 * GAMMA ** np.arange(NB_SEAUX) / (GAMMA + 1)
+VALEURS_SEAUX[0] = VALEUR_MIN
+
+
+def construire_sketches(df, dimensions=DIMENSIONS_SKETCH, colonne='DISTANCE_PARIS_KM', poids=None):
+    """Un sketch par cellule : (cellules, comptes) avec comptes[i] le sketch de cellules.iloc[i].
+
+    poids=None compte les lignes ; poids='AGENT' pondère chaque ligne par son effectif.
+    """
+    data = df[df[colonne].notna()]
+    groupes = data.groupby(list(dimensions), observed=True, sort=True)
+    codes = groupes.ngroup().to_numpy()
+    cellules = groupes.size().index.to_frame(index=False)
+
+    positions = codes * NB_SEAUX + indices_seaux(data[colonne].to_numpy())
+    ponderation = None if poids is None else data[poids].to_numpy(dtype=float)
+    comptes = np.bincount(positions, weights=ponderation, minlength=len(cellules) * NB_SEAUX)
+    return cellules, comptes.reshape(len(cellules), NB_SEAUX)
+
+
+def fusionner(cellules, comptes, par=(), filtres=None):
+    """Fusionne les sketches des cellules retenues par les filtres, regroupés selon par.
+
+    Retourne (groupes, comptes fusionnés) ; sans regroupement, un seul sketch.
+    """
+    masque = masque_filtres(cellules, filtres or {})
+    retenues = cellules[masque]
+    if not par:
+        return pd.DataFrame(index=[0]), comptes[masque].sum(axis=0, keepdims=True)
+
+    groupes = retenues.groupby(list(par), observed=True, sort=True)
+    codes = groupes.ngroup().to_numpy()
+    fusion = np.zeros((groupes.ngroups, NB_SEAUX))
+    np.add.at(fusion, codes, comptes[masque])
+    return groupes.size().index.to_frame(index=False), fusion
+
+
+def construire_sketches_longs(df, dimensions=DIMENSIONS_SKETCH_LONG, poids=None):
+    """Sketches des distances en format long : une ligne par cellule et seau non vide (dimensions, SEAU, COMPTE)"""
+    distances = df['DISTANCE_PARIS_KM']
+    lignes = preparer_lignes(df, dimensions)[list(dimensions)]
+    lignes['SEAU'] = indices_seaux(distances.to_numpy()).astype(np.int16)
+    lignes['COMPTE'] = 1.0 if poids is None else df[poids].to_numpy(dtype=float)
+    lignes = lignes[distances.notna().to_numpy()]
+    return lignes.groupby([*dimensions, 'SEAU'], observed=True, sort=True, dropna=False)['COMPTE'].sum().reset_index()
+
+
+def fusionner_longs(long, par=(), filtres=None, index=None):
+    """Comme fusionner(), sur des sketches en format long (index bitmap de la table : voir filtrer_cube)"""
+    retenues = filtrer_cube(long, filtres, index)
+    if par:
+        groupes = retenues.groupby(list(par), observed=True, sort=True)
+        codes, nb_groupes = groupes.ngroup().to_numpy(), groupes.ngroups
+        cles = groupes.size().index.to_frame(index=False)
+    else:
+        codes, nb_groupes, cles = 0, 1, pd.DataFrame(index=[0])
+    positions = codes * NB_SEAUX + retenues['SEAU'].to_numpy(dtype=np.int64)
+    fusion = np.bincount(positions, weights=retenues['COMPTE'].to_numpy(), minlength=nb_groupes * NB_SEAUX)
+    return cles, fusion.reshape(nb_groupes, NB_SEAUX)
+
+
+def tronquer(comptes, bas=None, haut=None):
+    """Retire des sketches les seaux hors de [bas, haut]"""
+    garder = np.ones(NB_SEAUX, dtype=bool)
+    if bas is not None:
+        garder &= VALEURS_SEAUX >= bas
+    if haut is not None:
+        garder &= VALEURS_SEAUX <= haut
+    return comptes * garder
+
+
+def quantiles(comptes, probabilites):
+    """Quantiles approchés de chaque sketch : tableau [sketch, probabilité]"""
+    comptes = np.atleast_2d(comptes)
+    cumul = np.cumsum(comptes, axis=1)
+    totaux = cumul[:, -1:]
+    rangs = np.asarray(probabilites, dtype=float)[None, :] * totaux
+    # Premier seau dont le cumul atteint le rang demandé
+    indices = (cumul[:, None, :] < rangs[:, :, None]).sum(axis=2)
+    resultat = VALEURS_SEAUX[np.minimum(indices, NB_SEAUX - 1)]
+    return np.where(totaux > 0, resultat, np.nan)
+
+
+def statistiques_boite(comptes):
+    """Statistiques de boîte à moustaches (convention Plotly : moustaches à 1,5 × IQR)"""
+    comptes = np.atleast_2d(comptes)
+    q1, mediane, q3 = quantiles(comptes, [0.25, 0.5, 0.75]).T
+    iqr = q3 - q1
+
+    # Moustaches : valeurs observées extrêmes restant dans [q1 - 1,5 IQR, q3 + 1,5 IQR]
+    presents = comptes > 0
+    dans_bas = presents & (VALEURS_SEAUX[None, :] >= (q1 - 1.5 * iqr)[:, None])
+    dans_haut = presents & (VALEURS_SEAUX[None, :] <= (q3 + 1.5 * iqr)[:, None])
+    premier = np.argmax(dans_bas, axis=1)
+    dernier = NB_SEAUX - 1 - np.argmax(dans_haut[:, ::-1], axis=1)
+
+    return pd.DataFrame({
+        'n': comptes.sum(axis=1),
+        'q1': q1,
+        'median': mediane,
+        'q3': q3,
+        'lowerfence': VALEURS_SEAUX[premier],
+        'upperfence': VALEURS_SEAUX[dernier]
+    })
+
+
+def sketches_vers_table(cellules, comptes):
+    """Cellules et sketches dans un seul DataFrame (colonne COMPTES : un tableau par cellule)"""
+    return cellules.assign(COMPTES=list(comptes))
+
+
+def table_vers_sketches(table):
+    """Inverse de sketches_vers_table : (cellules, comptes)"""
+    cellules = table.drop(columns=['COMPTES'])
+    if table.empty:
+        return cellules, np.zeros((0, NB_SEAUX))
+    return cellules, np.stack(table['COMPTES'].to_numpy())
@@ -0,0 +1,354 @@
+# API DE REQUÊTES - UNE FONCTION PAR ANALYSE, SANS STREAMLIT
+#
+# Chaque analyse affichée par l'application est une fonction aux paramètres
+# explicites, qui retourne des DataFrames ou Series compacts prêts à tracer.
+# Les résultats sont mémoïsés par paramètres et par empreinte des sources :
+# une modification des données invalide d'elle-même les résultats en mémoire.
+# Les pages Streamlit ne font plus que le rendu ; un traitement par lots peut
+# appeler les mêmes fonctions. Les résultats sont partagés : ne pas les modifier.
+# Le paramètre filtres (tuple de donnees/filtres.py) applique les filtres
+# globaux de la sidebar : vide, la requête lit les tables exactes ; sinon elle
+# se résout sur le cube et les index bitmap, les sketches en format long et les
+# localisations détaillées, dont la taille ne dépend pas du nombre de lignes.
+# Chaque appel est une étape 'agregation' de la mesure de page en cours, et
+# chaque lecture de table une étape 'chargement' (donnees/instrumentation.py).
+
+import functools
+import inspect
+
+import numpy as np
+import pandas as pd
+
+from donnees.bitmaps import bits_filtres, compter, construire_index, masque
+from donnees.carte import NIVEAUX_DETAIL, agreger_localisations, agreger_par_cellule, top_localisations
+from donnees.cube import BORNES_TRANCHES, MODALITES, agreger, compter_distincts, filtrer_cube, masque_filtres
+from donnees.derives import (
+    BORNES_50KM, DERNIERE_ANNEE_PRE_COVID, POST_COVID, PRE_COVID, empreinte_courante, obtenir_table
+)
+from donnees.filtres import DIMENSIONS_FILTRES, restreindre
+from donnees.instrumentation import etape
+from donnees.quantiles import (
+    fusionner, fusionner_longs, quantiles, statistiques_boite, table_vers_sketches, tronquer
+)
+from donnees.series import DIMENSIONS_SERIES, construire_series, serie_dimension, variations_entre
+from donnees.treemap import construire_hierarchie
+
+# Nombre de résultats gardés en mémoire par fonction
+TAILLE_MEMO = 128
+
+# Part des distances gardée pour les boîtes à moustaches (outliers extrêmes exclus)
+BORNES_DISTANCES = (0.025, 0.975)
+
+# Tranches de distance du cube au-delà de la borne de agents_plus_50km
+TRANCHES_PLUS_50KM = tuple(i for i, borne in enumerate(BORNES_TRANCHES[:-1]) if borne >= BORNES_50KM[1])
+
+
+def _memoiser(fonction):
+    """Mémoïse une requête par ses paramètres et l'empreinte courante des sources"""
+    signature = inspect.signature(fonction)
+
+    @functools.lru_cache(maxsize=TAILLE_MEMO)
+    def calculer(empreinte, *args):
+        return fonction(*args)
+
+    @functools.wraps(fonction)
+    def requete(*args, **kwargs):
+        # Paramètres ramenés à leur forme positionnelle complète : une seule clé par appel équivalent
+        liaison = signature.bind(*args, **kwargs)
+        liaison.apply_defaults()
+        # Les listes sont acceptées en paramètre mais servent de clé sous forme de tuples
+        args = tuple(tuple(arg) if isinstance(arg, list) else arg for arg in liaison.args)
+        with etape('agregation', fonction.__name__):
+            return calculer(empreinte_courante(), *args)
+
+    requete.cache_clear = calculer.cache_clear
+    requete.cache_info = calculer.cache_info
+    return requete
+
+
+def statistiques_requetes():
+    """{fonction: {'succes', 'echecs'}} des mémos de toutes les requêtes"""
+    return {
+        nom: {'succes': fonction.cache_info().hits, 'echecs': fonction.cache_info().misses}
+        for nom, fonction in globals().items()
+        if callable(fonction) and hasattr(fonction, 'cache_info')
+    }
+
+
+def _suffixe(ponderer):
+    return 'agents' if ponderer else 'lignes'
+
+
+@_memoiser
+def table_derivee(nom: str) -> pd.DataFrame:
+    """Table dérivée (cache disque), gardée en mémoire pour les appels suivants"""
+    with etape('chargement', nom):
+        return obtenir_table(nom)
+
+
+@_memoiser
+def index_table(nom: str) -> dict:
+    """Index bitmap des colonnes catégorielles d'une table dérivée, construit à son premier usage"""
+    return construire_index(table_derivee(nom))
+
+
+def _index(nom, filtres):
+    """Index bitmap de la table nom, construit seulement si des filtres globaux s'appliquent"""
+    return index_table(nom) if filtres else None
+
+
+# =============================================================================
+# FILTRES GLOBAUX
+# =============================================================================
+@_memoiser
+def modalites_filtres() -> tuple[dict, pd.Series]:
+    """Modalités présentes de chaque dimension de DIMENSIONS_FILTRES et thématique de chaque direction"""
+    cube = table_derivee('cube')
+    modalites = {
+        dimension: sorted(cube[dimension].dropna().unique()) for dimension in DIMENSIONS_FILTRES
+    }
+    thematiques = cube.drop_duplicates('DIRECTION').set_index('DIRECTION')['DIRECTION_THEMATIQUE']
+    return modalites, thematiques.astype(str).sort_index()
+
+
+@_memoiser
+def effectif_filtre(filtres: tuple = ()) -> int:
+    """Nombre d'agents retenus par les filtres globaux, toutes années retenues confondues"""
+    return int(agreger(table_derivee('cube'), [], dict(filtres), _index('cube', filtres)))
+
+
+@_memoiser
+def cellules_filtrees(filtres: tuple = ()) -> int:
+    """Nombre de cellules du cube retenues par les filtres globaux (nul : aucun agent retenu).
+
+    Les filtres des colonnes indexées se comptent sur les bits de l'index, sans masque booléen.
+    """
+    cube = table_derivee('cube')
+    if not filtres:
+        return len(cube)
+    bits, autres = bits_filtres(index_table('cube'), dict(filtres))
+    if not autres:
+        return compter(bits)
+    return int((masque(bits, len(cube)) & masque_filtres(cube, autres)).sum())
+
+
+# =============================================================================
+# PRÉSENTATION ET CARTE
+# =============================================================================
+@_memoiser
+def resume_annee(annee: int, filtres: tuple = ()) -> tuple[pd.Series, pd.Series]:
+    """Indicateurs d'une année (AGENTS, VILLES, THEMATIQUES) et effectifs par catégorie A / B / C"""
+    cube, index = table_derivee('cube'), index_table('cube')
+    filtre = {**dict(filtres), 'DATE': annee}
+    # Communes : table (DATE, VILLE) de l'année, ou localisations détaillées filtrables
+    villes = localisations(annee, filtres) if filtres else filtrer_cube(table_derivee('villes'), {'DATE': annee})
+    indicateurs = pd.Series({
+        'AGENTS': agreger(cube, [], filtre, index),
+        'VILLES': villes.loc[villes['AGENT'] > 0, 'VILLE'].nunique(),
+        'THEMATIQUES': compter_distincts(cube, 'DIRECTION_THEMATIQUE', filtre, index)
+    })
+    categories = agreger(
+        cube, ['CATEGORIE'], restreindre(filtre, {'CATEGORIE': MODALITES['CATEGORIE']}), index
+    )
+    return indicateurs, categories
+
+
+@_memoiser
+def description_annee(annee: int) -> pd.DataFrame:
+    """Statistiques descriptives (describe) des colonnes numériques des lignes d'une année"""
+    return table_derivee(f'description_{annee}').set_index('STATISTIQUE').rename_axis(None)
+
+
+@_memoiser
+def localisations(annee: int, filtres: tuple = ()) -> pd.DataFrame:
+    """Localisations exactes d'une année : VILLE, LATITUDE, LONGITUDE, AGENT"""
+    if not filtres:
+        return table_derivee(f'localisations_{annee}')
+    # Table détaillée de l'année : le filtre sur les années ne s'y applique pas
+    nom = f'localisations_detail_{annee}'
+    selection = {colonne: valeurs for colonne, valeurs in filtres if colonne != 'DATE'}
+    return agreger_localisations(filtrer_cube(table_derivee(nom), selection, index_table(nom)))
+
+
+@_memoiser
+def cellules_carte(annee: int, niveau: str, filtres: tuple = ()) -> pd.DataFrame:
+    """Cellules de la carte d'une année pour un niveau de détail de NIVEAUX_DETAIL"""
+    precision, _ = NIVEAUX_DETAIL[niveau]
+    if filtres:
+        return agreger_par_cellule(localisations(annee, filtres), precision)
+    return table_derivee(f'cellules_{annee}_p{precision}')
+
+
+@_memoiser
+def classement_villes(annee: int, n: int = 20, filtres: tuple = ()) -> tuple[pd.DataFrame, int]:
+    """n localisations les plus peuplées (RANG, VILLE, coordonnées, AGENT, POURCENTAGE) et total de l'année"""
+    donnees_villes = localisations(annee, filtres)
+    total = donnees_villes['AGENT'].sum()
+    top = top_localisations(donnees_villes, n)
+    classement = pd.DataFrame({
+        'RANG': range(1, len(top) + 1),
+        'VILLE': top['VILLE'].to_numpy(),
+        'LATITUDE': top['LATITUDE'].to_numpy(),
+        'LONGITUDE': top['LONGITUDE'].to_numpy(),
+        'AGENT': top['AGENT'].to_numpy(),
+        'POURCENTAGE': (top['AGENT'] / total * 100).round(2).to_numpy()
+    })
+    return classement, total
+
+
+# =============================================================================
+# DISTANCES À PARIS
+# =============================================================================
+@_memoiser
+def _sketches_tronques(ponderer: bool):
+    """Sketches des distances restreints à la plage BORNES_DISTANCES de l'ensemble"""
+    cellules, comptes = table_vers_sketches(table_derivee(f'sketches_distance_{_suffixe(ponderer)}'))
+    _, sketch_global = fusionner(cellules, comptes)
+    bas, haut = quantiles(sketch_global, list(BORNES_DISTANCES))[0]
+    return cellules, tronquer(comptes, bas, haut)
+
+
+@_memoiser
+def _bornes_filtrees(ponderer: bool, filtres: tuple) -> tuple[float, float]:
+    """Plage BORNES_DISTANCES des distances retenues par les filtres globaux"""
+    nom = f'sketches_filtrables_{_suffixe(ponderer)}'
+    _, sketch_global = fusionner_longs(table_derivee(nom), (), dict(filtres), index_table(nom))
+    return tuple(quantiles(sketch_global, list(BORNES_DISTANCES))[0])
+
+
+@_memoiser
+def distances_par_groupe(par: tuple = (), ponderer: bool = True, filtres: tuple = ()) -> pd.DataFrame:
+    """Statistiques de boîte des distances par groupe (colonnes de par, n, q1, median, q3, moustaches).
+
+    Les modalités hors MODALITES sont exclues ; sans regroupement, une ligne pour l'ensemble.
+    Avec des filtres globaux, la plage BORNES_DISTANCES est celle des distances retenues.
+    """
+    modalites = {dimension: MODALITES[dimension] for dimension in par if dimension in MODALITES}
+    if filtres:
+        nom = f'sketches_filtrables_{_suffixe(ponderer)}'
+        groupes, fusion = fusionner_longs(table_derivee(nom), par, restreindre(filtres, modalites), index_table(nom))
+        return pd.concat([groupes, statistiques_boite(tronquer(fusion, *_bornes_filtrees(ponderer, filtres)))], axis=1)
+
+    cellules, comptes = _sketches_tronques(ponderer)
+    groupes, fusion = fusionner(cellules, comptes, par, modalites)
+    return pd.concat([groupes, statistiques_boite(fusion)], axis=1)
+
+
+# =============================================================================
+# DIRECTIONS ET CATÉGORIES
+# =============================================================================
+@_memoiser
+def hierarchie_treemap(filtres: tuple = ()) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Thématiques et directions (AGENTS, FEMMES, PCT_FEMMES), toutes années retenues confondues"""
+    if filtres:
+        return construire_hierarchie(
+            filtrer_cube(table_derivee('cube'), dict(filtres), index_table('cube'))
+        )
+    return table_derivee('treemap_thematiques'), table_derivee('treemap_directions')
+
+
+@_memoiser
+def tableau_croise_categories(filtres: tuple = ()) -> pd.DataFrame:
+    """Part (%) de chaque catégorie A / B / C par direction thématique, triée par part de A"""
+    tableau_croise = agreger(
+        table_derivee('cube'), ['DIRECTION_THEMATIQUE', 'CATEGORIE'],
+        restreindre(filtres, {'CATEGORIE': MODALITES['CATEGORIE']}), _index('cube', filtres)
+    ).unstack('CATEGORIE', fill_value=0).reindex(columns=MODALITES['CATEGORIE'], fill_value=0)
+    tableau_pct = tableau_croise.div(tableau_croise.sum(axis=1), axis=0) * 100
+    return tableau_pct.sort_values('A', ascending=False)
+
+
+# =============================================================================
+# ÉVOLUTION TEMPORELLE ET COVID
+# =============================================================================
+@_memoiser
+def series_temporelles(filtres: tuple = ()) -> pd.DataFrame:
+    """Séries annuelles des DIMENSIONS_SERIES (donnees/series.py) : table précalculée, ou recalculée
+    sur les cellules du cube retenues par les filtres"""
+    if not filtres:
+        return table_derivee('series_temporelles')
+    return construire_series(filtrer_cube(table_derivee('cube'), dict(filtres), index_table('cube')), MODALITES)
+
+
+@_memoiser
+def serie_temporelle(dimension: str, filtres: tuple = ()) -> pd.DataFrame:
+    """Séries annuelles d'une dimension : effectif, variation annuelle, part et part cumulée par modalité"""
+    return serie_dimension(series_temporelles(filtres), dimension)
+
+
+@_memoiser
+def variations(dimension: str, debut: int, fin: int, filtres: tuple = ()) -> pd.DataFrame:
+    """Variations de chaque modalité d'une dimension entre deux années (effectifs, parts, TCAM)"""
+    return variations_entre(serie_temporelle(dimension, filtres), debut, fin)
+
+
+@_memoiser
+def evolution(dimension: str, filtres: tuple = ()) -> pd.DataFrame:
+    """Effectifs par année et modalité d'une dimension du cube (DATE, dimension, AGENT)"""
+    if dimension in DIMENSIONS_SERIES:
+        # Lignes des modalités présentes dans l'année, comme le roll-up du cube
+        serie = serie_temporelle(dimension, filtres)
+        serie = serie[(serie['AGENT'] > 0).to_numpy()]
+        return pd.DataFrame({
+            'DATE': serie['DATE'].to_numpy(),
+            dimension: serie['MODALITE'].array,
+            'AGENT': serie['AGENT'].to_numpy()
+        })
+    selection = restreindre(filtres, {dimension: MODALITES[dimension]} if dimension in MODALITES else {})
+    return agreger(
+        table_derivee('cube'), ['DATE', dimension], selection, _index('cube', filtres)
+    ).reset_index()
+
+
+@_memoiser
+def parts_annuelles(dimension: str, filtres: tuple = ()) -> pd.DataFrame:
+    """Part (%) de chaque modalité d'une dimension, par année (index DATE, une colonne par modalité)"""
+    effectifs = evolution(dimension, filtres).pivot(index='DATE', columns=dimension, values='AGENT')
+    return effectifs.div(effectifs.sum(axis=1), axis=0) * 100
+
+
+def _comparaison_filtree(ponderer, filtres):
+    """comparaison_covid() sur les cellules retenues : moyennes exactes depuis les mesures du cube,
+    quantiles depuis les sketches en format long"""
+    cube, index = table_derivee('cube'), index_table('cube')
+    somme, poids = ('DISTANCE_AGENTS', 'AGENT') if ponderer else ('DISTANCE_LIGNES', 'LIGNES')
+    sommes = filtrer_cube(cube, dict(filtres), index).groupby('DATE', observed=True)[[somme, poids]].sum()
+    distance_annuelle = (sommes[somme] / sommes[poids]).rename('DISTANCE_PARIS_KM')
+
+    # Sketches et sommes annuels regroupés par période (une période sans année retenue reste vide)
+    nom = f'sketches_filtrables_{_suffixe(ponderer)}'
+    annees, fusion = fusionner_longs(table_derivee(nom), ('DATE',), dict(filtres), index_table(nom))
+    periodes = sorted([PRE_COVID, POST_COVID])
+    comptes = pd.DataFrame(fusion).groupby(
+        np.where(annees['DATE'].to_numpy() <= DERNIERE_ANNEE_PRE_COVID, PRE_COVID, POST_COVID)
+    ).sum().reindex(periodes, fill_value=0)
+    sommes = sommes.groupby(
+        np.where(sommes.index <= DERNIERE_ANNEE_PRE_COVID, PRE_COVID, POST_COVID)
+    ).sum().reindex(periodes, fill_value=0)
+    stats_periode = statistiques_boite(comptes.to_numpy()).set_index(comptes.index.rename('Période'))
+    stats_periode.insert(1, 'mean', sommes[somme] / sommes[poids])
+    return distance_annuelle, stats_periode, agents_plus_50km(filtres)
+
+
+@_memoiser
+def agents_plus_50km(filtres: tuple = ()) -> pd.Series:
+    """Agents à plus de 50 km par année (sans pondération : c'est déjà un nombre d'agents)"""
+    if filtres:
+        return agreger(
+            table_derivee('cube'), ['DATE'], restreindre(filtres, {'TRANCHE_DISTANCE': TRANCHES_PLUS_50KM}),
+            index_table('cube')
+        )
+    return table_derivee('agents_plus_50km').set_index('DATE')['AGENT']
+
+
+@_memoiser
+def comparaison_covid(ponderer: bool = True, filtres: tuple = ()) -> tuple[pd.Series, pd.DataFrame, pd.Series]:
+    """Distance moyenne par année, statistiques par période (pré / post-COVID) et agents à plus de 50 km"""
+    if filtres:
+        return _comparaison_filtree(ponderer, filtres)
+    suffixe = _suffixe(ponderer)
+    return (
+        table_derivee(f'covid_distance_annuelle_{suffixe}').set_index('DATE')['DISTANCE_PARIS_KM'],
+        table_derivee(f'covid_periodes_{suffixe}').set_index('Période'),
+        agents_plus_50km()
+    )
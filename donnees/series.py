@@ -0,0 +1,106 @@
+# SÉRIES TEMPORELLES PRÉCALCULÉES PAR DIMENSION
+#
+# Une table longue (DIMENSION, MODALITE, DATE) rassemble, pour chaque
+# dimension de DIMENSIONS_SERIES, l'effectif annuel de chaque modalité et ce
+# qui s'en déduit d'une année sur l'autre : variation annuelle (en agents et
+# en %), part de la modalité dans l'année et part cumulée (modalités de la
+# plus grande à la plus petite). Chaque modalité a une ligne pour chaque
+# année (effectif nul si elle est absente), de sorte que les variations entre
+# deux années quelconques (écart, taux de croissance annuel moyen) se lisent
+# sur deux lignes de la table (variations_entre()), sans réagrégation.
+# Construite depuis le cube, elle compte quelques centaines de lignes quelle
+# que soit la taille des données : libellés catégoriels, années en int16,
+# parts et variations en float32.
+
+import numpy as np
+import pandas as pd
+
+from donnees.cube import agreger
+
+# Dimensions suivies dans le temps, de la plus grossière à la plus fine
+DIMENSIONS_SERIES = ['DIRECTION_THEMATIQUE', 'DIRECTION', 'CATEGORIE', 'SEXE']
+
+
+def _pourcentage(numerateur, denominateur):
+    """numerateur / denominateur en %, NaN quand le dénominateur est nul"""
+    numerateur = np.asarray(numerateur, dtype=float)
+    denominateur = np.asarray(denominateur, dtype=float)
+    return np.divide(
+        numerateur * 100, denominateur, out=np.full_like(numerateur, np.nan), where=denominateur != 0
+    )
+
+
+def _serie(effectifs, dimension):
+    """Lignes de la table pour une dimension, depuis ses effectifs (index DATE, une colonne par modalité)"""
+    annees, modalites = effectifs.index.to_numpy(), effectifs.columns.astype(str)
+    agents = effectifs.to_numpy()
+    precedents = np.vstack([np.full((1, agents.shape[1]), np.nan), agents[:-1]])
+    totaux = agents.sum(axis=1, keepdims=True)
+    parts = _pourcentage(agents, np.broadcast_to(totaux, agents.shape))
+
+    # Part cumulée : modalités de l'année classées de la plus grande à la plus petite
+    ordre = np.argsort(-agents, axis=1, kind='stable')
+    cumulees = np.empty_like(parts)
+    np.put_along_axis(cumulees, ordre, np.cumsum(np.take_along_axis(parts, ordre, axis=1), axis=1), axis=1)
+
+    return pd.DataFrame({
+        'DIMENSION': dimension,
+        'MODALITE': np.tile(modalites, len(annees)),
+        'DATE': np.repeat(annees, len(modalites)).astype(np.int16),
+        'AGENT': agents.ravel(),
+        'VARIATION': (agents - precedents).ravel().astype(np.float32),
+        'VARIATION_PCT': _pourcentage(agents - precedents, precedents).ravel().astype(np.float32),
+        'PART': parts.ravel().astype(np.float32),
+        'PART_CUMULEE': cumulees.ravel().astype(np.float32)
+    })
+
+
+def construire_series(cube, modalites=None):
+    """Table des séries de DIMENSIONS_SERIES depuis un cube (ou des lignes brutes) avec DATE et AGENT.
+
+    modalites : {dimension: modalités retenues} ; les autres modalités sont ignorées.
+    """
+    modalites = modalites or {}
+    series = []
+    for dimension in DIMENSIONS_SERIES:
+        filtres = {dimension: modalites[dimension]} if dimension in modalites else None
+        effectifs = agreger(cube, ['DATE', dimension], filtres).unstack(dimension, fill_value=0)
+        series.append(_serie(effectifs.sort_index(axis=1), dimension))
+    series = pd.concat(series, ignore_index=True)
+    for colonne in ['DIMENSION', 'MODALITE']:
+        series[colonne] = series[colonne].astype('category')
+    return series
+
+
+def serie_dimension(series, dimension):
+    """Lignes d'une dimension de la table des séries, MODALITE en catégories propres à la dimension"""
+    serie = series[(series['DIMENSION'] == dimension).to_numpy()]
+    modalites = serie['MODALITE'].astype(str)
+    return serie.assign(MODALITE=pd.Categorical(modalites, categories=sorted(modalites.unique())))
+
+
+def variations_entre(serie, debut, fin):
+    """Variations de chaque modalité d'une dimension (serie_dimension()) entre les années debut et fin.
+
+    Colonnes : effectifs et parts des deux années, variation (agents, %),
+    taux de croissance annuel moyen (TCAM, %) et écart des parts (points).
+    """
+    effectifs = serie.pivot(index='MODALITE', columns='DATE', values='AGENT')
+    parts = serie.pivot(index='MODALITE', columns='DATE', values='PART')
+    depart, arrivee = effectifs[debut].astype(float), effectifs[fin].astype(float)
+    # TCAM défini seulement si les deux effectifs sont positifs et les années distinctes
+    duree = fin - debut
+    valide = (depart > 0) & (arrivee > 0) & (duree != 0)
+    rapport = np.divide(arrivee, depart, out=np.ones(len(depart)), where=valide.to_numpy())
+    tcam = np.where(valide, (rapport ** (1 / duree if duree else 1) - 1) * 100, np.nan)
+
+    return pd.DataFrame({
+        'AGENT_DEBUT': effectifs[debut],
+        'AGENT_FIN': effectifs[fin],
+        'VARIATION': arrivee - depart,
+        'VARIATION_PCT': _pourcentage(arrivee - depart, depart),
+        'TCAM_PCT': tcam,
+        'PART_DEBUT': parts[debut].astype(float),
+        'PART_FIN': parts[fin].astype(float),
+        'ECART_PARTS': (parts[fin] - parts[debut]).astype(float)
+    }).sort_values('AGENT_FIN', ascending=False)
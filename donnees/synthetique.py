@@ -0,0 +1,84 @@
+# JEUX DE DONNÉES SYNTHÉTIQUES (MÊME SCHÉMA, TAILLE MULTIPLIÉE)
+#
+# Un jeu synthétique de facteur k compte k fois plus de lignes que le fichier
+# réel : chaque année est tirée au hasard parmi les lignes réelles de la même
+# année, ce qui conserve la répartition par année (les colonnes
+# texte restent en dictionnaire Arrow, le tirage ne copie pas les chaînes),
+# puis l'effectif AGENT et la distance sont bruités pour que les agrégats et
+# les quantiles ne soient pas de simples multiples des valeurs réelles.
+# Le dossier produit contient le parquet unique et les partitions annuelles,
+# aux mêmes noms que dans le projet : l'application y tourne telle quelle.
+#
+# Usage : python -m donnees.synthetique FACTEUR DOSSIER
+
+import os
+import sys
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from donnees.chargement import FICHIER_DONNEES
+from donnees.partitions import CLE_PARTITION, DOSSIER_PARTITIONS, ecrire_partition
+
+# Bruit multiplicatif appliqué aux distances (± 5 %)
+BRUIT_DISTANCE = 0.05
+
+
+def _tirer(reel, facteur, generateur):
+    """facteur × len(reel) lignes tirées dans reel, AGENT et distance bruités"""
+    nb_lignes = int(round(reel.num_rows * facteur))
+    # Tirage trié : l'ordre des lignes reste proche de celui du fichier réel
+    indices = np.sort(generateur.integers(0, reel.num_rows, nb_lignes))
+    table = reel.take(pa.array(indices))
+
+    agents = table.column('AGENT').to_numpy()
+    agents = np.maximum(1, generateur.poisson(agents)).astype(agents.dtype)
+
+    distances = table.column('DISTANCE_PARIS_KM').to_numpy(zero_copy_only=False)
+    bruit = generateur.uniform(1 - BRUIT_DISTANCE, 1 + BRUIT_DISTANCE, nb_lignes)
+    distances = np.round(distances * bruit, 2)
+
+    table = table.set_column(table.schema.get_field_index('AGENT'), 'AGENT', pa.array(agents))
+    return table.set_column(
+        table.schema.get_field_index('DISTANCE_PARIS_KM'), 'DISTANCE_PARIS_KM', pa.array(distances)
+    )
+
+
+def generer(facteur, graine=0, source=FICHIER_DONNEES):
+    """Tables synthétiques année par année : (annee, table Arrow de facteur × lignes réelles de l'année)
+
+    Une année à la fois en mémoire, ce qui permet les grands facteurs.
+    """
+    schema = pq.read_schema(source)
+    reel = pq.read_table(source, read_dictionary=[
+        champ.name for champ in schema if champ.type == pa.string()
+    ])
+    generateur = np.random.default_rng(graine)
+    for annee in sorted(pc.unique(reel.column(CLE_PARTITION)).to_pylist()):
+        annuelle = reel.filter(pc.equal(reel.column(CLE_PARTITION), annee))
+        yield annee, _tirer(annuelle, facteur, generateur)
+
+
+def ecrire_jeu(facteur, dossier, graine=0, source=FICHIER_DONNEES):
+    """Écrit dans dossier le parquet unique et les partitions annuelles d'un jeu synthétique"""
+    os.makedirs(dossier, exist_ok=True)
+    nb_lignes = 0
+    writer = None
+    try:
+        for annee, table in generer(facteur, graine, source):
+            if writer is None:
+                writer = pq.ParquetWriter(os.path.join(dossier, FICHIER_DONNEES), table.schema)
+            writer.write_table(table)
+            ecrire_partition(table.to_pandas(), annee, os.path.join(dossier, DOSSIER_PARTITIONS))
+            nb_lignes += table.num_rows
+    finally:
+        if writer is not None:
+            writer.close()
+    return nb_lignes
+
+
+if __name__ == '__main__':
+    facteur, dossier = float(sys.argv[1]), sys.argv[2]
+    print(f"{ecrire_jeu(facteur, dossier):,} lignes écrites dans {dossier}/")
@@ -0,0 +1,109 @@
+# TREEMAP - HIÉRARCHIE THÉMATIQUES > DIRECTIONS
+#
+# Une seule agrégation (thématique, direction) donne le total d'agents et le
+# nombre de femmes ; le niveau thématique s'en déduit par un roll-up de ce
+# petit résultat. Les noms complets sont joints via l'index inverse du
+# référentiel au lieu d'un parcours de DIRECTION_MAPPING par direction.
+
+import numpy as np
+import pandas as pd
+
+from donnees.directions import DIRECTION_MAPPING, NOMS_DIRECTIONS
+
+
+def _pct_femmes(femmes, agents):
+    """Part de femmes en %, 0 quand le total est nul"""
+    femmes = np.asarray(femmes, dtype=float)
+    agents = np.asarray(agents, dtype=float)
+    return np.divide(femmes * 100, agents, out=np.zeros_like(agents), where=agents > 0)
+
+
+def construire_hierarchie(data):
+    """Retourne (thematiques, directions) avec AGENTS, FEMMES et PCT_FEMMES.
+
+    data : lignes brutes ou cube, avec DIRECTION_THEMATIQUE, DIRECTION, SEXE, AGENT.
+    """
+    data = data.dropna(subset=['DIRECTION_THEMATIQUE', 'DIRECTION', 'SEXE'])
+    agents = data['AGENT'].to_numpy()
+    femmes = np.where((data['SEXE'] == 'FEMININ').to_numpy(), agents, 0)
+
+    directions = pd.DataFrame({
+        'DIRECTION_THEMATIQUE': data['DIRECTION_THEMATIQUE'].to_numpy(),
+        'DIRECTION': data['DIRECTION'].to_numpy(),
+        'AGENTS': agents,
+        'FEMMES': femmes
+    }).groupby(['DIRECTION_THEMATIQUE', 'DIRECTION']).sum().reset_index()
+    directions['PCT_FEMMES'] = _pct_femmes(directions['FEMMES'], directions['AGENTS'])
+    directions['NOM_COMPLET'] = directions['DIRECTION'].map(NOMS_DIRECTIONS)
+
+    thematiques = directions.groupby('DIRECTION_THEMATIQUE')[['AGENTS', 'FEMMES']].sum().reset_index()
+    thematiques['PCT_FEMMES'] = _pct_femmes(thematiques['FEMMES'], thematiques['AGENTS'])
+
+    return thematiques, directions
+
+
+def elements_treemap(thematiques, directions):
+    """Listes labels / parents / values / colors / hover_texts pour go.Treemap"""
+    titres = np.where(
+        directions['NOM_COMPLET'].notna(),
+        directions['DIRECTION'] + ' - ' + directions['NOM_COMPLET'].fillna(''),
+        directions['DIRECTION']
+    )
+
+    hover_thematiques = [
+        f"<b>{thematique}</b><br>"
+        f"Total: {int(total):,} agents<br>"
+        f"Femmes: {pct:.1f}%"
+        for thematique, total, pct in zip(
+            thematiques['DIRECTION_THEMATIQUE'], thematiques['AGENTS'], thematiques['PCT_FEMMES']
+        )
+    ]
+    hover_directions = [
+        f"<b>{titre}</b><br>"
+        f"Catégorie: {thematique}<br>"
+        f"Total: {int(total):,} agents<br>"
+        f"Femmes: {pct:.1f}%"
+        for titre, thematique, total, pct in zip(
+            titres, directions['DIRECTION_THEMATIQUE'], directions['AGENTS'], directions['PCT_FEMMES']
+        )
+    ]
+
+    return {
+        'labels': list(thematiques['DIRECTION_THEMATIQUE']) + list(directions['DIRECTION']),
+        'parents': [''] * len(thematiques) + list(directions['DIRECTION_THEMATIQUE']),
+        'values': list(thematiques['AGENTS']) + list(directions['AGENTS']),
+        'colors': list(thematiques['PCT_FEMMES']) + list(directions['PCT_FEMMES']),
+        'hover_texts': hover_thematiques + hover_directions
+    }
+
+
+def composition_thematique(directions, thematique):
+    """Tableau des directions du référentiel pour une thématique (directions sans agent exclues)"""
+    par_direction = directions.groupby('DIRECTION')[['AGENTS', 'FEMMES']].sum()
+    sigles = [sigle for sigle in DIRECTION_MAPPING[thematique] if sigle in par_direction.index]
+    lignes = par_direction.loc[sigles]
+    lignes = lignes[lignes['AGENTS'] > 0]
+
+    table_df = pd.DataFrame({
+        'Sigle': lignes.index,
+        'Nom complet': [DIRECTION_MAPPING[thematique][sigle] for sigle in lignes.index],
+        'Agents': lignes['AGENTS'].to_numpy(),
+        '% Femmes': _pct_femmes(lignes['FEMMES'], lignes['AGENTS'])
+    })
+    if not table_df.empty:
+        total = table_df['Agents'].sum()
+        table_df['% Total'] = (table_df['Agents'] / total * 100).round(2)
+        table_df = table_df.sort_values('Agents', ascending=False)
+    return table_df
+
+
+def recapitulatif_thematiques(thematiques):
+    """Tableau récapitulatif : total, part de femmes et poids de chaque thématique"""
+    summary_df = pd.DataFrame({
+        'Catégorie Thématique': thematiques['DIRECTION_THEMATIQUE'],
+        'Total Agents': thematiques['AGENTS'],
+        '% Femmes': thematiques['PCT_FEMMES']
+    }).sort_values('Total Agents', ascending=False)
+    total_general = summary_df['Total Agents'].sum()
+    summary_df['% du Total'] = (summary_df['Total Agents'] / total_general * 100).round(2)
+    return summary_df
@@ -0,0 +1,33 @@
+# PIC D'ALLOCATIONS DES PAGES SOUS TRACEMALLOC
+#
+# Chaque page est exécutée par AppTest sous tracemalloc (voir vues/banc_essai.py),
+# sur un jeu synthétique de la taille du fichier réel et un cache disque
+# préchauffé : son pic d'allocations Python / NumPy ne doit pas dépasser
+# PLAFOND_ALLOCATIONS fois la taille des colonnes chargées du jeu.
+#
+# Usage : python -m pytest tests/test_allocations.py
+
+import pytest
+
+from vues.banc_essai import PLAFOND_ALLOCATIONS, SCRIPTS, mesurer_allocations, prechauffer_jeu, preparer_jeu
+
+# Taille du jeu synthétique, en multiple du fichier réel
+FACTEUR = 1
+
+
+@pytest.fixture(scope='module')
+def dossier_jeu(tmp_path_factory):
+    """Dossier d'un jeu synthétique dont le cache disque des tables dérivées est préchauffé"""
+    dossier, _ = preparer_jeu(FACTEUR, str(tmp_path_factory.mktemp('banc_essai')))
+    prechauffer_jeu(dossier)
+    return dossier
+
+
+@pytest.mark.parametrize('nom', list(SCRIPTS))
+def test_pic_allocations(nom, dossier_jeu):
+    mesure = mesurer_allocations(nom, dossier_jeu)
+    assert 'erreur' not in mesure, mesure.get('erreur')
+    assert mesure['pic_allocations_mo'] <= PLAFOND_ALLOCATIONS * mesure['source_mo'], (
+        f"{nom} : pic de {mesure['pic_allocations_mo']:.1f} Mo > "
+        f"{PLAFOND_ALLOCATIONS} × {mesure['source_mo']:.1f} Mo"
+    )
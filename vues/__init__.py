@@ -0,0 +1,28 @@
+# PAGES DE L'APPLICATION - REGISTRE À IMPORT DIFFÉRÉ
+#
+# Chaque page est un module exposant afficher(). Le module (et ses
+# dépendances lourdes : plotly, PIL...) n'est importé qu'à la première
+# sélection de la page, puis reste en mémoire pour les reruns suivants.
+# Ce fichier ne doit pas importer streamlit (voir donnees/__init__.py).
+#
+# Mesure du gain au démarrage : python -m vues.mesure_imports
+
+import importlib
+
+# Libellé affiché dans la navigation -> module de la page
+PAGES = {
+    "Présentation des données": 'vues.presentation',
+    "Carte géographique": 'vues.carte',
+    "Analyse géographique détaillée": 'vues.distances',
+    "Treemap - Directions thématiques": 'vues.treemap',
+    "Analyse par catégorie": 'vues.categories',
+    "Évolution temporelle": 'vues.evolution',
+    "Analyse post-COVID": 'vues.post_covid',
+    "WordCloud - Text Mining": 'vues.wordcloud'
+}
+
+
+def afficher_page(nom):
+    """Importe le module de la page au premier affichage puis l'exécute"""
+    module = importlib.import_module(PAGES[nom])
+    module.afficher()
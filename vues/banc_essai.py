@@ -0,0 +1,342 @@
+# BANC D'ESSAI DES PAGES SUR DONNÉES SYNTHÉTIQUES
+#
+# Pour chaque facteur de taille (1×, 10×, 100× par défaut), un jeu synthétique
+# au schéma du fichier réel est écrit dans un dossier de travail (voir
+# donnees/synthetique.py), puis chaque page est exécutée sans navigateur par
+# streamlit.testing (AppTest), dans un interpréteur neuf lancé depuis ce
+# dossier. Trois mesures par page :
+#   - froid  : cache disque des tables dérivées vide (tout est recalculé) ;
+#   - disque : cache disque préchauffé, caches Streamlit vides (démarrage) ;
+#   - rerun  : second affichage dans le même processus (caches Streamlit pleins).
+# Chaque mesure relève le temps, le pic de mémoire (RSS) ajouté par la page et
+# la taille des données envoyées au navigateur (figures Plotly, une à une et
+# au total, tableaux). Sous Linux, le pic de RSS du processus (VmHWM) est
+# remis à zéro avant chaque exécution : c'est le pic propre à la page.
+# Les résultats sont écrits en JSON ; --comparer affiche les écarts avec un
+# fichier produit par une autre révision.
+# Avec --plafond-allocations K, chaque page est exécutée une fois de plus sous
+# tracemalloc (cache disque préchauffé) : le banc échoue si le pic des
+# allocations Python / NumPy d'une page dépasse K fois la taille des colonnes
+# chargées du jeu. tests/test_allocations.py fait le même contrôle sous pytest.
+#
+# Usage : python -m vues.banc_essai [--facteurs 1,10,100] [--sortie banc_essai.json]
+#                                   [--dossier DOSSIER] [--comparer ANCIEN.json]
+#                                   [--plafond-allocations K]
+
+import datetime
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+
+from donnees.cache_disque import DOSSIER_CACHE
+from donnees.chargement import FICHIER_DONNEES
+from donnees.synthetique import ecrire_jeu
+from vues import PAGES
+
+RACINE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+FACTEURS = [1, 10, 100]
+
+# Pic d'allocations admis par page, en multiple de la taille des colonnes chargées
+PLAFOND_ALLOCATIONS = 2.0
+
+# Fichiers du projet lus par les pages en plus des données
+FICHIERS_ANNEXES = ['wordcloud_article_lefigaro.png']
+
+# Chargement commun à toutes les pages (fait par streamlit.py avant la page)
+SOCLE = 'Socle (charger_donnees)'
+SCRIPTS = {SOCLE: 'from vues.chargement import charger_donnees\ncharger_donnees()\n'}
+SCRIPTS.update({
+    nom: f'from vues import afficher_page\nafficher_page({nom!r})\n' for nom in PAGES
+})
+
+# Modules importés par chaque script
+MODULES = {nom: ['vues.chargement', module] for nom, module in PAGES.items()}
+MODULES[SOCLE] = ['vues.chargement']
+
+# Imports et démarrage d'AppTest faits avant la mesure (coût mesuré par vues.mesure_imports)
+_CODE_PAGE = '''
+import importlib, json, resource, sys, time
+sys.path.append({racine!r})
+from streamlit.testing.v1 import AppTest
+for module in {modules!r}:
+    importlib.import_module(module)
+AppTest.from_string('pass').run()
+
+def memoire_ko(champ):
+    """VmRSS / VmHWM (Ko) du processus, None hors Linux"""
+    try:
+        with open('/proc/self/status') as statut:
+            return next(int(ligne.split()[1]) for ligne in statut if ligne.startswith(champ + ':'))
+    except (OSError, StopIteration):
+        return None
+
+def remettre_pic():
+    """Ramène le pic de RSS (VmHWM) au RSS courant ; False si le système ne le permet pas"""
+    try:
+        with open('/proc/self/clear_refs', 'w') as fichier:
+            fichier.write('5')
+        return True
+    except OSError:
+        return False
+
+def mesurer(at):
+    # Pic propre à l'exécution : sans remise à zéro, ru_maxrss garde le maximum de tout le processus
+    # (imports, exécutions précédentes) et l'écart mesuré serait nul après une exécution plus gourmande
+    par_pic = remettre_pic() and memoire_ko('VmRSS') is not None
+    rss_avant = memoire_ko('VmRSS') if par_pic else resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    debut = time.perf_counter()
+    at.run()
+    duree = time.perf_counter() - debut
+    if at.exception:
+        raise RuntimeError(at.exception[0].message)
+    pic = (memoire_ko('VmHWM') if par_pic else resource.getrusage(resource.RUSAGE_SELF).ru_maxrss) - rss_avant
+    return {{'temps_s': duree, 'pic_memoire_mo': pic / 1024}}
+
+at = AppTest.from_string({script!r}, default_timeout=3600)
+resultat = mesurer(at)
+rerun = mesurer(at)
+resultat['rerun_s'], resultat['pic_rerun_mo'] = rerun['temps_s'], rerun['pic_memoire_mo']
+figures = at.get('plotly_chart')
+resultat['nb_figures'] = len(figures)
+resultat['octets_par_figure'] = [len(figure.proto.spec.encode()) for figure in figures]
+resultat['octets_figures'] = sum(resultat['octets_par_figure'])
+resultat['octets_tableaux'] = sum(len(tableau.proto.data) for tableau in at.dataframe)
+print(json.dumps(resultat))
+'''
+
+# Une première exécution charge les imports paresseux (validateurs Plotly...) ; les caches
+# (Streamlit, requêtes, jeu mappé) sont ensuite vidés et seule la seconde exécution est tracée.
+# La taille du jeu est lue avant le traçage (mémoire Arrow, non tracée).
+_CODE_ALLOCATIONS = '''
+import importlib, json, sys, tracemalloc
+sys.path.append({racine!r})
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+for module in {modules!r}:
+    importlib.import_module(module)
+from donnees import derives, requetes
+from donnees.chargement import COLONNES_UTILISEES
+from donnees.partitions import ouvrir_dataset
+from vues.figures import vider_cache_figures
+
+AppTest.from_string({script!r}, default_timeout=3600).run()
+st.cache_data.clear()
+st.cache_resource.clear()
+for fonction in vars(requetes).values():
+    if hasattr(fonction, 'cache_clear'):
+        fonction.cache_clear()
+derives._table_donnees.cache_clear()
+vider_cache_figures()
+taille_source = ouvrir_dataset().to_table(columns=COLONNES_UTILISEES).nbytes
+
+at = AppTest.from_string({script!r}, default_timeout=3600)
+tracemalloc.start()
+at.run()
+_, pic = tracemalloc.get_traced_memory()
+tracemalloc.stop()
+if at.exception:
+    raise RuntimeError(at.exception[0].message)
+print(json.dumps({{'pic_allocations_mo': pic / 1024 ** 2, 'source_mo': taille_source / 1024 ** 2}}))
+'''
+
+_CODE_PRECHAUFFAGE = '''
+import json, sys, time
+sys.path.append({racine!r})
+from donnees.prechauffage import prechauffer
+debut = time.perf_counter()
+durees = prechauffer()
+print(json.dumps({{'temps_s': time.perf_counter() - debut, 'nb_tables': len(durees)}}))
+'''
+
+
+def _executer(code, dossier):
+    """Exécute du code dans un interpréteur neuf depuis dossier ; retourne le JSON de sa dernière ligne"""
+    sortie = subprocess.run(
+        [sys.executable, '-c', code], cwd=dossier, capture_output=True, text=True
+    )
+    if sortie.returncode < 0:
+        raise RuntimeError(f"Interrompu par le signal {-sortie.returncode} (mémoire insuffisante ?)")
+    if sortie.returncode != 0:
+        raise RuntimeError(sortie.stderr.strip().splitlines()[-1])
+    return json.loads(sortie.stdout.strip().splitlines()[-1])
+
+
+def preparer_jeu(facteur, dossier):
+    """Dossier du jeu synthétique d'un facteur (réutilisé s'il existe déjà) et son nombre de lignes"""
+    dossier_jeu = os.path.join(dossier, f'x{facteur:g}')
+    marqueur = os.path.join(dossier_jeu, 'lignes.txt')
+    if not os.path.exists(marqueur):
+        shutil.rmtree(dossier_jeu, ignore_errors=True)
+        nb_lignes = ecrire_jeu(facteur, dossier_jeu, source=os.path.join(RACINE, FICHIER_DONNEES))
+        with open(marqueur, 'w') as fichier:
+            fichier.write(str(nb_lignes))
+    for nom in FICHIERS_ANNEXES:
+        if os.path.exists(os.path.join(RACINE, nom)) and not os.path.exists(os.path.join(dossier_jeu, nom)):
+            shutil.copy(os.path.join(RACINE, nom), dossier_jeu)
+    with open(marqueur) as fichier:
+        return dossier_jeu, int(fichier.read())
+
+
+def mesurer_page(nom, dossier_jeu, code=_CODE_PAGE):
+    """Mesures d'un script de SCRIPTS dans un interpréteur neuf lancé depuis le dossier du jeu.
+
+    Un échec (exception, mémoire insuffisante...) est consigné au lieu d'interrompre le banc.
+    """
+    code = code.format(racine=RACINE, script=SCRIPTS[nom], modules=MODULES[nom])
+    try:
+        return _executer(code, dossier_jeu)
+    except RuntimeError as erreur:
+        return {'erreur': str(erreur)}
+
+
+def prechauffer_jeu(dossier_jeu):
+    """Préchauffe le cache disque des tables dérivées du jeu (interpréteur neuf) : {'temps_s', 'nb_tables'}"""
+    return _executer(_CODE_PRECHAUFFAGE.format(racine=RACINE), dossier_jeu)
+
+
+def mesurer_allocations(nom, dossier_jeu):
+    """Pic d'allocations d'un script de SCRIPTS sous tracemalloc, cache disque préchauffé :
+    {'pic_allocations_mo', 'source_mo'} ou {'erreur'}"""
+    return mesurer_page(nom, dossier_jeu, _CODE_ALLOCATIONS)
+
+
+def mesurer_facteur(facteur, dossier, allocations=False):
+    """Mesures de toutes les pages pour un facteur de taille (et pic d'allocations si demandé)"""
+    dossier_jeu, nb_lignes = preparer_jeu(facteur, dossier)
+    pages = {}
+    for nom in SCRIPTS:
+        shutil.rmtree(os.path.join(dossier_jeu, DOSSIER_CACHE), ignore_errors=True)
+        pages[nom] = {'froid': mesurer_page(nom, dossier_jeu)}
+
+    shutil.rmtree(os.path.join(dossier_jeu, DOSSIER_CACHE), ignore_errors=True)
+    try:
+        prechauffage = prechauffer_jeu(dossier_jeu)
+    except RuntimeError as erreur:
+        prechauffage = {'erreur': str(erreur)}
+    for nom in SCRIPTS:
+        pages[nom]['disque'] = mesurer_page(nom, dossier_jeu)
+        if allocations:
+            pages[nom]['allocations'] = mesurer_allocations(nom, dossier_jeu)
+    return {'facteur': facteur, 'lignes': nb_lignes, 'prechauffage': prechauffage, 'pages': pages}
+
+
+def revision():
+    """Commit courant du dépôt (ou None hors dépôt git)"""
+    sortie = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=RACINE, capture_output=True, text=True)
+    return sortie.stdout.strip() or None
+
+
+def executer_banc(facteurs=FACTEURS, dossier=None, allocations=False):
+    """Mesures complètes pour chaque facteur, prêtes à écrire en JSON"""
+    dossier = dossier or os.path.join(tempfile.gettempdir(), 'banc_essai_agents')
+    return {
+        'revision': revision(),
+        'date': datetime.datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'resultats': [mesurer_facteur(facteur, dossier, allocations) for facteur in facteurs]
+    }
+
+
+def _lignes(resultats):
+    """(facteur, page, mesure) -> temps en secondes"""
+    temps = {}
+    for resultat in resultats['resultats']:
+        for nom, page in resultat['pages'].items():
+            if 'temps_s' in page['froid']:
+                temps[(resultat['facteur'], nom, 'froid')] = page['froid']['temps_s']
+            if 'temps_s' in page['disque']:
+                temps[(resultat['facteur'], nom, 'disque')] = page['disque']['temps_s']
+                temps[(resultat['facteur'], nom, 'rerun')] = page['disque']['rerun_s']
+    return temps
+
+
+def _octets_figures(resultats):
+    """(facteur, page) -> octets des figures envoyées au navigateur"""
+    return {
+        (resultat['facteur'], nom): page['disque']['octets_figures']
+        for resultat in resultats['resultats'] for nom, page in resultat['pages'].items()
+        if page['disque'].get('octets_figures')
+    }
+
+
+def comparer(ancien, nouveau):
+    """Affiche les temps et la taille des figures de deux exécutions du banc (ratio > 1 : plus qu'avant)"""
+    temps_ancien, temps_nouveau = _lignes(ancien), _lignes(nouveau)
+    print(f"{ancien['revision']} -> {nouveau['revision']}")
+    for cle in sorted(temps_nouveau.keys() & temps_ancien.keys(), key=str):
+        facteur, nom, mesure = cle
+        ratio = temps_nouveau[cle] / temps_ancien[cle] if temps_ancien[cle] else float('nan')
+        print(f"  x{facteur:<4g} {nom:<35} {mesure:<7} "
+              f"{temps_ancien[cle] * 1000:9.0f} ms -> {temps_nouveau[cle] * 1000:9.0f} ms  ({ratio:.2f})")
+    octets_ancien, octets_nouveau = _octets_figures(ancien), _octets_figures(nouveau)
+    for cle in sorted(octets_nouveau.keys() & octets_ancien.keys(), key=str):
+        facteur, nom = cle
+        print(f"  x{facteur:<4g} {nom:<35} figures {octets_ancien[cle]:>10,} o -> {octets_nouveau[cle]:>10,} o  "
+              f"({octets_nouveau[cle] / octets_ancien[cle]:.2f})")
+
+
+def afficher(resultats):
+    """Résumé lisible des mesures"""
+    for resultat in resultats['resultats']:
+        prechauffage = resultat['prechauffage']
+        print(f"Facteur x{resultat['facteur']:g} : {resultat['lignes']:,} lignes, préchauffage "
+              + (f"{prechauffage['temps_s']:.1f} s" if 'temps_s' in prechauffage else prechauffage['erreur']))
+        print(f"  {'Page':<35} {'froid':>9} {'disque':>9} {'rerun':>9} {'pic Mo':>8} {'figures':>10} {'tableaux':>10}")
+        for nom, page in resultat['pages'].items():
+            froid, disque = page['froid'], page['disque']
+            if 'erreur' in froid or 'erreur' in disque:
+                print(f"  {nom:<35} {froid.get('erreur') or disque.get('erreur')}")
+                continue
+            allocations = page.get('allocations', {})
+            print(f"  {nom:<35} {froid['temps_s'] * 1000:7.0f}ms {disque['temps_s'] * 1000:7.0f}ms "
+                  f"{disque['rerun_s'] * 1000:7.0f}ms {froid['pic_memoire_mo']:8.1f} "
+                  f"{disque['octets_figures']:>10,} {disque['octets_tableaux']:>10,}"
+                  + (f"  allocations {allocations['pic_allocations_mo']:.1f} Mo" if 'pic_allocations_mo' in allocations
+                     else f"  allocations : {allocations['erreur']}" if 'erreur' in allocations else ''))
+
+
+def depassements_allocations(resultats, plafond=PLAFOND_ALLOCATIONS):
+    """Pages dont le pic d'allocations dépasse plafond × taille du jeu : [(facteur, page, pic, source)]"""
+    depassements = []
+    for resultat in resultats['resultats']:
+        for nom, page in resultat['pages'].items():
+            mesure = page.get('allocations', {})
+            if 'pic_allocations_mo' in mesure and mesure['pic_allocations_mo'] > plafond * mesure['source_mo']:
+                depassements.append((resultat['facteur'], nom, mesure['pic_allocations_mo'], mesure['source_mo']))
+    return depassements
+
+
+def _option(nom, defaut=None):
+    return sys.argv[sys.argv.index(nom) + 1] if nom in sys.argv else defaut
+
+
+if __name__ == '__main__':
+    ancien = None
+    if _option('--comparer'):
+        with open(_option('--comparer')) as fichier:
+            ancien = json.load(fichier)
+
+    facteurs = [float(facteur) for facteur in _option('--facteurs', ','.join(map(str, FACTEURS))).split(',')]
+    plafond = _option('--plafond-allocations')
+    resultats = executer_banc(facteurs, _option('--dossier'), allocations=plafond is not None)
+    afficher(resultats)
+
+    sortie = _option('--sortie', 'banc_essai.json')
+    with open(sortie, 'w') as fichier:
+        json.dump(resultats, fichier, indent=2, ensure_ascii=False)
+    print(f"Résultats écrits dans {sortie}")
+
+    if ancien is not None:
+        comparer(ancien, resultats)
+
+    if plafond is not None:
+        depassements = depassements_allocations(resultats, float(plafond))
+        for facteur, nom, pic, source in depassements:
+            print(f"  x{facteur:<4g} {nom:<35} pic d'allocations {pic:8.1f} Mo > {plafond} × {source:.1f} Mo")
+        print(f"Allocations : {len(depassements)} page(s) au-delà de {plafond} × la taille du jeu")
+        sys.exit(1 if depassements else 0)
@@ -0,0 +1,139 @@
+# PAGE 2 : CARTE GÉOGRAPHIQUE
+
+import plotly.express as px
+import plotly.graph_objects as go
+import streamlit as st
+
+from donnees.carte import NIVEAUX_DETAIL, NIVEAU_PAR_DEFAUT
+from donnees.filtres import annees_retenues
+from donnees.partitions import annees_disponibles
+from donnees.requetes import cellules_carte, classement_villes, localisations
+from vues.figures import afficher_figure
+from vues.filtres import filtres_actifs, selection_vide
+
+
+def afficher():
+    """Page « Carte géographique »"""
+    st.header("Concentration géographique des agents")
+    filtres = filtres_actifs()
+    if selection_vide(filtres):
+        return
+    
+    # Filtrer les données par année
+    st.sidebar.markdown("---")
+    st.sidebar.subheader("Filtres")
+    annee_selectionnee = st.sidebar.selectbox(
+        "Sélectionner une année :",
+        options=annees_retenues(filtres, sorted(annees_disponibles(), reverse=True)),
+        index=0  # 2022 par défaut
+    )
+    
+    niveau = st.sidebar.selectbox(
+        "Niveau de détail :",
+        options=list(NIVEAUX_DETAIL),
+        index=list(NIVEAUX_DETAIL).index(NIVEAU_PAR_DEFAUT)
+    )
+    
+    # Cellules précalculées du niveau choisi et classement exact des localisations
+    cellules = cellules_carte(annee_selectionnee, niveau, filtres)
+    top_exact, total_agents = classement_villes(annee_selectionnee, 20, filtres)
+    if total_agents == 0:
+        st.warning(f"Aucun agent ne correspond aux filtres globaux en {annee_selectionnee}")
+        return
+    
+    # Message affiché
+    st.info(f"Carte pour l'année {annee_selectionnee}")
+    
+    st.success(
+        f"Carte interactive montrant {len(cellules)} zones "
+        f"({len(localisations(annee_selectionnee, filtres))} localisations regroupées)"
+    )
+    
+    # Carte Plotly : une bulle par cellule du niveau choisi
+    afficher_figure(__name__, 'carte', figure_carte, annee_selectionnee, niveau, filtres, use_container_width=True)
+    
+    # Interprétation descriptive
+    st.markdown("""
+    La carte montre une forte concentration d'agents dans Paris intra-muros, 
+    avec une présence importante dans les communes limitrophes de la petite couronne. 
+    La taille et l'intensité des bulles correspondent au nombre d'agents par zone ; 
+    les points noirs marquent les 20 localisations les plus peuplées.
+    """)
+    
+    # Top 20 villes avec totaux et pourcentages
+    st.subheader(f"Top 20 des localisations par nombre d'agents - {annee_selectionnee}")
+    top_villes = top_exact[['RANG', 'VILLE', 'AGENT', 'POURCENTAGE']]
+    top_villes.columns = ['RANG', 'LOCALISATION', 'AGENTS', 'POURCENTAGE']
+    
+    # Ajouter ligne de total
+    total_top20 = top_villes['AGENTS'].sum()
+    pct_top20 = (total_top20 / total_agents * 100).round(2)
+    
+    st.dataframe(
+        top_villes.style.format({'AGENTS': '{:,.0f}', 'POURCENTAGE': '{:.2f}%'}),
+        use_container_width=True
+    )
+    
+    # Métriques de synthèse
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Total agents (toutes localisations)", f"{total_agents:,.0f}")
+    with col2:
+        st.metric("Total Top 20", f"{total_top20:,.0f}")
+    with col3:
+        st.metric("% du total", f"{pct_top20:.2f}%")
+    
+    # Interpretación descriptiva
+    st.markdown("""
+    Le tableau montre que les 20 premières localisations concentrent 
+    une part importante des effectifs. Les arrondissements parisiens dominent, 
+    suivis par des communes de banlieue proche.
+    """)
+
+
+# =============================================================================
+# FIGURES (construites seulement en l'absence du cache, voir vues/figures.py)
+# =============================================================================
+def figure_carte(annee, niveau, filtres):
+    """Bulles des cellules du niveau de détail et surcouche des 20 localisations les plus peuplées"""
+    cellules = cellules_carte(annee, niveau, filtres)
+    top_exact, _ = classement_villes(annee, 20, filtres)
+    zoom = NIVEAUX_DETAIL[niveau][1]
+    
+    fig = px.scatter_mapbox(
+        cellules,
+        lat='LATITUDE',
+        lon='LONGITUDE',
+        size='AGENT',
+        color='AGENT',
+        hover_name='VILLE_PRINCIPALE',
+        hover_data={'AGENT': ':,', 'NB_LOCALISATIONS': True, 'LATITUDE': False, 'LONGITUDE': False},
+        labels={'NB_LOCALISATIONS': 'Localisations'},
+        color_continuous_scale='Bluered',
+        size_max=30,
+        zoom=zoom,
+        mapbox_style='open-street-map',
+        title=f'Concentration des agents par zone - {annee}'
+    )
+    
+    # Surcouche exacte : les 20 localisations les plus peuplées
+    fig.add_trace(go.Scattermapbox(
+        lat=top_exact['LATITUDE'],
+        lon=top_exact['LONGITUDE'],
+        mode='markers',
+        marker=dict(size=7, color='black'),
+        text=top_exact['VILLE'].astype(str),
+        customdata=top_exact['AGENT'],
+        hovertemplate='<b>%{text}</b><br>Agents: %{customdata:,}<extra>Top 20</extra>',
+        name='Top 20 localisations',
+        showlegend=False
+    ))
+    
+    fig.update_layout(
+        height=700,
+        mapbox=dict(
+            center=dict(lat=48.8566, lon=2.3522),
+            zoom=zoom
+        )
+    )
+    return fig
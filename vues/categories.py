@@ -0,0 +1,87 @@
+# PAGE 5 : ANALYSE PAR CATÉGORIE
+
+import plotly.graph_objects as go
+import streamlit as st
+
+from donnees.requetes import tableau_croise_categories
+from vues.figures import afficher_figure
+from vues.filtres import filtres_actifs, selection_vide
+
+
+def afficher():
+    """Page « Analyse par catégorie »"""
+    st.header("Distribution des catégories par direction thématique")
+    
+    filtres = filtres_actifs()
+    if selection_vide(filtres):
+        return
+    
+    # Tableau croisé en pourcentages (roll-up du cube sur les catégories A, B, C)
+    tableau_pct = tableau_croise_categories(filtres)
+    
+    # Graphique stacked bar (Plotly)
+    afficher_figure(__name__, 'repartition_categories', figure_repartition_categories, filtres,
+                    use_container_width=True)
+    
+    # Interprétation
+    st.markdown("""
+    Le graphique en barres empilées montre la composition de chaque direction thématique 
+    selon les trois catégories professionnelles (A, B, C). Les directions sont classées par ordre décroissant 
+    de proportion de catégorie A.
+    """)
+    
+    # Top directions élitistes
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.subheader("Plus de Catégorie A")
+        top_a = tableau_pct['A'].nlargest(5)
+        for direction, pct in top_a.items():
+            st.write(f"**{direction}** : {pct:.1f}%")
+    
+    with col2:
+        st.subheader("Plus de Catégorie C")
+        top_c = tableau_pct['C'].nlargest(5)
+        for direction, pct in top_c.items():
+            st.write(f"**{direction}** : {pct:.1f}%")
+    
+    # Interpretación descriptiva
+    st.markdown("""
+    Les classements montrent les cinq directions avec les plus fortes concentrations 
+    de catégorie A (cadres) et de catégorie C (agents d'exécution). Ces différences reflètent les missions 
+    et besoins spécifiques de chaque service.
+    """)
+
+
+# =============================================================================
+# FIGURES (construites seulement en l'absence du cache, voir vues/figures.py)
+# =============================================================================
+def figure_repartition_categories(filtres):
+    """Barres empilées des parts de catégories par direction thématique"""
+    tableau_pct = tableau_croise_categories(filtres)
+    
+    fig = go.Figure()
+    
+    couleurs = {'C': '#1f77b4', 'B': '#ff7f0e', 'A': '#d62728'}
+    
+    for categorie in ['C', 'B', 'A']:
+        fig.add_trace(go.Bar(
+            name=f'Catégorie {categorie}',
+            y=tableau_pct.index,
+            x=tableau_pct[categorie],
+            orientation='h',
+            marker_color=couleurs[categorie],
+            text=tableau_pct[categorie].round(0).astype(int).astype(str) + '%',
+            textposition='inside'
+        ))
+    
+    fig.update_layout(
+        barmode='stack',
+        title='Distribution des Catégories par Direction Thématique',
+        xaxis_title='Pourcentage (%)',
+        yaxis_title='',
+        height=600,
+        showlegend=True,
+        legend=dict(orientation='h', y=1.1)
+    )
+    return fig
@@ -0,0 +1,48 @@
+# CHARGEMENT DES DONNÉES BRUTES (CACHES STREAMLIT)
+#
+# Fonctions partagées par les pages. Le jeu de données est servi en vues sans
+# copie sur le fichier Arrow mappé du cache disque (donnees_partagees) : toutes
+# les sessions et tous les processus du serveur lisent les mêmes pages mémoire.
+# st.cache_resource garde la vue telle quelle (st.cache_data la sérialiserait
+# et la copierait à chaque appel) ; elle est en lecture seule. Les appels et
+# les exécutions hors cache sont comptés (donnees/instrumentation.py).
+
+import streamlit as st
+
+from donnees.derives import donnees_partagees
+from donnees.flux import MODE_FLUX
+from donnees.instrumentation import compter_appel, compter_echec, etape
+from donnees.partitions import lire_annee
+
+
+def charger_donnees():
+    """Toutes les années nettoyées (colonnes utiles, texte en catégories), en lecture seule"""
+    compter_appel('charger_donnees')
+    with etape('chargement', 'charger_donnees'):
+        return _charger_donnees()
+
+
+def charger_annee(annee):
+    """Lignes d'une seule année, en lecture seule (en mode flux : seule la partition DATE=annee est lue)"""
+    compter_appel('charger_annee')
+    with etape('chargement', f'charger_annee({annee})'):
+        return _charger_annee(annee)
+
+
+# Corps exécutés seulement hors cache : chaque exécution est un échec du cache
+@st.cache_resource
+def _charger_donnees():
+    compter_echec('charger_donnees')
+    return donnees_partagees()
+
+
+@st.cache_resource
+def _charger_annee(annee):
+    compter_echec('charger_annee')
+    if MODE_FLUX:
+        return lire_annee(annee)
+    return donnees_partagees(annee)
+
+
+# Les tables dérivées et analyses sont servies par donnees.requetes (mémoïsées
+# par paramètres, lues depuis le cache disque : python -m donnees.prechauffage).
@@ -0,0 +1,28 @@
+# ÉLÉMENTS COMMUNS AUX PAGES (GRAPHIQUES, OPTIONS DE LA SIDEBAR)
+
+import plotly.graph_objects as go
+import streamlit as st
+
+
+def boite_precalculee(stats, x, **kwargs):
+    """Boîte à moustaches Plotly à partir de statistiques précalculées (q1, médiane, q3, moustaches)"""
+    return go.Box(
+        x=list(x),
+        q1=stats['q1'],
+        median=stats['median'],
+        q3=stats['q3'],
+        lowerfence=stats['lowerfence'],
+        upperfence=stats['upperfence'],
+        **kwargs
+    )
+
+
+def choisir_ponderation():
+    """Case de la sidebar : statistiques de distance par agent (AGENT) ou par ligne"""
+    st.sidebar.markdown("---")
+    st.sidebar.subheader("Options")
+    return st.sidebar.checkbox(
+        "Pondérer par le nombre d'agents",
+        value=False,
+        help="Chaque ligne agrégée compte pour son effectif AGENT au lieu d'une seule observation"
+    )
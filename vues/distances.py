@@ -0,0 +1,183 @@
+# PAGE 3 : ANALYSE GÉOGRAPHIQUE DÉTAILLÉE
+
+import plotly.graph_objects as go
+import streamlit as st
+
+from donnees.requetes import distances_par_groupe
+from vues.communs import boite_precalculee, choisir_ponderation
+from vues.figures import afficher_figure
+from vues.filtres import filtres_actifs, selection_vide
+
+COULEURS_CATEGORIE = {'A': '#d62728', 'B': '#ff7f0e', 'C': '#1f77b4'}
+COULEURS_SEXE = {'FEMININ': '#e377c2', 'MASCULIN': '#17becf'}
+
+
+def afficher():
+    """Page « Analyse géographique détaillée »"""
+    st.header("Analyse de la Distance à Paris : Catégorie et Genre")
+    st.markdown("Exploration de la relation entre localisation résidentielle, hiérarchie professionnelle et genre")
+    
+    filtres = filtres_actifs()
+    if selection_vide(filtres):
+        return
+    
+    ponderer = choisir_ponderation()
+    unite = "agents" if ponderer else "observations"
+    
+    # Statistiques issues des sketches précalculés, restreintes aux percentiles 2.5 - 97.5 (95% des données)
+    total_retenu = distances_par_groupe((), ponderer, filtres)['n'].sum()
+    
+    st.info(f"Analyse basée sur 95% des données (outliers extrêmes exclus) : {total_retenu:,.0f} {unite}")
+    
+    # GRAPHIQUE 1: Boxplot par catégorie
+    st.subheader("Distribution des distances à Paris selon la catégorie professionnelle")
+    afficher_figure(__name__, 'boites_categorie', figure_boites_categorie, ponderer, filtres,
+                    use_container_width=True)
+    
+    # Interprétation
+    st.markdown("""
+    Les boxplots montrent les distributions de distances pour chaque catégorie professionnelle. 
+    La médiane (ligne centrale) indique la distance typique, tandis que la boîte représente 50% des agents.
+    """)
+    
+    # GRAPHIQUE 2: Boxplot par sexe
+    st.subheader("Distribution des distances à Paris selon le genre")
+    afficher_figure(__name__, 'boites_sexe', figure_boites_sexe, ponderer, filtres, use_container_width=True)
+    
+    # Interprétation
+    st.markdown("""
+    La comparaison par genre montre les différences de distribution des distances résidentielles. 
+    Les médianes et quartiles permettent d'identifier les tendances centrales et la dispersion pour chaque groupe.
+    """)
+    
+    # GRAPHIQUE 3: Boxplot Catégorie × Genre
+    st.subheader("Distribution des distances : Analyse croisée Catégorie × Genre")
+    afficher_figure(__name__, 'boites_croisees', figure_boites_croisees, ponderer, filtres,
+                    use_container_width=True)
+    
+    # Interprétation
+    st.markdown("""
+    L'analyse croisée compare simultanément les effets de la catégorie professionnelle 
+    et du genre sur la localisation résidentielle. Pour chaque catégorie (A, B, C), les distributions sont présentées 
+    séparément pour les hommes et les femmes.
+    """)
+    
+    # GRAPHIQUE 4: Heatmap - Tableau croisé
+    st.subheader("Synthèse : Distance médiane par Catégorie et Genre")
+    afficher_figure(__name__, 'heatmap_mediane', figure_heatmap_mediane, ponderer, filtres,
+                    use_container_width=True)
+    
+    # Interprétation
+    st.markdown("""
+    La heatmap synthétise les distances médianes pour chaque combinaison de catégorie et genre. 
+    Les couleurs facilitent l'identification des groupes résidant plus près ou plus loin de Paris.
+    """)
+
+
+# =============================================================================
+# FIGURES (construites seulement en l'absence du cache, voir vues/figures.py)
+# =============================================================================
+def figure_boites_categorie(ponderer, filtres):
+    """Boîtes à moustaches des distances par catégorie"""
+    stats_cat = distances_par_groupe(('CATEGORIE',), ponderer, filtres)
+    
+    fig1 = go.Figure()
+    for i, categorie in enumerate(stats_cat['CATEGORIE']):
+        fig1.add_trace(boite_precalculee(
+            stats_cat.iloc[[i]], [categorie], name=categorie, marker_color=COULEURS_CATEGORIE[categorie]
+        ))
+    
+    fig1.update_traces(
+        hovertemplate='<b>Catégorie %{x}</b><br>' +
+                      'Médiane: %{median:.1f} km<br>' +
+                      'Q1 (25%%): %{q1:.1f} km<br>' +
+                      'Q3 (75%%): %{q3:.1f} km<br>' +
+                      'Min: %{lowerfence:.1f} km<br>' +
+                      'Max: %{upperfence:.1f} km<br>' +
+                      '<extra></extra>'
+    )
+    
+    fig1.update_layout(
+        title='Distribution des Distances à Paris par Catégorie Professionnelle',
+        xaxis_title='Catégorie Professionnelle',
+        yaxis_title='Distance à Paris (km)',
+        height=500,
+        showlegend=False
+    )
+    return fig1
+
+
+def figure_boites_sexe(ponderer, filtres):
+    """Boîtes à moustaches des distances par sexe"""
+    stats_sexe = distances_par_groupe(('SEXE',), ponderer, filtres)
+    
+    fig2 = go.Figure()
+    for i, sexe in enumerate(stats_sexe['SEXE']):
+        fig2.add_trace(boite_precalculee(
+            stats_sexe.iloc[[i]], [sexe], name=sexe, marker_color=COULEURS_SEXE[sexe]
+        ))
+    
+    fig2.update_traces(
+        hovertemplate='<b>%{x}</b><br>' +
+                      'Médiane: %{median:.1f} km<br>' +
+                      'Q1 (25%%): %{q1:.1f} km<br>' +
+                      'Q3 (75%%): %{q3:.1f} km<br>' +
+                      'Min: %{lowerfence:.1f} km<br>' +
+                      'Max: %{upperfence:.1f} km<br>' +
+                      '<extra></extra>'
+    )
+    
+    fig2.update_layout(
+        title='Distribution des Distances à Paris par Genre',
+        xaxis_title='Genre',
+        yaxis_title='Distance à Paris (km)',
+        height=500,
+        showlegend=False
+    )
+    return fig2
+
+
+def figure_boites_croisees(ponderer, filtres):
+    """Boîtes à moustaches des distances par catégorie, groupées par sexe"""
+    stats_croisees = distances_par_groupe(('CATEGORIE', 'SEXE'), ponderer, filtres)
+    
+    fig3 = go.Figure()
+    for sexe, stats in stats_croisees.groupby('SEXE', observed=True):
+        fig3.add_trace(boite_precalculee(
+            stats, stats['CATEGORIE'], name=sexe, marker_color=COULEURS_SEXE[sexe]
+        ))
+    
+    fig3.update_layout(
+        title='Distribution des Distances à Paris par Catégorie et Genre',
+        xaxis_title='Catégorie Professionnelle',
+        yaxis_title='Distance à Paris (km)',
+        legend_title='SEXE',
+        boxmode='group',
+        height=600
+    )
+    return fig3
+
+
+def figure_heatmap_mediane(ponderer, filtres):
+    """Distance médiane par catégorie et sexe"""
+    stats_croisees = distances_par_groupe(('CATEGORIE', 'SEXE'), ponderer, filtres)
+    pivot_table = stats_croisees.pivot(index='CATEGORIE', columns='SEXE', values='median')
+    
+    fig4 = go.Figure(data=go.Heatmap(
+        z=pivot_table.values,
+        x=pivot_table.columns,
+        y=pivot_table.index,
+        colorscale='RdYlBu_r',
+        text=pivot_table.values.round(2),
+        texttemplate='%{text} km',
+        textfont={"size": 14},
+        colorbar=dict(title="Distance<br>médiane (km)")
+    ))
+    
+    fig4.update_layout(
+        title='Distance Médiane à Paris : Heatmap Catégorie × Genre',
+        xaxis_title='Genre',
+        yaxis_title='Catégorie Professionnelle',
+        height=400
+    )
+    return fig4
@@ -0,0 +1,241 @@
+# PAGE 6 : ÉVOLUTION TEMPORELLE
+#
+# Les effectifs, variations annuelles et parts sont lus dans les séries
+# précalculées (donnees/series.py) : changer de dimension ou d'années de
+# comparaison ne réagrège rien.
+
+import plotly.express as px
+import plotly.graph_objects as go
+import streamlit as st
+
+from donnees.requetes import evolution, parts_annuelles, serie_temporelle, variations
+from donnees.series import DIMENSIONS_SERIES
+from vues.figures import afficher_figure
+from vues.filtres import LIBELLES, filtres_actifs, selection_vide
+
+
+def afficher():
+    """Page « Évolution temporelle »"""
+    st.header("Évolution des effectifs dans le temps (2014-2022)")
+    filtres = filtres_actifs()
+    if selection_vide(filtres):
+        return
+    
+    tab1, tab2, tab3 = st.tabs(["Par Direction Thématique", "Par Catégorie", "Variations entre deux années"])
+    
+    with tab1:
+        st.subheader("Évolution par direction thématique")
+        
+        # Graphique Plotly
+        afficher_figure(__name__, 'evolution_thematiques', figure_evolution_thematiques, filtres,
+                        use_container_width=True)
+        
+        # Interpretation
+        st.markdown("""
+        L'évolution temporelle montre les tendances d'effectifs pour chaque direction thématique 
+        entre 2014 et 2022. Certaines directions présentent une croissance continue, d'autres une stabilité, 
+        et quelques-unes un déclin.
+        """)
+    
+    with tab2:
+        st.subheader("Évolution par catégorie professionnelle")
+        
+        # Graphique 1: Valeurs absolues
+        afficher_figure(__name__, 'evolution_categories', figure_evolution_categories, filtres,
+                        use_container_width=True)
+        
+        # Graphique 2: Pourcentages (stacked area)
+        st.subheader("Composition en pourcentage")
+        
+        afficher_figure(__name__, 'parts_categories', figure_parts_categories, filtres, use_container_width=True)
+        
+        # Interprétation
+        st.markdown("""
+        Les deux graphiques présentent l'évolution des catégories professionnelles. 
+        Le premier montre les effectifs absolus, le second révèle les changements de composition 
+        en pourcentages.
+        """)
+        
+        # Analyse des tendances
+        st.subheader("Analyse des tendances")
+        col1, col2, col3 = st.columns(3)
+        
+        annees = sorted(serie_temporelle('CATEGORIE', filtres)['DATE'].unique())
+        if not annees:
+            # Filtres ne retenant que des catégories absentes des séries (NON RENSEIGNÉ)
+            st.info("Aucune catégorie A, B ou C retenue par les filtres : tendances indisponibles")
+        else:
+            variations_cat = variations('CATEGORIE', annees[0], annees[-1], filtres)
+            for i, cat in enumerate(['A', 'B', 'C']):
+                if cat not in variations_cat.index:
+                    continue
+                
+                with [col1, col2, col3][i]:
+                    st.metric(
+                        f"Catégorie {cat}",
+                        f"{variations_cat.loc[cat, 'AGENT_FIN']:,.0f}",
+                        f"{variations_cat.loc[cat, 'VARIATION_PCT']:+.1f}%",
+                        delta_color="normal"
+                    )
+    
+    with tab3:
+        afficher_variations(filtres)
+
+
+def afficher_variations(filtres):
+    """Onglet « Variations entre deux années » : dimension et années au choix"""
+    st.subheader("Variations entre deux années")
+    
+    col1, col2 = st.columns([1, 2])
+    with col1:
+        dimension = st.selectbox(
+            "Dimension :", DIMENSIONS_SERIES, format_func=LIBELLES.get, key='evolution_dimension'
+        )
+    annees = [int(annee) for annee in sorted(serie_temporelle(dimension, filtres)['DATE'].unique())]
+    if len(annees) < 2:
+        st.warning("Au moins deux années sont nécessaires pour comparer des effectifs.")
+        return
+    with col2:
+        debut, fin = st.select_slider(
+            "Année de base et année finale :", options=annees, value=(annees[0], annees[-1]),
+            key='evolution_annees'
+        )
+    if debut == fin:
+        st.warning("Choisir deux années distinctes.")
+        return
+    
+    tableau = variations(dimension, debut, fin, filtres)
+    total_debut, total_fin = tableau['AGENT_DEBUT'].sum(), tableau['AGENT_FIN'].sum()
+    
+    col1, col2, col3 = st.columns(3)
+    col1.metric(f"Effectif {debut}", f"{total_debut:,.0f}")
+    col2.metric(f"Effectif {fin}", f"{total_fin:,.0f}", f"{(total_fin - total_debut) / total_debut * 100:+.1f}%")
+    col3.metric("Croissance annuelle moyenne", f"{((total_fin / total_debut) ** (1 / (fin - debut)) - 1) * 100:+.2f}%")
+    
+    afficher_figure(__name__, 'tcam', figure_tcam, dimension, debut, fin, filtres, use_container_width=True)
+    afficher_figure(__name__, 'variations_annuelles', figure_variations_annuelles, dimension, debut, fin, filtres,
+                    use_container_width=True)
+    
+    st.dataframe(
+        tableau.rename(columns={
+            'AGENT_DEBUT': f'Effectif {debut}', 'AGENT_FIN': f'Effectif {fin}', 'VARIATION': 'Variation',
+            'VARIATION_PCT': 'Variation (%)', 'TCAM_PCT': 'TCAM (%)', 'PART_DEBUT': f'Part {debut} (%)',
+            'PART_FIN': f'Part {fin} (%)', 'ECART_PARTS': 'Écart de part (pts)'
+        }).rename_axis(LIBELLES[dimension]).round(2),
+        use_container_width=True
+    )
+    st.caption("TCAM : taux de croissance annuel moyen, ((effectif final / effectif de base)^(1/années) - 1).")
+
+
+# =============================================================================
+# FIGURES (construites seulement en l'absence du cache, voir vues/figures.py)
+# =============================================================================
+def figure_evolution_thematiques(filtres):
+    """Effectifs par direction thématique et par année"""
+    evolution_direction = evolution('DIRECTION_THEMATIQUE', filtres)
+    
+    fig = px.line(
+        evolution_direction,
+        x='DATE',
+        y='AGENT',
+        color='DIRECTION_THEMATIQUE',
+        title='Évolution des Effectifs par Direction Thématique',
+        markers=True
+    )
+    
+    fig.update_layout(height=600, xaxis_title='Année', yaxis_title='Nombre d\'agents')
+    return fig
+
+
+def figure_evolution_categories(filtres):
+    """Effectifs par catégorie et par année"""
+    evolution_cat = evolution('CATEGORIE', filtres)
+    
+    fig1 = px.line(
+        evolution_cat,
+        x='DATE',
+        y='AGENT',
+        color='CATEGORIE',
+        title='Évolution des Effectifs par Catégorie (valeurs absolues)',
+        markers=True,
+        color_discrete_map={'A': '#d62728', 'B': '#ff7f0e', 'C': '#1f77b4'}
+    )
+    
+    fig1.update_layout(height=500, xaxis_title='Année', yaxis_title='Nombre d\'agents')
+    return fig1
+
+
+def figure_parts_categories(filtres):
+    """Parts des catégories par année, en aires empilées"""
+    pivot_cat_pct = parts_annuelles('CATEGORIE', filtres)
+    
+    fig2 = go.Figure()
+    
+    for categorie in ['C', 'B', 'A']:
+        if categorie not in pivot_cat_pct.columns:
+            continue
+        couleurs_cat = {'A': '#d62728', 'B': '#ff7f0e', 'C': '#1f77b4'}
+        fig2.add_trace(go.Scatter(
+            x=pivot_cat_pct.index,
+            y=pivot_cat_pct[categorie],
+            name=f'Catégorie {categorie}',
+            mode='lines',
+            stackgroup='one',
+            fillcolor=couleurs_cat[categorie]
+        ))
+    
+    fig2.update_layout(
+        title='Composition par Catégorie (%) - Aire empilée',
+        xaxis_title='Année',
+        yaxis_title='Pourcentage (%)',
+        height=500,
+        yaxis=dict(range=[0, 100])
+    )
+    return fig2
+
+
+def figure_tcam(dimension, debut, fin, filtres):
+    """Taux de croissance annuel moyen de chaque modalité entre debut et fin"""
+    tableau = variations(dimension, debut, fin, filtres).dropna(subset=['TCAM_PCT']).sort_values('TCAM_PCT')
+    
+    fig = go.Figure(go.Bar(
+        x=tableau['TCAM_PCT'],
+        y=tableau.index.astype(str),
+        orientation='h',
+        marker_color=['#d62728' if tcam < 0 else '#2ca02c' for tcam in tableau['TCAM_PCT']],
+        customdata=tableau[['AGENT_DEBUT', 'AGENT_FIN']].to_numpy(),
+        hovertemplate='<b>%{y}</b><br>TCAM: %{x:+.2f}%<br>' +
+                      f'{debut}: ' + '%{customdata[0]:,}<br>' +
+                      f'{fin}: ' + '%{customdata[1]:,}<extra></extra>'
+    ))
+    
+    fig.update_layout(
+        title=f'Taux de croissance annuel moyen {debut}-{fin} par {LIBELLES[dimension].lower()}',
+        xaxis_title='TCAM (%)',
+        height=max(400, 30 * len(tableau) + 150)
+    )
+    return fig
+
+
+def figure_variations_annuelles(dimension, debut, fin, filtres):
+    """Variation annuelle (%) de chaque modalité, de debut à fin"""
+    serie = serie_temporelle(dimension, filtres)
+    serie = serie[((serie['DATE'] > debut) & (serie['DATE'] <= fin)).to_numpy()]
+    pivot = serie.pivot(index='MODALITE', columns='DATE', values='VARIATION_PCT').astype(float)
+    
+    fig = go.Figure(data=go.Heatmap(
+        z=pivot.values,
+        x=[str(annee) for annee in pivot.columns],
+        y=pivot.index.astype(str),
+        colorscale='RdYlGn',
+        zmid=0,
+        hovertemplate='<b>%{y}</b><br>%{x}: %{z:+.1f}%<extra></extra>',
+        colorbar=dict(title="Variation<br>annuelle (%)")
+    ))
+    
+    fig.update_layout(
+        title=f'Variation annuelle des effectifs (%) par {LIBELLES[dimension].lower()}',
+        xaxis_title='Année',
+        height=max(400, 25 * len(pivot) + 150)
+    )
+    return fig
@@ -0,0 +1,306 @@
+# EXPORT STATIQUE DES PAGES (HTML / PARQUET)
+#
+# Produit, sans Streamlit, les figures (HTML autonome) et les tableaux
+# (Parquet) des pages pour chaque combinaison de filtres : chaque direction
+# thématique (et l'ensemble), et pour les analyses d'une année (EXPORTS
+# annuels), chaque année. Les figures viennent des mêmes fonctions figure_*
+# que les pages, les tableaux des mêmes requêtes (donnees/requetes.py) ; les
+# figures sont allégées comme pour le navigateur (vues/figures.py) et
+# partagent un seul plotly.min.js à la racine de l'export.
+#
+# Le cache disque est préchauffé d'abord : les processus du pool ne font que
+# mapper en mémoire les mêmes fichiers de tables (pages mémoire partagées),
+# un travail par combinaison de filtres. Chaque fichier produit est inscrit
+# au manifeste de l'export avec l'empreinte de ses entrées (données, code de
+# tous les modules de donnees/ et vues/, version du cache des tables,
+# paramètres) : si elles n'ont pas changé depuis le dernier export, le
+# fichier n'est pas refait.
+#
+# Usage : python -m vues.export [--sortie DOSSIER] [--processus N]
+#                               [--annees 2021,2022] [--forcer]
+
+import concurrent.futures
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+import unicodedata
+
+import pandas as pd
+import plotly.graph_objects as go
+from plotly.offline import get_plotlyjs
+
+RACINE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if __name__ == '__main__':
+    # python -m depuis la racine : le script streamlit.py du projet masquerait le module streamlit
+    # importé par les pages. La racine passe en fin de chemin, avant tout import du projet ; seule
+    # l'exécution en script est concernée (les processus du pool héritent de ce chemin).
+    sys.path[:] = [chemin for chemin in sys.path if os.path.abspath(chemin or os.curdir) != RACINE] + [RACINE]
+
+from donnees.cache_disque import VERSION_CACHE, empreinte_sources
+from donnees.carte import NIVEAU_PAR_DEFAUT
+from donnees.derives import SOURCES
+from donnees.filtres import construire_filtres
+from donnees.partitions import annees_disponibles
+from donnees.prechauffage import prechauffer
+from donnees import requetes
+from donnees.series import DIMENSIONS_SERIES
+from vues import carte, categories, distances, evolution, post_covid, presentation, treemap
+from vues.figures import alleger_figure
+
+DOSSIER_EXPORT = 'export'
+MANIFESTE = 'manifeste.json'
+PLOTLY_JS = 'plotly.min.js'
+
+# Options des pages fixées à leur valeur par défaut
+PONDERER = False
+
+
+def _periode_series(dimension, filtres):
+    """Première et dernière année des séries d'une dimension, ou None si les filtres n'en retiennent aucune"""
+    annees = sorted(requetes.serie_temporelle(dimension, filtres)['DATE'].unique())
+    return (int(annees[0]), int(annees[-1])) if annees else None
+
+
+def _variations_periode(dimension, filtres):
+    """Variations d'une dimension entre la première et la dernière année de ses séries (None sans série)"""
+    periode = _periode_series(dimension, filtres)
+    return requetes.variations(dimension, *periode, filtres) if periode else None
+
+
+def _figure_variations(figure, dimension):
+    """figure (figure_tcam / figure_variations_annuelles) entre la première et la dernière année"""
+    def construire(filtres):
+        periode = _periode_series(dimension, filtres)
+        return figure(dimension, *periode, filtres) if periode else None
+    return construire
+
+
+# Analyses d'une année : (page, nom, construire(annee, filtres)) -> figure Plotly ou tableau
+EXPORTS_ANNUELS = [
+    (presentation, 'repartition_categories', presentation.figure_repartition_categories),
+    (presentation, 'indicateurs', lambda annee, filtres: requetes.resume_annee(annee, filtres)[0]),
+    (carte, 'carte', lambda annee, filtres: carte.figure_carte(annee, NIVEAU_PAR_DEFAUT, filtres)),
+    (carte, 'classement_villes', lambda annee, filtres: requetes.classement_villes(annee, 20, filtres)[0]),
+    (distances, 'boites_categorie', lambda annee, filtres: distances.figure_boites_categorie(PONDERER, filtres)),
+    (distances, 'boites_sexe', lambda annee, filtres: distances.figure_boites_sexe(PONDERER, filtres)),
+    (distances, 'boites_croisees', lambda annee, filtres: distances.figure_boites_croisees(PONDERER, filtres)),
+    (distances, 'heatmap_mediane', lambda annee, filtres: distances.figure_heatmap_mediane(PONDERER, filtres)),
+    (distances, 'distances_categorie_sexe', lambda annee, filtres: requetes.distances_par_groupe(
+        ('CATEGORIE', 'SEXE'), PONDERER, filtres
+    )),
+    (treemap, 'treemap', lambda annee, filtres: treemap.figure_treemap(filtres)),
+    (treemap, 'directions', lambda annee, filtres: requetes.hierarchie_treemap(filtres)[1]),
+    (categories, 'repartition_categories', lambda annee, filtres: categories.figure_repartition_categories(filtres)),
+    (categories, 'parts_categories', lambda annee, filtres: requetes.tableau_croise_categories(filtres))
+]
+
+# Analyses de toute la période : (page, nom, construire(filtres))
+EXPORTS_PERIODE = [
+    (evolution, 'evolution_thematiques', evolution.figure_evolution_thematiques),
+    (evolution, 'evolution_categories', evolution.figure_evolution_categories),
+    (evolution, 'parts_categories', evolution.figure_parts_categories),
+    (evolution, 'series_temporelles', requetes.series_temporelles),
+    *[
+        (evolution, f'tcam_{dimension.lower()}', _figure_variations(evolution.figure_tcam, dimension))
+        for dimension in DIMENSIONS_SERIES
+    ],
+    *[
+        (evolution, f'variations_{dimension.lower()}', lambda filtres, dimension=dimension: _variations_periode(
+            dimension, filtres
+        ))
+        for dimension in DIMENSIONS_SERIES
+    ],
+    (post_covid, 'distance_annuelle', lambda filtres: post_covid.figure_distance_annuelle(PONDERER, filtres)),
+    (post_covid, 'boites_periodes', lambda filtres: post_covid.figure_boites_periodes(PONDERER, filtres)),
+    (post_covid, 'parts_zones', post_covid.figure_parts_zones),
+    (post_covid, 'agents_loin', post_covid.figure_agents_loin),
+    (post_covid, 'periodes', lambda filtres: requetes.comparaison_covid(PONDERER, filtres)[1])
+]
+
+
+def _dossier_nom(texte):
+    """Nom de dossier sans accents ni caractères spéciaux"""
+    texte = unicodedata.normalize('NFKD', texte).encode('ascii', 'ignore').decode()
+    return re.sub(r'[^a-z0-9]+', '_', texte.lower()).strip('_')
+
+
+def _page(module):
+    return module.__name__.rsplit('.', 1)[-1]
+
+
+def empreinte_code():
+    """Empreinte de tous les modules de donnees/ et vues/ et de la version du cache des tables dérivées.
+
+    Une page dépend de ses requêtes, des tables dérivées, des figures communes... :
+    toute modification du code refait donc tout l'export.
+    """
+    sha = hashlib.sha256(f'v{VERSION_CACHE}'.encode())
+    for paquet in ['donnees', 'vues']:
+        for racine, dossiers, noms in os.walk(os.path.join(RACINE, paquet)):
+            dossiers[:] = sorted(dossier for dossier in dossiers if dossier != '__pycache__')
+            for nom in sorted(nom for nom in noms if nom.endswith('.py')):
+                chemin = os.path.join(racine, nom)
+                sha.update(os.path.relpath(chemin, RACINE).encode())
+                with open(chemin, 'rb') as fichier:
+                    sha.update(hashlib.sha256(fichier.read()).digest())
+    return sha.hexdigest()
+
+
+def combinaisons(annees=None):
+    """Travaux de l'export : [(thématique ou None, année ou None)], l'année None désignant toute la période"""
+    modalites, _ = requetes.modalites_filtres()
+    annees = annees or annees_disponibles()
+    return [
+        (thematique, annee)
+        for thematique in [None, *modalites['DIRECTION_THEMATIQUE']]
+        for annee in [None, *annees]
+    ]
+
+
+def sorties_combinaison(thematique, annee):
+    """Fichiers d'une combinaison : [(chemin relatif sans extension, page, nom)]"""
+    dossier = os.path.join(
+        _dossier_nom(thematique) if thematique else 'ensemble', str(annee) if annee else 'periode'
+    )
+    exports = EXPORTS_ANNUELS if annee else EXPORTS_PERIODE
+    return [(os.path.join(dossier, f'{_page(module)}_{nom}'), _page(module), nom) for module, nom, _ in exports]
+
+
+def _filtres(thematique, annee):
+    return construire_filtres(
+        annees=[annee] if annee else None, DIRECTION_THEMATIQUE=[thematique] if thematique else []
+    )
+
+
+def _ecrire(resultat, chemin, racine):
+    """Écrit une figure en HTML (plotly.min.js partagé) ou un tableau en Parquet ; retourne le chemin écrit"""
+    figure = isinstance(resultat, go.Figure)
+    chemin += '.html' if figure else '.parquet'
+    complet = os.path.join(racine, chemin)
+    os.makedirs(os.path.dirname(complet), exist_ok=True)
+    # Écriture atomique : un export interrompu ne laisse pas de fichier tronqué
+    temporaire = complet + '.tmp'
+    if figure:
+        spec = alleger_figure(json.loads(resultat.to_json()))
+        script = os.path.relpath(os.path.join(racine, PLOTLY_JS), os.path.dirname(complet))
+        with open(temporaire, 'w', encoding='utf-8') as fichier:
+            fichier.write(go.Figure(spec, _validate=False).to_html(include_plotlyjs=script, full_html=True))
+    else:
+        tableau = resultat.to_frame() if isinstance(resultat, pd.Series) else resultat
+        tableau.to_parquet(temporaire)
+    os.replace(temporaire, complet)
+    return chemin
+
+
+def exporter_combinaison(thematique, annee, noms, racine=DOSSIER_EXPORT):
+    """Travail d'un processus : écrit les sorties noms de la combinaison.
+
+    Retourne {nom: chemin écrit} et la durée en secondes ; une combinaison sans
+    agent, ou une analyse sans objet pour ses filtres, n'écrit rien.
+    """
+    debut = time.perf_counter()
+    filtres = _filtres(thematique, annee)
+    if requetes.cellules_filtrees(filtres) == 0:
+        return {}, time.perf_counter() - debut
+
+    exports = EXPORTS_ANNUELS if annee else EXPORTS_PERIODE
+    ecrits = {}
+    for (chemin, _, nom), (_, _, construire) in zip(sorties_combinaison(thematique, annee), exports):
+        if nom in noms:
+            resultat = construire(annee, filtres) if annee else construire(filtres)
+            # None : analyse sans objet pour ces filtres (série vide...), rien n'est écrit
+            if resultat is not None:
+                ecrits[nom] = _ecrire(resultat, chemin, racine)
+    return ecrits, time.perf_counter() - debut
+
+
+def _lire_manifeste(racine):
+    try:
+        with open(os.path.join(racine, MANIFESTE), encoding='utf-8') as fichier:
+            return json.load(fichier)
+    except FileNotFoundError:
+        return {}
+
+
+def _cle(empreinte, code, chemin):
+    return hashlib.sha256(f'{empreinte}|{code}|{chemin}'.encode()).hexdigest()[:16]
+
+
+def exporter(racine=DOSSIER_EXPORT, processus=None, annees=None, forcer=False):
+    """Exporte toutes les combinaisons ; seules les sorties dont les entrées ont changé sont refaites.
+
+    Retourne {'ecrits', 'inchanges', 'vides', 'durees': {combinaison: secondes}}.
+    """
+    prechauffer(purger_anciens=False)
+    os.makedirs(racine, exist_ok=True)
+    if not os.path.exists(os.path.join(racine, PLOTLY_JS)):
+        with open(os.path.join(racine, PLOTLY_JS), 'w', encoding='utf-8') as fichier:
+            fichier.write(get_plotlyjs())
+
+    empreinte = empreinte_sources(SOURCES)
+    code = empreinte_code()
+    ancien = _lire_manifeste(racine)
+    # Manifeste : chemin relatif sans extension -> {'cle', 'fichier'}
+    manifeste = {}
+    travaux = {}
+    bilan = {'ecrits': 0, 'inchanges': 0, 'vides': 0, 'durees': {}}
+    for thematique, annee in combinaisons(annees):
+        noms = []
+        for chemin, _, nom in sorties_combinaison(thematique, annee):
+            cle = _cle(empreinte, code, chemin)
+            entree = ancien.get(chemin)
+            if not forcer and entree and entree['cle'] == cle and (
+                    entree['fichier'] is None or os.path.exists(os.path.join(racine, entree['fichier']))):
+                manifeste[chemin] = entree
+                bilan['inchanges'] += 1
+            else:
+                manifeste[chemin] = {'cle': cle, 'fichier': None}
+                noms.append(nom)
+        if noms:
+            travaux[thematique, annee] = noms
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=processus) as pool:
+        futurs = {
+            pool.submit(exporter_combinaison, thematique, annee, noms, racine): (thematique, annee)
+            for (thematique, annee), noms in travaux.items()
+        }
+        for futur in concurrent.futures.as_completed(futurs):
+            thematique, annee = futurs[futur]
+            ecrits, duree = futur.result()
+            bilan['durees'][f"{thematique or 'ensemble'} / {annee or 'période'}"] = duree
+            for chemin, _, nom in sorties_combinaison(thematique, annee):
+                if nom in travaux[thematique, annee]:
+                    # Combinaison sans agent : aucun fichier, mais l'absence est gardée au manifeste
+                    manifeste[chemin]['fichier'] = ecrits.get(nom)
+            bilan['ecrits'] += len(ecrits)
+            bilan['vides'] += len(travaux[thematique, annee]) - len(ecrits)
+
+    temporaire = os.path.join(racine, MANIFESTE + '.tmp')
+    with open(temporaire, 'w', encoding='utf-8') as fichier:
+        json.dump(manifeste, fichier, indent=1, ensure_ascii=False, sort_keys=True)
+    os.replace(temporaire, os.path.join(racine, MANIFESTE))
+    return bilan
+
+
+def _option(nom, defaut=None):
+    return sys.argv[sys.argv.index(nom) + 1] if nom in sys.argv else defaut
+
+
+if __name__ == '__main__':
+    debut = time.perf_counter()
+    racine = _option('--sortie', DOSSIER_EXPORT)
+    processus = _option('--processus')
+    annees = _option('--annees')
+    bilan = exporter(
+        racine,
+        processus=int(processus) if processus else None,
+        annees=[int(annee) for annee in annees.split(',')] if annees else None,
+        forcer='--forcer' in sys.argv
+    )
+    for combinaison, duree in sorted(bilan['durees'].items(), key=lambda element: -element[1])[:10]:
+        print(f"{combinaison:<45} {duree * 1000:8.0f} ms")
+    print(f"{bilan['ecrits']} fichiers écrits, {bilan['inchanges']} inchangés, {bilan['vides']} sans agent "
+          f"dans {racine}/ en {time.perf_counter() - debut:.1f} s")
@@ -0,0 +1,226 @@
+# CACHE DES FIGURES PLOTLY
+#
+# Chaque interaction Streamlit réexécute toute la page : sans cache, chaque
+# figure est reconstruite (préparation des données, puis go.Figure / px.*)
+# même si rien de ce qui la détermine n'a changé. Les figures sont gardées
+# en JSON sérialisé, sous la clé (page, graphique, empreinte des paramètres) ;
+# les paramètres sont les filtres globaux et les options de la page (année,
+# pondération...), complétés de l'empreinte des sources. Le cache est commun
+# aux sessions du serveur, borné (éviction LRU) et tient ses compteurs de
+# succès / échecs (statistiques_figures()).
+#
+# Avant sa mise en cache, le JSON est allégé pour l'envoi au navigateur
+# (alleger_figure()) : valeurs arrondies à la précision affichée, colonnes de
+# customdata absentes des modèles de survol retirées, tableaux numériques
+# encodés en binaire (base64 des tableaux typés de plotly.js) au lieu de
+# listes de nombres en texte. Les tailles avant / après de chaque figure sont
+# relevées (tailles_figures()).
+#
+# Taille : variable d'environnement AGENTS_CACHE_FIGURES (nombre de figures, 64 par défaut).
+# AGENTS_FIGURES_BRUTES=1 envoie les figures telles que Plotly les sérialise (comparaison).
+
+import base64
+import collections
+import hashlib
+import json
+import os
+import re
+import threading
+
+import numpy as np
+import plotly.graph_objects as go
+import streamlit as st
+
+from donnees.derives import empreinte_courante
+from donnees.instrumentation import etape
+
+TAILLE_CACHE_FIGURES = int(os.environ.get('AGENTS_CACHE_FIGURES', 64))
+ALLEGER_FIGURES = os.environ.get('AGENTS_FIGURES_BRUTES', '0') != '1'
+
+# Décimales envoyées : coordonnées au mètre près, autres valeurs à la précision des survols (2 décimales)
+DECIMALES = {'lat': 5, 'lon': 5}
+DECIMALES_DEFAUT = 2
+# Tableaux numériques encodés en binaire à partir de cette taille (les plus courts restent en texte)
+TAILLE_MIN_BINAIRE = 16
+# Propriétés numériques affichées telles quelles (texte des étiquettes) : arrondies, jamais encodées
+PROPRIETES_TEXTE = {'text', 'hovertext'}
+# Types des tableaux typés de plotly.js, du plus compact au plus large
+TYPES_ENTIERS = ['i1', 'u1', 'i2', 'u2', 'i4', 'u4']
+
+# Clé -> JSON de la figure, du moins récemment au plus récemment utilisé
+_figures = collections.OrderedDict()
+_compteurs = {'succes': 0, 'echecs': 0, 'evictions': 0}
+# (page, graphique) -> (octets du JSON Plotly, octets envoyés) de sa dernière construction
+_tailles = {}
+# Les sessions Streamlit s'exécutent dans des threads distincts
+_verrou = threading.Lock()
+
+
+def cle_figure(page, graphique, parametres):
+    """Clé du cache : (page, graphique, empreinte des paramètres et des sources)"""
+    sha = hashlib.sha256(empreinte_courante().encode())
+    sha.update(repr(parametres).encode())
+    return page, graphique, sha.hexdigest()[:16]
+
+
+def figure_en_cache(page, graphique, construire, *parametres):
+    """JSON de la figure construire(*parametres), construite seulement si absente du cache"""
+    cle = cle_figure(page, graphique, parametres)
+    with _verrou:
+        spec = _figures.get(cle)
+        if spec is not None:
+            _figures.move_to_end(cle)
+            _compteurs['succes'] += 1
+            return spec
+        _compteurs['echecs'] += 1
+
+    with etape('figure', graphique):
+        figure = construire(*parametres)
+    with etape('serialisation', graphique):
+        brut = figure.to_json()
+        spec = json.dumps(alleger_figure(json.loads(brut)), separators=(',', ':')) if ALLEGER_FIGURES else brut
+    with _verrou:
+        _tailles[page, graphique] = (len(brut), len(spec))
+        _figures[cle] = spec
+        _figures.move_to_end(cle)
+        while len(_figures) > TAILLE_CACHE_FIGURES:
+            _figures.popitem(last=False)
+            _compteurs['evictions'] += 1
+    return spec
+
+
+def afficher_figure(page, graphique, construire, *parametres, **options):
+    """st.plotly_chart de la figure construire(*parametres), servie par le cache des figures.
+
+    construire prépare ses données et retourne la figure : tout est sauté si la
+    figure est en cache. Les options sont celles de st.plotly_chart.
+    """
+    spec = figure_en_cache(page, graphique, construire, *parametres)
+    # JSON déjà produit par une figure valide : reconstruction sans revalidation
+    with etape('serialisation', graphique):
+        st.plotly_chart(go.Figure(json.loads(spec), _validate=False), **options)
+
+
+def statistiques_figures():
+    """Compteurs du cache des figures : succès, échecs, évictions, figures et octets gardés"""
+    with _verrou:
+        return {
+            **_compteurs,
+            'figures': len(_figures),
+            'octets': sum(len(spec) for spec in _figures.values())
+        }
+
+
+def tailles_figures():
+    """Octets de chaque figure construite : {(page, graphique): (JSON Plotly, JSON envoyé)}"""
+    with _verrou:
+        return dict(_tailles)
+
+
+def vider_cache_figures():
+    """Vide le cache des figures et remet ses compteurs à zéro"""
+    with _verrou:
+        _figures.clear()
+        _tailles.clear()
+        _compteurs.update(dict.fromkeys(_compteurs, 0))
+
+
+# =============================================================================
+# ALLÈGEMENT DU JSON ENVOYÉ AU NAVIGATEUR
+# =============================================================================
+def _tableau_numerique(valeurs):
+    """Tableau NumPy (1 ou 2 dimensions) d'une liste de nombres sans valeur manquante, sinon None"""
+    if not valeurs or isinstance(valeurs[0], str):
+        return None
+    try:
+        tableau = np.asarray(valeurs)
+    except ValueError:
+        # Lignes de longueurs différentes
+        return None
+    if tableau.dtype.kind not in 'iuf' or tableau.ndim > 2 or not np.isfinite(tableau).all():
+        return None
+    return tableau
+
+
+def _type_entier(tableau):
+    """Type de tableau typé entier le plus compact contenant toutes les valeurs (None si aucun)"""
+    bas, haut = tableau.min(), tableau.max()
+    for code in TYPES_ENTIERS:
+        limites = np.iinfo(np.dtype(code))
+        if limites.min <= bas and haut <= limites.max:
+            return code
+    return None
+
+
+def encoder_tableau(tableau, decimales=DECIMALES_DEFAUT, binaire=True):
+    """Tableau arrondi à decimales : liste JSON, ou tableau typé base64 de plotly.js s'il est assez long"""
+    if tableau.dtype.kind == 'f':
+        tableau = np.round(tableau, decimales)
+        if (tableau == np.round(tableau)).all():
+            tableau = tableau.astype(np.int64)
+    if not binaire or tableau.size < TAILLE_MIN_BINAIRE:
+        return tableau.tolist()
+
+    code = _type_entier(tableau) if tableau.dtype.kind in 'iu' else None
+    if code is None:
+        # float32 suffit si l'écart reste sous la précision gardée
+        simple = tableau.astype(np.float32)
+        code = 'f4' if (np.abs(simple - tableau) <= 0.5 * 10.0 ** -decimales).all() else 'f8'
+    donnees = tableau.astype(np.dtype(code).newbyteorder('<')).tobytes()
+    return {
+        'dtype': code,
+        'bdata': base64.b64encode(donnees).decode('ascii'),
+        'shape': ','.join(map(str, tableau.shape))
+    }
+
+
+def _colonnes_customdata(trace):
+    """Ne garde de customdata (2 dimensions) que les colonnes citées par les modèles de survol / texte.
+
+    Les colonnes retirées sont celles que plotly.express y place sans les afficher
+    (hover_data={'LATITUDE': False...}) ; les indices des modèles sont renumérotés.
+    """
+    customdata = trace.get('customdata')
+    modeles = {cle: trace[cle] for cle in ('hovertemplate', 'texttemplate') if cle in trace}
+    if not customdata or not isinstance(customdata[0], list) or 'hovertemplate' not in modeles:
+        return
+    if not all(isinstance(modele, str) for modele in modeles.values()):
+        return
+    texte = ''.join(modeles.values())
+    # customdata cité sans indice : le tableau entier est utilisé
+    if re.search(r'customdata(?!\[)', texte):
+        return
+
+    citees = sorted({int(indice) for indice in re.findall(r'customdata\[(\d+)\]', texte)})
+    if not citees:
+        del trace['customdata']
+        return
+    if citees == list(range(len(customdata[0]))):
+        return
+    nouveaux = {ancien: nouveau for nouveau, ancien in enumerate(citees)}
+    trace['customdata'] = [[ligne[indice] for indice in citees] for ligne in customdata]
+    for cle, modele in modeles.items():
+        trace[cle] = re.sub(
+            r'customdata\[(\d+)\]', lambda citation: f'customdata[{nouveaux[int(citation.group(1))]}]', modele
+        )
+
+
+def _alleger_valeurs(objet):
+    """Arrondit et encode en place les tableaux numériques d'une trace (sous-objets compris)"""
+    for cle, valeur in objet.items():
+        if isinstance(valeur, dict):
+            _alleger_valeurs(valeur)
+        elif isinstance(valeur, list):
+            tableau = _tableau_numerique(valeur)
+            if tableau is not None:
+                objet[cle] = encoder_tableau(
+                    tableau, DECIMALES.get(cle, DECIMALES_DEFAUT), binaire=cle not in PROPRIETES_TEXTE
+                )
+
+
+def alleger_figure(spec):
+    """JSON de figure (dict, comme produit par fig.to_json()) allégé pour l'envoi ; la mise en page est inchangée"""
+    for trace in spec.get('data', []):
+        _colonnes_customdata(trace)
+        _alleger_valeurs(trace)
+    return spec
@@ -0,0 +1,78 @@
+# FILTRES GLOBAUX DE LA SIDEBAR
+#
+# Panneau commun à toutes les pages : plage d'années, modalités des
+# dimensions et tranches de distance. La sélection est normalisée en tuple
+# (donnees/filtres.py) et gardée dans st.session_state ; chaque page la lit
+# par filtres_actifs() et la passe aux requêtes, qui la résolvent sur les
+# structures précalculées (aucune relecture des lignes brutes).
+
+import streamlit as st
+
+from donnees.cube import TRANCHES_DISTANCE
+from donnees.filtres import construire_filtres
+from donnees.partitions import annees_disponibles
+from donnees.requetes import cellules_filtrees, effectif_filtre, modalites_filtres
+
+CLE_FILTRES = 'filtres_globaux'
+
+# Libellés des dimensions proposées
+LIBELLES = {
+    'DIRECTION_THEMATIQUE': "Direction thématique",
+    'DIRECTION': "Direction",
+    'CATEGORIE': "Catégorie",
+    'SEXE': "Sexe",
+    'ZONE_SIMPLIFIEE': "Zone"
+}
+
+
+def afficher_filtres():
+    """Panneau des filtres globaux dans la sidebar ; retourne les filtres normalisés"""
+    annees = annees_disponibles()
+    modalites, thematiques = modalites_filtres()
+    choix = {}
+
+    with st.sidebar.expander("Filtres globaux"):
+        debut, fin = st.slider(
+            "Années :", min_value=min(annees), max_value=max(annees), value=(min(annees), max(annees))
+        )
+        choix['DIRECTION_THEMATIQUE'] = st.multiselect(
+            LIBELLES['DIRECTION_THEMATIQUE'], modalites['DIRECTION_THEMATIQUE'], placeholder="Toutes"
+        )
+        # Directions proposées : celles des thématiques retenues
+        directions = [
+            direction for direction in modalites['DIRECTION']
+            if not choix['DIRECTION_THEMATIQUE'] or thematiques.get(direction) in choix['DIRECTION_THEMATIQUE']
+        ]
+        choix['DIRECTION'] = st.multiselect(LIBELLES['DIRECTION'], directions, placeholder="Toutes")
+        for dimension in ['CATEGORIE', 'SEXE', 'ZONE_SIMPLIFIEE']:
+            choix[dimension] = st.multiselect(LIBELLES[dimension], modalites[dimension], placeholder="Toutes")
+        bas, haut = st.select_slider(
+            "Distance à Paris :",
+            options=range(len(TRANCHES_DISTANCE)),
+            value=(0, len(TRANCHES_DISTANCE) - 1),
+            format_func=lambda tranche: TRANCHES_DISTANCE[tranche]
+        )
+
+    # Plages complètes : aucun filtre (les pages lisent alors les tables exactes)
+    filtres = construire_filtres(
+        annees=None if (debut, fin) == (min(annees), max(annees)) else range(debut, fin + 1),
+        tranches=None if (bas, haut) == (0, len(TRANCHES_DISTANCE) - 1) else range(bas, haut + 1),
+        **choix
+    )
+    st.session_state[CLE_FILTRES] = filtres
+    if filtres:
+        st.sidebar.caption(f"Filtres actifs : {effectif_filtre(filtres):,.0f} agents retenus")
+    return filtres
+
+
+def filtres_actifs():
+    """Filtres globaux choisis dans la sidebar (tuple vide : aucun filtre)"""
+    return st.session_state.get(CLE_FILTRES, ())
+
+
+def selection_vide(filtres):
+    """Avertit et retourne True si les filtres globaux ne retiennent aucun agent"""
+    if filtres and cellules_filtrees(filtres) == 0:
+        st.warning("Aucun agent ne correspond aux filtres globaux : élargir la sélection dans la sidebar.")
+        return True
+    return False
@@ -0,0 +1,106 @@
+# PANNEAU D'ADMINISTRATION : PERFORMANCES DE LA PAGE
+#
+# Section repliable de la sidebar, visible seulement en administration
+# (AGENTS_ADMIN=1, ou ?admin=1 dans l'adresse) : durées propres par étape de
+# l'exécution courante, étapes les plus lentes, pic mémoire et lignes qui
+# retiennent le plus de mémoire (si le suivi est coché), taux de succès de
+# chaque cache et tailles des figures. Les mesures sont prises par
+# donnees/instrumentation.py ; leur journal se résume par
+# python -m donnees.instrumentation.
+
+import os
+
+import pandas as pd
+import streamlit as st
+
+from donnees import derives
+from donnees.instrumentation import ETAPES, JOURNAL_PERFORMANCES, PROFILAGE, statistiques_compteurs
+from donnees.requetes import statistiques_requetes
+from vues.figures import statistiques_figures, tailles_figures
+
+CLE_MEMOIRE = 'profilage_memoire'
+
+# Étapes les plus lentes affichées
+NB_ETAPES_LENTES = 8
+
+
+def admin_actif():
+    """Panneau d'administration demandé (AGENTS_ADMIN=1 ou ?admin=1)"""
+    return os.environ.get('AGENTS_ADMIN', '') == '1' or st.query_params.get('admin') == '1'
+
+
+def profiler_memoire():
+    """Suivi tracemalloc demandé pour la prochaine exécution (case du panneau)"""
+    return st.session_state.get(CLE_MEMOIRE, False)
+
+
+def journal_actif():
+    """Chemin du journal des mesures si le profilage est actif, sinon None"""
+    return JOURNAL_PERFORMANCES if PROFILAGE or admin_actif() else None
+
+
+def statistiques_caches():
+    """{cache: {'succes', 'echecs'}} de tous les caches : requêtes, tables, jeu de données, figures"""
+    caches = {f'requetes.{nom}': compteurs for nom, compteurs in statistiques_requetes().items()}
+    infos = derives._table_donnees.cache_info()
+    caches['derives.table_donnees'] = {'succes': infos.hits, 'echecs': infos.misses}
+    caches.update(statistiques_compteurs())
+    figures = statistiques_figures()
+    caches['figures'] = {'succes': figures['succes'], 'echecs': figures['echecs']}
+    return caches
+
+
+def _tableau_caches(caches):
+    """Caches sollicités, avec leur taux de succès"""
+    lignes = [
+        {'Cache': nom, 'Succès': compteurs['succes'], 'Échecs': compteurs['echecs'],
+         'Taux (%)': 100 * compteurs['succes'] / (compteurs['succes'] + compteurs['echecs'])}
+        for nom, compteurs in caches.items() if compteurs['succes'] + compteurs['echecs']
+    ]
+    return pd.DataFrame(lignes, columns=['Cache', 'Succès', 'Échecs', 'Taux (%)'])
+
+
+def afficher_instrumentation(mesure):
+    """Section « Administration – performances » de la sidebar pour la mesure terminée de la page"""
+    with st.sidebar.expander("Administration – performances"):
+        st.checkbox(
+            "Suivre la mémoire (tracemalloc)", key=CLE_MEMOIRE,
+            help="Appliqué à l'exécution suivante ; ralentit nettement la page"
+        )
+        st.metric("Durée de la page", f"{mesure['duree_ms']:.0f} ms")
+        st.dataframe(
+            pd.Series(mesure['par_categorie'], name='ms').reindex([*ETAPES, 'autre']).round(1),
+            use_container_width=True
+        )
+
+        st.markdown("**Étapes les plus lentes** (durée propre)")
+        lentes = sorted(mesure['etapes'], key=lambda etape: etape['propre_ms'], reverse=True)[:NB_ETAPES_LENTES]
+        st.dataframe(
+            pd.DataFrame(lentes, columns=['categorie', 'nom', 'propre_ms', 'duree_ms', *(
+                ['pic_ko'] if mesure['memoire'] else []
+            )]).round(1),
+            hide_index=True, use_container_width=True
+        )
+
+        if mesure['memoire']:
+            st.metric("Pic d'allocations", f"{mesure['pic_ko'] / 1024:.1f} Mo")
+            st.dataframe(pd.DataFrame(mesure['lignes_memoire']).round(1), hide_index=True, use_container_width=True)
+
+        st.markdown("**Caches**")
+        st.dataframe(_tableau_caches(mesure.get('caches', {})).round(1), hide_index=True, use_container_width=True)
+
+        tailles = tailles_figures()
+        if tailles:
+            st.markdown("**Figures** (octets du JSON Plotly / envoyés)")
+            st.dataframe(
+                pd.DataFrame(
+                    [(page.rsplit('.', 1)[-1], graphique, brut, envoye)
+                     for (page, graphique), (brut, envoye) in tailles.items()],
+                    columns=['Page', 'Figure', 'Plotly', 'Envoyés']
+                ),
+                hide_index=True, use_container_width=True
+            )
+
+        journal = journal_actif()
+        if journal:
+            st.caption(f"Mesures ajoutées à {journal} (python -m donnees.instrumentation)")
@@ -0,0 +1,73 @@
+# MESURE DU TEMPS D'IMPORT AU DÉMARRAGE
+#
+# Compare, dans des interpréteurs neufs, le coût des imports de l'ancien
+# script monolithique (tout importé en tête) à celui du socle actuel, puis le
+# surcoût de chaque page lors de sa première sélection.
+#
+# Usage : python -m vues.mesure_imports [--repetitions N]
+
+import os
+import subprocess
+import sys
+import tempfile
+
+from vues import PAGES
+
+RACINE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# En-tête de l'ancien streamlit.py (folium, streamlit_folium et matplotlib n'étaient pas utilisés)
+IMPORTS_AVANT = [
+    'streamlit', 'pandas', 'plotly.express', 'plotly.graph_objects', 'folium',
+    'streamlit_folium', 'matplotlib.pyplot', 'numpy', 'PIL.Image'
+]
+
+# Ce qu'importe streamlit.py avant d'afficher une page
+IMPORTS_SOCLE = ['streamlit', 'donnees.chargement', 'vues', 'vues.chargement']
+
+_CODE = '''
+import importlib, sys, time
+sys.path.append({racine!r})
+def importer(modules):
+    absents = []
+    debut = time.perf_counter()
+    for module in modules:
+        try:
+            importlib.import_module(module)
+        except ImportError:
+            absents.append(module)
+    return time.perf_counter() - debut, absents
+duree_socle, absents_socle = importer({socle!r})
+duree_page, absents_page = importer({page!r})
+print(duree_socle, duree_page, ','.join(absents_socle + absents_page))
+'''
+
+
+def mesurer(socle, page=(), repetitions=3):
+    """Meilleur temps (s) d'import du socle puis de la page, dans un interpréteur neuf"""
+    meilleur_socle, meilleur_page, absents = float('inf'), float('inf'), ''
+    for _ in range(repetitions):
+        # Dossier temporaire : le script streamlit.py du projet ne doit pas masquer le module
+        sortie = subprocess.run(
+            [sys.executable, '-c', _CODE.format(racine=RACINE, socle=list(socle), page=list(page))],
+            cwd=tempfile.gettempdir(), capture_output=True, text=True, check=True
+        ).stdout.split()
+        meilleur_socle = min(meilleur_socle, float(sortie[0]))
+        meilleur_page = min(meilleur_page, float(sortie[1]))
+        absents = sortie[2] if len(sortie) > 2 else ''
+    return meilleur_socle, meilleur_page, absents
+
+
+if __name__ == '__main__':
+    repetitions = int(sys.argv[sys.argv.index('--repetitions') + 1]) if '--repetitions' in sys.argv else 3
+
+    avant, _, absents = mesurer(IMPORTS_AVANT, repetitions=repetitions)
+    socle, _, _ = mesurer(IMPORTS_SOCLE, repetitions=repetitions)
+    print(f"{'Ancien en-tête (tout importé)':<45} {avant * 1000:8.0f} ms"
+          + (f"   (absents : {absents})" if absents else ''))
+    print(f"{'Socle actuel (avant toute page)':<45} {socle * 1000:8.0f} ms")
+    print(f"{'Gain au démarrage':<45} {(avant - socle) * 1000:8.0f} ms")
+    print()
+    print("Surcoût de la première sélection de chaque page :")
+    for nom, module in PAGES.items():
+        _, page, _ = mesurer(IMPORTS_SOCLE, [module], repetitions)
+        print(f"  {nom:<43} {page * 1000:8.0f} ms")
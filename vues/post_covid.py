@@ -0,0 +1,211 @@
+# PAGE 7 : ANALYSE POST-COVID
+
+import plotly.graph_objects as go
+import streamlit as st
+
+from donnees.derives import PRE_COVID, POST_COVID
+from donnees.requetes import agents_plus_50km, comparaison_covid, parts_annuelles
+from vues.communs import boite_precalculee, choisir_ponderation
+from vues.figures import afficher_figure
+from vues.filtres import filtres_actifs, selection_vide
+
+
+def afficher():
+    """Page « Analyse post-COVID »"""
+    st.header("Impact du COVID-19 sur la Dispersion Géographique")
+    st.markdown("Analyse de la distance moyenne de Paris avant/après 2020")
+    
+    filtres = filtres_actifs()
+    if selection_vide(filtres):
+        return
+    
+    ponderer = choisir_ponderation()
+    
+    # Statistiques par période (tables précalculées)
+    _, stats_periode, _ = comparaison_covid(ponderer, filtres)
+    
+    # GRAPHIQUE 1: Distance moyenne par année
+    st.subheader("Distance moyenne de Paris par année")
+    afficher_figure(__name__, 'distance_annuelle', figure_distance_annuelle, ponderer, filtres,
+                    use_container_width=True)
+    
+    # Statistiques (les filtres globaux peuvent ne retenir les années que d'une période)
+    comparable = (stats_periode['n'] > 0).all()
+    pre_covid = stats_periode.loc[PRE_COVID, 'mean']
+    post_covid = stats_periode.loc[POST_COVID, 'mean']
+    variation = ((post_covid - pre_covid) / pre_covid) * 100
+    
+    if comparable:
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Distance pré-COVID (≤2019)", f"{pre_covid:.2f} km")
+        with col2:
+            st.metric("Distance post-COVID (≥2020)", f"{post_covid:.2f} km")
+        with col3:
+            st.metric("Variation", f"{variation:+.2f}%", delta_color="normal")
+    else:
+        st.info("Les filtres globaux ne retiennent qu'une période : comparaison pré / post-COVID indisponible")
+    
+    # Interprétation
+    st.markdown("""
+    L'évolution de la distance moyenne montre la tendance de localisation résidentielle 
+    avant et après le début de la pandémie COVID-19 (marquée par la ligne verticale rouge). 
+    Les métriques comparent les périodes pré-COVID (2014-2019) et post-COVID (2020-2022).
+    """)
+    
+    # GRAPHIQUE 2: Boxplot comparatif
+    st.subheader("Distribution des distances : Pré vs Post COVID")
+    afficher_figure(__name__, 'boites_periodes', figure_boites_periodes, ponderer, filtres,
+                    use_container_width=True)
+    
+    # Interprétation
+    st.markdown("""
+    Les boxplots comparent les distributions complètes des distances pour les deux périodes. 
+    Cette visualisation révèle les changements dans la médiane, les quartiles et la dispersion globale.
+    """)
+    
+    # GRAPHIQUE 3: Évolution Paris vs Hors Paris
+    st.subheader("Répartition Paris vs Hors Paris dans le temps")
+    afficher_figure(__name__, 'parts_zones', figure_parts_zones, filtres, use_container_width=True)
+    
+    # Interpretation
+    st.markdown("""
+    Le graphique en aires empilées montre l'évolution de la proportion d'agents 
+    résidant à Paris intra-muros versus hors Paris.
+    """)
+    
+    # GRAPHIQUE 4: Agents à >50km
+    st.subheader("Agents vivant à plus de 50km de Paris")
+    afficher_figure(__name__, 'agents_loin', figure_agents_loin, filtres, use_container_width=True)
+    
+    # Interpretation
+    st.markdown("""
+    Ce graphique se concentre sur les agents résidant à plus de 50 km de Paris, 
+    une distance significative impliquant généralement des trajets quotidiens conséquents ou du télétravail régulier.
+    """)
+    
+    # Interprétation finale
+    st.subheader("Synthèse")
+    if not comparable:
+        st.info("Synthèse indisponible : élargir la plage d'années aux deux périodes")
+    elif abs(variation) > 2:
+        st.success(f"Variation détectable de {variation:+.2f}% entre les périodes pré et post-COVID")
+    else:
+        st.info(f"Variation limitée ({variation:+.2f}%) : stabilité relative des patterns résidentiels")
+
+
+# =============================================================================
+# FIGURES (construites seulement en l'absence du cache, voir vues/figures.py)
+# =============================================================================
+def figure_distance_annuelle(ponderer, filtres):
+    """Distance moyenne par année, ligne du début du COVID"""
+    distance_annuelle, _, _ = comparaison_covid(ponderer, filtres)
+    
+    fig1 = go.Figure()
+    
+    fig1.add_trace(go.Scatter(
+        x=distance_annuelle.index,
+        y=distance_annuelle.values,
+        mode='lines+markers',
+        name='Distance moyenne',
+        line=dict(color='#2E86AB', width=3),
+        marker=dict(size=10)
+    ))
+    
+    # Ligne COVID
+    fig1.add_vline(x=2019.5, line_dash="dash", line_color="red", 
+                  annotation_text="Début COVID-19", annotation_position="top")
+    
+    fig1.update_layout(
+        title='Distance Moyenne de Paris par Année',
+        xaxis_title='Année',
+        yaxis_title='Distance moyenne (km)',
+        height=500
+    )
+    return fig1
+
+
+def figure_boites_periodes(ponderer, filtres):
+    """Boîtes à moustaches des distances pré et post-COVID"""
+    _, stats_periode, _ = comparaison_covid(ponderer, filtres)
+    
+    fig2 = go.Figure()
+    couleurs_periode = {
+        PRE_COVID: '#2E86AB',
+        POST_COVID: '#A23B72'
+    }
+    for nom_periode, couleur in couleurs_periode.items():
+        fig2.add_trace(boite_precalculee(
+            stats_periode.loc[[nom_periode]], [nom_periode], name=nom_periode, marker_color=couleur
+        ))
+    
+    fig2.update_layout(
+        height=500,
+        showlegend=False,
+        xaxis_title='Période',
+        yaxis_title='DISTANCE_PARIS_KM'
+    )
+    return fig2
+
+
+def figure_parts_zones(filtres):
+    """Parts Paris / Hors Paris par année, en aires empilées"""
+    zone_pct = parts_annuelles('ZONE_SIMPLIFIEE', filtres)
+    
+    fig3 = go.Figure()
+    
+    if 'HORS PARIS' in zone_pct.columns:
+        fig3.add_trace(go.Scatter(
+            x=zone_pct.index,
+            y=zone_pct['HORS PARIS'],
+            name='Hors Paris',
+            mode='lines',
+            stackgroup='one',
+            fillcolor='#A23B72'
+        ))
+    
+    if 'PARIS' in zone_pct.columns:
+        fig3.add_trace(go.Scatter(
+            x=zone_pct.index,
+            y=zone_pct['PARIS'],
+            name='Paris',
+            mode='lines',
+            stackgroup='one',
+            fillcolor='#F18F01'
+        ))
+    
+    fig3.add_vline(x=2019.5, line_dash="dash", line_color="red",
+                   annotation_text="COVID-19")
+    
+    fig3.update_layout(
+        title='Répartition Paris vs Hors Paris (%)',
+        xaxis_title='Année',
+        yaxis_title='Pourcentage (%)',
+        height=500,
+        yaxis=dict(range=[0, 100])
+    )
+    return fig3
+
+
+def figure_agents_loin(filtres):
+    """Agents à plus de 50 km par année, avant / après le COVID"""
+    agents_loin = agents_plus_50km(filtres)
+    
+    fig4 = go.Figure()
+    
+    fig4.add_trace(go.Bar(
+        x=agents_loin.index,
+        y=agents_loin.values,
+        marker_color=['#2E86AB' if x < 2020 else '#A23B72' for x in agents_loin.index],
+        showlegend=False
+    ))
+    
+    fig4.add_vline(x=2019.5, line_dash="dash", line_color="red")
+    
+    fig4.update_layout(
+        title='Nombre d\'agents vivant à >50km de Paris',
+        xaxis_title='Année',
+        yaxis_title='Nombre d\'agents',
+        height=500
+    )
+    return fig4
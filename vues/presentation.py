@@ -0,0 +1,74 @@
+# PAGE 1 : PRÉSENTATION DES DONNÉES
+
+import plotly.express as px
+import streamlit as st
+
+from donnees.filtres import annees_retenues, masque_lignes
+from donnees.partitions import annees_disponibles
+from donnees.requetes import description_annee, resume_annee
+from vues.chargement import charger_annee
+from vues.figures import afficher_figure
+from vues.filtres import filtres_actifs, selection_vide
+
+
+def afficher():
+    """Page « Présentation des données »"""
+    st.header("Présentation du jeu de données")
+    filtres = filtres_actifs()
+    if selection_vide(filtres):
+        return
+    
+    # FILTRE ANNUEL (années retenues par les filtres globaux)
+    st.sidebar.markdown("---")
+    st.sidebar.subheader("Filtres")
+    annee_selectionnee = st.sidebar.selectbox(
+        "Sélectionner une année :",
+        options=annees_retenues(filtres, sorted(annees_disponibles(), reverse=True)),
+        index=0  # Par défaut, la plus récente (2022)
+    )
+    
+    # Lire uniquement la partition de l'année
+    df_filtree = charger_annee(annee_selectionnee)
+    if filtres:
+        df_filtree = df_filtree[masque_lignes(df_filtree, filtres)]
+    indicateurs, _ = resume_annee(annee_selectionnee, filtres)
+    
+    # Message
+    st.info(f"Données affichées pour l'année {annee_selectionnee}")
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Nombre d'agents", f"{indicateurs['AGENTS']:,.0f}")
+    with col2:
+        st.metric("Villes différentes", f"{indicateurs['VILLES']:,}")
+    with col3:
+        st.metric("Directions thématiques", f"{indicateurs['THEMATIQUES']}")
+    
+    st.subheader(f"Aperçu des données - {annee_selectionnee}")
+    st.dataframe(df_filtree.head(20), use_container_width=True)
+    
+    # Année entière : statistiques précalculées ; sinon calculées sur les seules lignes retenues
+    st.subheader("Statistiques descriptives")
+    description = df_filtree.describe() if filtres else description_annee(annee_selectionnee)
+    st.dataframe(description, use_container_width=True)
+    
+    # Distribution des catégories
+    st.subheader("Distribution des catégories professionnelles")
+    afficher_figure(__name__, 'repartition_categories', figure_repartition_categories, annee_selectionnee, filtres,
+                    use_container_width=True)
+
+
+# =============================================================================
+# FIGURES (construites seulement en l'absence du cache, voir vues/figures.py)
+# =============================================================================
+def figure_repartition_categories(annee, filtres):
+    """Camembert des effectifs A / B / C d'une année"""
+    _, cat_counts = resume_annee(annee, filtres)
+    fig = px.pie(
+        values=cat_counts.values,
+        names=cat_counts.index,
+        title=f"Répartition A / B / C en {annee}",
+        color=cat_counts.index,
+        color_discrete_map={'A': '#d62728', 'B': '#ff7f0e', 'C': '#1f77b4'}
+    )
+    return fig
@@ -0,0 +1,110 @@
+# PAGE 4 : TREEMAP - DIRECTIONS THÉMATIQUES
+
+import plotly.graph_objects as go
+import streamlit as st
+
+from donnees.directions import DIRECTION_MAPPING
+from donnees.treemap import elements_treemap, composition_thematique, recapitulatif_thematiques
+from donnees.requetes import hierarchie_treemap
+from vues.figures import afficher_figure
+from vues.filtres import filtres_actifs, selection_vide
+
+
+def afficher():
+    """Page « Treemap - Directions thématiques »"""
+    st.header("Distribution des agents par direction thématique")
+    st.markdown("Treemap hiérarchique : Catégories thématiques > Directions individuelles")
+    st.markdown("Couleur = Proportion de femmes (Bleu = Hommes | Rouge = Femmes)")
+    
+    filtres = filtres_actifs()
+    if selection_vide(filtres):
+        return
+    
+    # Hiérarchie précalculée (une seule agrégation pour les deux niveaux)
+    thematiques, directions = hierarchie_treemap(filtres)
+    
+    # Créer treemap hiérarchique
+    afficher_figure(__name__, 'treemap', figure_treemap, filtres, use_container_width=True)
+    
+    # Interpretation
+    st.markdown("""
+    Le treemap présente une visualisation hiérarchique à deux niveaux. 
+    La taille de chaque rectangle est proportionnelle au nombre d'agents. Le premier niveau montre 
+    les catégories thématiques principales, et en cliquant dessus, on peut explorer les directions 
+    individuelles qui les composent. La couleur indique la proportion de femmes, du bleu (majorité masculine) 
+    au rouge (majorité féminine).
+    """)
+    
+    # Tableau de composition des catégories thématiques (CON % FEMMES)
+    st.subheader("Composition détaillée par catégorie thématique")
+    
+    for thematique in sorted(DIRECTION_MAPPING.keys()):
+        with st.expander(f"**{thematique}**"):
+            # Table des directions avec % femmes (réutilise la hiérarchie du treemap)
+            table_df = composition_thematique(directions, thematique)
+            if not table_df.empty:
+                total = table_df['Agents'].sum()
+                
+                st.dataframe(
+                    table_df.style.format({
+                        'Agents': '{:,.0f}', 
+                        '% Total': '{:.2f}%',
+                        '% Femmes': '{:.1f}%'
+                    }),
+                    use_container_width=True
+                )
+                st.metric(f"Total {thematique}", f"{total:,.0f} agents")
+            else:
+                st.info("Aucune donnée disponible pour cette catégorie")
+    
+    # Tableau récapitulatif global
+    st.subheader("Tableau récapitulatif par catégorie thématique")
+    
+    summary_df = recapitulatif_thematiques(thematiques)
+    
+    st.dataframe(
+        summary_df.style.format({
+            'Total Agents': '{:,.0f}',
+            '% du Total': '{:.2f}%',
+            '% Femmes': '{:.1f}%'
+        }),
+        use_container_width=True
+    )
+    
+    # Interprétation
+    st.markdown("""
+    Les tableaux détaillés montrent la composition exacte de chaque catégorie thématique, 
+    avec les effectifs par direction, leur poids relatif, et la proportion de femmes.
+    """)
+
+
+# =============================================================================
+# FIGURES (construites seulement en l'absence du cache, voir vues/figures.py)
+# =============================================================================
+def figure_treemap(filtres):
+    """Treemap thématiques > directions, coloré par la proportion de femmes"""
+    thematiques, directions = hierarchie_treemap(filtres)
+    elements = elements_treemap(thematiques, directions)
+    
+    fig = go.Figure(go.Treemap(
+        labels=elements['labels'],
+        parents=elements['parents'],
+        values=elements['values'],
+        marker=dict(
+            colorscale='RdBu_r',
+            cmid=50,
+            colorbar=dict(title="% Femmes"),
+            line=dict(width=2, color='white'),
+            colors=elements['colors']
+        ),
+        hovertemplate='%{customdata}<extra></extra>',
+        customdata=elements['hover_texts'],
+        textposition='middle center',
+        textfont=dict(size=10, color='white', family='Arial')
+    ))
+    
+    fig.update_layout(
+        title='Distribution Hiérarchique : Catégories Thématiques > Directions',
+        height=800
+    )
+    return fig
@@ -0,0 +1,44 @@
+# PAGE 8 : WORDCLOUD
+
+import streamlit as st
+from PIL import Image
+
+
+def afficher():
+    """Page « WordCloud - Text Mining »"""
+    st.header("Analyse d'un Article de Presse - Text Mining")
+    st.markdown("**Source :** [Le Figaro - Article sur les effectifs de la Ville de Paris](https://www.lefigaro.fr/actualite-france/une-armee-de-55-000-personnes-la-mairie-de-paris-emploie-t-elle-plus-d-agents-que-toutes-les-prefectures-de-france-reunies-20241029)")
+    
+    st.info("Analyse textuelle d'un article portant sur les effectifs de la mairie de Paris")
+    
+    # Charger l'image du wordcloud
+    try:
+        img = Image.open('wordcloud_article_lefigaro.png')
+        st.image(img, caption='Nuage de Mots - Article Le Figaro', use_container_width=True)
+        
+        st.markdown("""
+        ### Interprétation
+        
+        Le nuage de mots met en évidence les termes les plus fréquents dans l'article analysé.
+        Les mots en gros caractères sont les plus mentionnés, reflétant les thèmes centraux
+        du discours médiatique sur la fonction publique territoriale parisienne.
+        
+        **Méthodologie :**
+        1. Extraction du texte de l'article
+        2. Nettoyage (suppression ponctuation, URLs, etc.)
+        3. Tokenisation (découpage en mots)
+        4. Suppression des stopwords (mots vides)
+        5. Génération du WordCloud basé sur les fréquences
+        """)
+        
+        # Interpretación descriptiva
+        st.markdown("""
+        Le nuage de mots révèle les termes dominants du discours médiatique : 
+        les mots de plus grande taille apparaissent plus fréquemment dans le texte. Cette visualisation 
+        permet d'identifier rapidement les thèmes principaux abordés dans l'article (effectifs, services, 
+        administration, budget, etc.).
+        """)
+        
+    except FileNotFoundError:
+        st.error("Fichier wordcloud_article_lefigaro.png non trouvé dans le dossier")
+        st.info("Assurez-vous que le fichier est dans le même répertoire que streamlit.py")